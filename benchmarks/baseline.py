@@ -0,0 +1,73 @@
+# Stored baselines of the benchmarks
+# A benchmark saves its numbers with --save-baseline in benchmarks/baselines/<name>.json,
+# and a later run is compared with them: a number that is more than the tolerance worse
+# than the baseline is reported as a regression (and the benchmark exits with status 1).
+# Baselines depend on the computer, so save them on the computer the benchmarks run on;
+# they are not in the repository. Without a baseline a comparison fails (status 1) instead
+# of passing without comparing anything
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import json
+import platform
+from datetime import datetime
+
+BASELINE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+# A number may be this much worse than its baseline before it counts as a regression
+TOLERANCE = 0.2
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_FOLDER, f'{name}.json')
+
+
+def load_baseline(name):
+    """The saved baseline of a benchmark (results {case: {metric: value}}, machine etc.), or None if there is none."""
+    try:
+        with open(baseline_path(name), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(name, results):
+    os.makedirs(BASELINE_FOLDER, exist_ok=True)
+    with open(baseline_path(name), 'w') as f:
+        json.dump({'saved': str(datetime.now()), 'machine': platform.node(), 'python': platform.python_version(),
+                   'results': results}, f, indent=2, sort_keys=True)
+    print(f'Baseline saved in {baseline_path(name)}')
+
+
+def compare(name, results, higher_is_better, tolerance=TOLERANCE):
+    """Print the results next to the baseline and return the list of regressions.
+
+    ``higher_is_better`` is the set of metrics for which a higher number is better (e.g.
+    throughput); for all other metrics (times, memory) lower is better. Exits with
+    status 1 when the benchmark has no baseline.
+    """
+    saved = load_baseline(name)
+    if saved is None:
+        sys.exit(f'No baseline for {name} in {baseline_path(name)}, so nothing can be compared; '
+                 f'run the benchmark with --save-baseline on this computer first')
+    if saved.get('machine') != platform.node():
+        print(f'Warning: the baseline of {name} was saved on {saved.get("machine")} ({saved.get("saved")}), '
+              f'not on this computer ({platform.node()}); the numbers may differ without a regression')
+    baseline = saved['results']
+    regressions = []
+    print(f'{"case":<28} {"metric":<16} {"baseline":>12} {"now":>12} {"change":>8}')
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(case, {}).get(metric)
+            if old is None or value is None or not old:
+                continue
+            change = (value - old) / old
+            worse = -change if metric in higher_is_better else change
+            flag = '  REGRESSION' if worse > tolerance else ''
+            print(f'{case:<28} {metric:<16} {old:>12.4g} {value:>12.4g} {change:>+8.1%}{flag}')
+            if flag:
+                regressions.append(f'{case} {metric}: {old:.4g} -> {value:.4g}')
+    return regressions
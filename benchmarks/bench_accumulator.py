@@ -0,0 +1,59 @@
+# Benchmark for the columnar record accumulator
+# Compares the old per-item pd.concat with ColumnAccumulator and shows that the
+# accumulator scales linearly up to 1M records
+#
+# Run from the repository folder: python benchmarks/bench_accumulator.py
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import time
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worldcat.accumulator import ColumnAccumulator
+
+COLUMNS = ['ISBN1', 'ISBN2', 'Publisher', 'Holding', 'OCLC_nr', 'Author', 'Title', 'Search_ISBN']
+# Records per lookup, like the number of editions returned for one ISBN
+PER_ITEM = 5
+
+
+def item_columns(n):
+    return {'ISBN1': ['9780306406157'] * PER_ITEM, 'ISBN2': ['0306406152'] * PER_ITEM,
+            'Publisher': ['Publisher ' + str(n)] * PER_ITEM, 'Holding': ['True'] * PER_ITEM,
+            'OCLC_nr': [str(1000000 + n * PER_ITEM + i) for i in range(PER_ITEM)],
+            'Author': ['Author'] * PER_ITEM, 'Title': ['Title ' + str(n)] * PER_ITEM,
+            'Search_ISBN': ['9780306406157'] * PER_ITEM}
+
+
+def with_concat(records):
+    table = pd.DataFrame()
+    for n in range(records // PER_ITEM):
+        table = pd.concat([table, pd.DataFrame(item_columns(n))], ignore_index=True)
+    return table
+
+
+def with_accumulator(records):
+    acc = ColumnAccumulator(COLUMNS)
+    for n in range(records // PER_ITEM):
+        acc.extend(item_columns(n))
+    return acc.to_frame()
+
+
+def timed(func, records):
+    start = time.perf_counter()
+    table = func(records)
+    assert len(table) == records
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f'{"records":>10} {"pd.concat (s)":>14} {"accumulator (s)":>16} {"us/record":>10}')
+    for records in [1000, 10000, 20000, 100000, 1000000]:
+        # The concat version is quadratic, so it is only timed for the smaller sizes
+        concat = f'{timed(with_concat, records):14.3f}' if records <= 20000 else f'{"-":>14}'
+        acc = timed(with_accumulator, records)
+        print(f'{records:>10} {concat} {acc:16.3f} {acc / records * 1e6:10.2f}')
@@ -0,0 +1,191 @@
+# End-to-end benchmark of the ISBN, text and pages tools against the mock WorldCat API
+# Every tool runs its whole pipeline (input file, lookups over HTTP with a real client,
+# output files) against mock_server.py on localhost, with 1.000, 10.000 and 100.000 input
+# rows. Reported per run: input rows per second, p50/p99 latency of the requests as the
+# client sees them and the peak memory. Every run is a separate process, so the peak
+# memory is that of the tool alone. The results are compared with the stored baseline
+# (see baseline.py); --save-baseline stores them as the new baseline
+#
+# Run from the repository folder: python benchmarks/bench_e2e.py [--sizes 1000 10000] [--tools isbn pages]
+#                                 [--latency 0.02] [--error-rate 0.01] [--workers 8] [--save-baseline]
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import importlib
+import subprocess
+from contextlib import redirect_stdout
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_server import MockWorldCat
+from baseline import compare, save_baseline
+
+SIZES = [1000, 10000, 100000]
+TOOLS = {'isbn': 'worldcat.isbn_tool', 'text': 'worldcat.text_tool', 'pages': 'worldcat.pages_tool'}
+# Metrics where more is better; for the others less is better
+HIGHER_IS_BETTER = {'rows_per_s'}
+WORDS = ['introduction', 'quantum', 'mechanics', 'economics', 'history', 'netherlands', 'statistics', 'biology',
+         'molecular', 'psychology', 'cognitive', 'european', 'law', 'philosophy', 'modern', 'analysis', 'linear',
+         'algebra', 'organic', 'chemistry', 'public', 'health', 'research', 'methods', 'social', 'theory',
+         'international', 'relations', 'climate', 'change', 'data', 'science', 'machine', 'learning', 'ethics']
+
+
+def isbn13(n):
+    """A valid ISBN-13 for the number n."""
+    digits = f'978{n % 10 ** 9:09d}'
+    check = (10 - sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(digits)) % 10) % 10
+    return digits + str(check)
+
+
+def make_input(tool, size, folder):
+    """Write the input file of a tool with ``size`` rows (once per folder) and return the arguments of run()."""
+    rng = np.random.default_rng(size)
+    if tool == 'isbn':
+        path = os.path.join(folder, f'isbn_{size}.xlsx')
+        if not os.path.isfile(path):
+            isbns = [isbn13(int(n)) for n in rng.integers(0, 10 ** 9, size)]
+            # About 1 in 20 ISBNs is a broken one, like the ones harvested from PDF files
+            isbns = [i[:-1] + str((int(i[-1]) + 1) % 10) if n % 20 == 0 else i for n, i in enumerate(isbns)]
+            pd.DataFrame({'ISBN': isbns, 'Publisher': None}).to_excel(path, sheet_name='Sheet1', index=False)
+        return [path, 'Sheet1']
+    if tool == 'text':
+        path = os.path.join(folder, f'text_{size}.xlsx')
+        if not os.path.isfile(path):
+            words = np.array(WORDS, dtype=object)
+            names = ['_'.join(words[rng.integers(0, len(WORDS), int(k))]) + (f'_{y}' if y else '') + '.pdf'
+                     for k, y in zip(rng.integers(3, 9, size), rng.choice([0, 2015, 2019, 2022], size))]
+            pd.DataFrame({'Material id': np.arange(1, size + 1), 'Filename': names, 'Title': names,
+                          'ISBN': np.nan, 'Publisher': None}).to_excel(path, sheet_name='Sheet1', index=False)
+        return [path, 'Sheet1']
+    path = os.path.join(folder, f'pages_{size}.txt')
+    if not os.path.isfile(path):
+        # Like WorldCat_All_Editions_data.txt: most OCLC numbers are in it about twice
+        oclc = rng.integers(100000, 100000 + size // 2 * 10, size)
+        isbns = [isbn13(int(n)) for n in oclc]
+        pd.DataFrame({'ISBN1': isbns, 'ISBN2': [i[-10:] for i in isbns], 'Publisher': 'Pub', 'Holding': 'True',
+                      'OCLC_nr': oclc, 'Author': 'Author', 'Title': 'Title', 'Search_ISBN': isbns,
+                      'Publication_Date': '2019', 'Pub_year': 2019, 'SpecificFormat': 'PrintBook',
+                      'OCLC_Link': 'https://vu.on.worldcat.org/search?queryString=' + pd.Series(oclc).astype(str)}
+                     ).to_csv(path, sep='\t', encoding='utf-8')
+    return [path]
+
+
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        # Windows: only with the optional psutil package
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2 ** 20
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def run_case(tool, size, url, workers, folder, result_file):
+    """Run one tool on one input in this process and write the numbers to ``result_file``."""
+    # The mock server is http on localhost
+    os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    from worldcat.client import WorldCatClient
+    module = importlib.import_module(TOOLS[tool])
+    inputs = make_input(tool, size, folder)
+    # The tools make some folders relative to the working folder on other systems than Windows
+    os.chdir(folder)
+    config = {'key': 'benchmark', 'secret': 'benchmark', 'token_url': url + '/token', 'worldcat_api_url': url,
+              'workers': workers, 'max_retries': 5, 'retry_backoff': 0.05}
+    wc = WorldCatClient(config, module.SCOPE)
+    # The time of every request as the client sees it
+    latencies = []
+    session_get = wc.session.get
+
+    def timed_get(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return session_get(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    wc.session.get = timed_get
+
+    out = os.path.join(folder, f'out_{tool}_{size}')
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as null, redirect_stdout(null):
+        module.run(wc, config, *inputs, folder=out, journal_file=os.path.join(out, 'journal.jsonl'))
+    elapsed = time.perf_counter() - start
+    wc.close()
+    peak = peak_memory_mb()
+    result = {'seconds': round(elapsed, 3), 'rows_per_s': round(size / elapsed, 1), 'requests': len(latencies),
+              'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3) if latencies else None,
+              'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 3) if latencies else None,
+              'peak_mb': round(peak, 1) if peak is not None else None}
+    with open(result_file, 'w') as f:
+        json.dump(result, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the WorldCat tools against the mock API")
+    parser.add_argument('--tools', nargs='+', default=list(TOOLS), choices=list(TOOLS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help='mean seconds per answer of the mock API')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of answers that are a 500')
+    parser.add_argument('--rate-limit', type=float, help='requests per second above which the mock API gives a 429')
+    parser.add_argument('--archive', help='response archive with recorded responses for the mock API')
+    parser.add_argument('--folder', help='folder for the input and output files (default: a temporary folder)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--run-case', nargs=5, metavar=('TOOL', 'SIZE', 'URL', 'WORKERS', 'RESULT'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_case:
+        tool, size, url, workers, result_file = args.run_case
+        return run_case(tool, int(size), url, int(workers), args.folder, result_file)
+
+    mock = MockWorldCat(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit,
+                        archive=args.archive).start()
+    folder = os.path.abspath(args.folder or tempfile.mkdtemp(prefix='worldcat_bench_'))
+    os.makedirs(folder, exist_ok=True)
+    results = {}
+    try:
+        for tool in args.tools:
+            for size in args.sizes:
+                # The input file is made beforehand, so it is not part of the time
+                make_input(tool, size, folder)
+                result_file = os.path.join(folder, f'result_{tool}_{size}.json')
+                subprocess.run([sys.executable, os.path.abspath(__file__), '--folder', folder, '--run-case',
+                                tool, str(size), mock.url, str(args.workers), result_file], check=True)
+                with open(result_file) as f:
+                    results[f'{tool}_{size}'] = result = json.load(f)
+                print(f'{tool:>5} {size:>7} rows: {result["seconds"]:8.2f} s, {result["rows_per_s"]:9.1f} rows/s, '
+                      f'{result["requests"]:>7} requests, p50 {result["p50_ms"]} ms, p99 {result["p99_ms"]} ms, '
+                      f'peak {result["peak_mb"]} MB')
+    finally:
+        mock.stop()
+    print('Mock API requests:', mock.counts)
+
+    # Only the numbers that say something about speed and memory are compared
+    compared = {case: {k: r[k] for k in ('rows_per_s', 'p50_ms', 'p99_ms', 'peak_mb')} for case, r in results.items()}
+    if args.save_baseline:
+        save_baseline('e2e', compared)
+    else:
+        regressions = compare('e2e', compared, HIGHER_IS_BETTER)
+        if regressions:
+            sys.exit('Slower than the baseline: ' + '; '.join(regressions))
+
+
+if __name__ == "__main__":
+    main()
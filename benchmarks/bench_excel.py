@@ -0,0 +1,86 @@
+# Benchmark for reading the Excel sheets of the tools
+# Times the old read of the whole sheet against the read of only the columns of the ISBN
+# tool, with openpyxl and (if python-calamine is installed) calamine, and the load of the
+# Parquet snapshot (if pyarrow is installed). The workbook is synthetic, with as many
+# columns as the Canvas export and --rows rows
+#
+# Run from the repository folder: python benchmarks/bench_excel.py [--rows 300000]
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from worldcat.excel import read_sheet
+from bench_isbn import synthetic_codes
+
+# Columns of the ISBN tool
+COLUMNS = ['ISBN', 'Publisher']
+
+
+def make_workbook(path, rows):
+    """A sheet with the columns of the Canvas export; a third of the rows has a publisher already."""
+    rng = np.random.default_rng(rows)
+    frame = pd.DataFrame({'Material id': np.arange(1, rows + 1),
+                          'Course': [f'Course {n}' for n in rng.integers(0, 5000, rows)],
+                          'Filename': [f'file_{n}_chapter_{n % 20}.pdf' for n in range(rows)],
+                          'Title': [f'Title of material {n}' for n in range(rows)],
+                          'Author': [f'Author {n % 997}' for n in range(rows)],
+                          'ISBN': synthetic_codes(rows),
+                          'Publisher': np.where(np.arange(rows) % 3 == 0, 'Elsevier', None),
+                          'Pages': rng.integers(1, 900, rows),
+                          'Year': rng.integers(1990, 2026, rows),
+                          'Faculty': rng.choice(['FSW', 'FGB', 'SBE', 'BETA', 'FGW'], rows)})
+    frame.to_excel(path, sheet_name='Sheet1', index=False)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark of reading the Excel sheets of the tools')
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix='worldcat_excel_')
+    path = os.path.join(folder, 'materials.xlsx')
+    t_make, _ = timed(make_workbook, path, args.rows)
+    print(f'{args.rows} rows, {os.path.getsize(path) / 2 ** 20:.1f} MB workbook (made in {t_make:.1f} s)')
+
+    t_old, old = timed(pd.read_excel, path, sheet_name='Sheet1', converters={'ISBN': str})
+    print(f'  whole sheet, openpyxl:      {t_old:7.2f} s')
+    old = old[COLUMNS]
+    engines = ['openpyxl']
+    try:
+        import python_calamine  # noqa: F401
+        engines.append('calamine')
+    except ImportError:
+        print('  python-calamine is not installed, only openpyxl is measured')
+    for engine in engines:
+        t, new = timed(read_sheet, {'excel_engine': engine}, path, 'Sheet1', COLUMNS, converters={'ISBN': str})
+        # The same table as before, only faster
+        pd.testing.assert_frame_equal(new, old)
+        print(f'  ISBN columns, {engine + ":":<14}{t:7.2f} s ({t_old / t:.1f}x)')
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print('  pyarrow is not installed, the snapshot is not measured')
+    else:
+        config = {'excel_snapshot_dir': os.path.join(folder, 'snapshots')}
+        t_first, _ = timed(read_sheet, config, path, 'Sheet1', COLUMNS, converters={'ISBN': str})
+        t_snap, new = timed(read_sheet, config, path, 'Sheet1', COLUMNS, converters={'ISBN': str})
+        pd.testing.assert_frame_equal(new, old)
+        print(f'  first run with snapshot:    {t_first:7.2f} s, next runs {t_snap * 1000:.0f} ms ({t_old / t_snap:.0f}x)')
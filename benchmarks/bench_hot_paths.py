@@ -0,0 +1,143 @@
+# Microbenchmarks of the parts of the tools that use the most CPU time
+# Apart from the network the time of a run goes to a few spots: the ISBN check digits,
+# the cleaning of file names and titles (the chain of str.replace calls) and the stop
+# word filter of the text tool, the title scoring (difflib.SequenceMatcher and the
+# faster backends), the extraction of brief records and bib records from the responses
+# and the year in the date field. Each is timed on a synthetic corpus of the size of a
+# large run (best of --repeat runs) and compared with the stored baseline (see
+# baseline.py), so a rewrite of one of them can be judged by the numbers
+#
+# Run from the repository folder: python benchmarks/bench_hot_paths.py [--scale 0.1] [--only isbn_check_digits]
+#                                 [--repeat 5] [--save-baseline]
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import gc
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from worldcat.isbn import isbn13_numbers
+from worldcat.matching import title_similarity
+from worldcat.records import extract_brief_records, extract_bib_records, publication_year
+from worldcat.stopwords import SPECIAL_WORDS, stopword_set
+from worldcat.text_tool import clean_text, remove_stopwords
+from bench_isbn import synthetic_codes
+from bench_matching import synthetic_searches
+from bench_e2e import WORDS
+from mock_server import synthetic_brief_records, synthetic_bib
+from baseline import compare, save_baseline
+
+# Sizes of the corpora at --scale 1
+SIZES = {'isbn_check_digits': 200000, 'clean_filenames': 100000, 'stopword_filter': 100000,
+         'title_difflib': 20000, 'title_auto': 200000, 'brief_records': 20000, 'bib_records': 50000,
+         'publication_year': 500000}
+DATES = ['2019', '©2019', '[2019]', 'c2019.', '2019-2020', '[between 1990 and 1999?]', '1st ed. 2015', 'None', '']
+
+
+def synthetic_filenames(n, seed=1):
+    """File names as in the Canvas export: words with _ - ( ) [ ], a chapter number, sometimes a year."""
+    rng = np.random.default_rng(seed)
+    words = WORDS + ['the', 'of', 'and', 'in', 'de', 'het', 'een', 'van', 'chapter', 'hoofdstuk', 'syllabus']
+    seps = np.array(['_', ' ', '-', ' - '], dtype=object)
+    names = []
+    for k, sep, year, chapter in zip(rng.integers(2, 12, n), rng.choice(seps, n), rng.choice([0, 2015, 2022], n),
+                                     rng.integers(0, 20, n)):
+        name = sep.join(rng.choice(words, k))
+        if chapter:
+            name = f'{name}{sep}({chapter})'
+        if year:
+            name = f'[{year}] {name}'
+        names.append(name + '.pdf')
+    return pd.Series(names)
+
+
+def brief_responses(n):
+    """Responses of /brief-bibs searches: ISBN searches and text searches with 0 to 3 records."""
+    return [{'briefRecords': synthetic_brief_records(f'bn:{code}' if i % 2 else f'search {i}')}
+            for i, code in enumerate(synthetic_codes(n))]
+
+
+def corpus(case, size):
+    """The input of a case; made before the timing starts."""
+    if case == 'isbn_check_digits':
+        return synthetic_codes(size)
+    if case in ('clean_filenames', 'stopword_filter'):
+        names = synthetic_filenames(size).str.lower()
+        return names if case == 'clean_filenames' else clean_text(names)
+    if case in ('title_difflib', 'title_auto'):
+        pairs = synthetic_searches(size // 10)
+        return pairs['Filename_copy'], pairs['Title_copy']
+    if case == 'brief_records':
+        return brief_responses(size)
+    if case == 'bib_records':
+        return [synthetic_bib(100000 + i * 7) for i in range(size)]
+    return [DATES[i % len(DATES)] for i in range(size)]
+
+
+def run(case, data, stopwords):
+    """The code that is timed: one pass over the corpus."""
+    if case == 'isbn_check_digits':
+        return isbn13_numbers(data)
+    if case == 'clean_filenames':
+        return clean_text(data)
+    if case == 'stopword_filter':
+        return remove_stopwords(data, stopwords)
+    if case == 'title_difflib':
+        return title_similarity(*data, backend='difflib')
+    if case == 'title_auto':
+        return title_similarity(*data, backend='auto')
+    if case == 'brief_records':
+        return [extract_brief_records(response) for response in data]
+    if case == 'bib_records':
+        return [extract_bib_records(response) for response in data]
+    return [publication_year(date) for date in data]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks of the CPU hot paths of the WorldCat tools')
+    parser.add_argument('--only', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--scale', type=float, default=1.0, help='factor for the sizes of the corpora')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the fastest counts')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    args = parser.parse_args()
+
+    stopwords = stopword_set(['english', 'dutch'], SPECIAL_WORDS)
+    results = {}
+    for case in args.only:
+        size = max(10, int(SIZES[case] * args.scale))
+        data = corpus(case, size)
+        times = []
+        for _ in range(args.repeat):
+            # Like timeit: no garbage collection during the timing, it depends on what ran before
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            try:
+                run(case, data, stopwords)
+            finally:
+                times.append(time.perf_counter() - start)
+                gc.enable()
+        best = min(times)
+        # Per item, so results of runs with another --scale can still be compared
+        results[case] = {'us_per_item': round(best / size * 1e6, 4)}
+        print(f'{case:<18} {size:>8} items: {best:8.3f} s, {best / size * 1e6:9.3f} us per item, '
+              f'{size / best:12,.0f} items/s')
+
+    if args.save_baseline:
+        save_baseline('hot_paths', results)
+    else:
+        regressions = compare('hot_paths', results, higher_is_better=set())
+        if regressions:
+            sys.exit('Slower than the baseline: ' + '; '.join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Benchmark for the title matching of the text search tool
+# Compares the speed of the matching backends and measures how often they pick the same
+# best title as the difflib.SequenceMatcher scores (the default) and how well their ranking
+# of the candidates of a search agrees with it
+#
+# Run from the repository folder: python benchmarks/bench_matching.py
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worldcat.matching import title_similarity, top_matches
+
+WORDS = ('history social research policy health europe netherlands water climate '
+         'education children language economy law public management digital theory '
+         'practice analysis development culture media science society energy urban '
+         'global care introduction handbook studies international perspectives').split()
+
+
+def synthetic_searches(searches, candidates=10, seed=1):
+    """File names with `candidates` titles each; the first title is the real one."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for mid in range(searches):
+        title = ' '.join(rng.choice(WORDS, size=rng.integers(3, 9)))
+        # A file name has some words of the title, sometimes in another order, and a year
+        words = title.split()
+        kept = [w for w in words if rng.random() > 0.25] or words[:1]
+        if rng.random() < 0.3:
+            rng.shuffle(kept)
+        filename = ' '.join(kept) + ' ' + str(rng.integers(1990, 2025))
+        rows.append((mid, filename, title, True))
+        for _ in range(candidates - 1):
+            # Other titles share a few words with the real one
+            other = list(rng.choice(words, size=min(2, len(words)))) + list(rng.choice(WORDS, size=rng.integers(2, 8)))
+            rows.append((mid, filename, ' '.join(other), False))
+    return pd.DataFrame(rows, columns=['Search_MID', 'Filename_copy', 'Title_copy', 'Real'])
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def best_of(frame, scores):
+    # The candidate with the highest score per search
+    frame = frame.assign(score=scores)
+    return top_matches(frame, 'Search_MID', 'score', top_k=1).set_index('Search_MID')
+
+
+if __name__ == "__main__":
+    small = synthetic_searches(2000)
+    t_difflib, reference = timed(title_similarity, small['Filename_copy'], small['Title_copy'], backend='difflib')
+    print(f'{len(small)} pairs: difflib {t_difflib:.3f} s')
+    best_reference = best_of(small, reference)
+    backends = ['ngram']
+    try:
+        import rapidfuzz  # noqa: F401
+        backends.append('rapidfuzz')
+    except ImportError:
+        print('rapidfuzz is not installed, only the ngram backend is measured')
+    for backend in backends:
+        t, scores = timed(title_similarity, small['Filename_copy'], small['Title_copy'], backend=backend)
+        best = best_of(small, scores)
+        same_top = (best['Title_copy'] == best_reference['Title_copy']).mean()
+        # Rank correlation of the candidate scores within each search
+        ranks = pd.DataFrame({'mid': small['Search_MID'], 'old': reference, 'new': scores})
+        rank_corr = ranks.groupby('mid')[['old', 'new']].corr(method='spearman').xs('old', level=1)['new'].mean()
+        print(f'  {backend}: {t:.3f} s ({t_difflib / t:.0f}x), same best title as difflib {same_top:.1%}, '
+              f'real title found {best["Real"].mean():.1%} (difflib {best_reference["Real"].mean():.1%}), '
+              f'mean rank correlation {rank_corr:.3f}')
+
+    big = synthetic_searches(50000)
+    print(f'{len(big)} pairs (difflib estimated at {t_difflib * len(big) / len(small):.0f} s):')
+    for backend in backends:
+        t, scores = timed(title_similarity, big['Filename_copy'], big['Title_copy'], backend=backend)
+        t_top, kept = timed(top_matches, big.assign(ratio=scores), 'Search_MID', 'ratio', top_k=3, threshold=0.3)
+        print(f'  {backend}: {t:.3f} s, top 3 per search {t_top:.3f} s ({len(kept)} rows kept)')
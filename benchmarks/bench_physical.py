@@ -0,0 +1,82 @@
+# Benchmark for the physicalDescription parser of the pages tool
+# Times parse_physical_descriptions on millions of synthetic descriptions and compares
+# it with parsing the rows one by one with the same regular expressions
+#
+# Run from the repository folder: python benchmarks/bench_physical.py
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worldcat.physical import PAGES, VOLUMES, HEIGHT, roman_to_int, parse_physical_descriptions
+
+# The rows per minute the parser should at least handle
+TARGET_PER_MINUTE = 2_000_000
+
+FRONT = ['', 'vii, ', 'xii, ', 'xiv, ', 'xvi, ', 'xxiv, ', 'XVI, ', '[8], ']
+TEMPLATES = ['{front}{pages} pages : illustrations ; {height} cm',
+             '1 online resource ({front}{pages} pages)',
+             '{front}{pages} p. : ill. ; {height} cm',
+             '{front}{pages} blz. ; {height} cm',
+             "{pages} pagina's",
+             '{volumes} delen ({front}{pages} blz.) ; {height} cm',
+             '{volumes} volumes ({pages} pages) ; {height} cm',
+             '1 online resource',
+             'None']
+
+
+def synthetic_descriptions(n, seed=1):
+    """Descriptions in the forms WorldCat uses, with page counts up to 1500."""
+    rng = np.random.default_rng(seed)
+    template = rng.integers(0, len(TEMPLATES), size=n)
+    front = rng.integers(0, len(FRONT), size=n)
+    pages = rng.integers(20, 1500, size=n)
+    height = rng.choice(['21', '23', '24', '25', '23,5', '30'], size=n)
+    volumes = rng.integers(2, 5, size=n)
+    return pd.Series([TEMPLATES[t].format(front=FRONT[f], pages=p, height=h, volumes=v)
+                      for t, f, p, h, v in zip(template, front, pages, height, volumes)])
+
+
+def row_by_row(descriptions):
+    """The same numbers with a regular expression search per row (the way it is done in a loop)."""
+    rows = []
+    for text in descriptions:
+        m = PAGES.search(text)
+        v = VOLUMES.search(text)
+        h = HEIGHT.search(text)
+        rows.append((int(m['pages']) if m else None,
+                     roman_to_int(m['front']) if m and m['front'] else None,
+                     int(v['volumes']) if v else None,
+                     float(h['height'].replace(',', '.')) if h else None))
+    return rows
+
+
+if __name__ == "__main__":
+    small = synthetic_descriptions(200000)
+    start = time.perf_counter()
+    row_by_row(small)
+    t_rows = time.perf_counter() - start
+    start = time.perf_counter()
+    parsed = parse_physical_descriptions(small)
+    t_vector = time.perf_counter() - start
+    print(f'{len(small)} descriptions: row by row {t_rows:.2f} s, parse_physical_descriptions {t_vector:.2f} s '
+          f'({t_rows / t_vector:.1f}x)')
+
+    big = synthetic_descriptions(3000000)
+    start = time.perf_counter()
+    parsed = parse_physical_descriptions(big)
+    t_big = time.perf_counter() - start
+    per_minute = len(big) / t_big * 60
+    print(f'{len(big)} descriptions ({big.nunique()} different): {t_big:.2f} s, '
+          f'{per_minute / 1e6:.1f} million rows per minute (target {TARGET_PER_MINUTE / 1e6:.0f} million)')
+    print(f'Page count found for {parsed["Pages"].notna().mean():.1%} of the rows, '
+          f'median {parsed["Pages"].median():.0f} pages')
+    if per_minute < TARGET_PER_MINUTE:
+        sys.exit('parse_physical_descriptions is slower than the target')
@@ -0,0 +1,55 @@
+# Benchmark for the offline rebuild
+# Writes a response archive with 50.000 synthetic brief-bibs responses (10 records each,
+# like the ISBN tool gets) and times parsing it again in one process and in a process pool
+#
+# Run from the repository folder: python benchmarks/bench_rebuild.py [processes]
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worldcat.archive import ResponseArchive
+from worldcat.rebuild import parse_archive
+
+RESPONSES = 50000
+# Seconds the rebuild of the archive may take with the process pool
+TARGET_SECONDS = 60
+
+
+def brief_response(n):
+    records = [{'oclcNumber': str(n * 10 + i), 'title': f'Title of book {n} part {i}', 'creator': 'Author, A.',
+                'date': '©2019', 'publisher': f'Publisher {i}', 'isbns': [f'978{n:010d}', f'{n:010d}'],
+                'specificFormat': 'PrintBook', 'generalFormat': 'Book',
+                'institutionHoldingIndicators': [{'holdsItem': bool(i % 2)}]} for i in range(10)]
+    return {'numberOfRecords': 10, 'briefRecords': records}
+
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        archive = ResponseArchive(folder, 'isbn')
+        for n in range(RESPONSES):
+            archive.put(f'978{n:010d}', brief_response(n))
+        archive.close()
+        size = sum(os.path.getsize(os.path.join(archive.path, f)) for f in os.listdir(archive.path))
+        print(f'{RESPONSES} responses archived in {time.perf_counter() - start:.2f} s, '
+              f'{size / 2 ** 20:.1f} MB ({archive.compression})')
+
+        start = time.perf_counter()
+        parsed = parse_archive(archive.path, 'isbn', processes=1)
+        t_one = time.perf_counter() - start
+        start = time.perf_counter()
+        parsed_pool = parse_archive(archive.path, 'isbn', processes=processes)
+        t_pool = time.perf_counter() - start
+        assert parsed == parsed_pool
+        print(f'Parsed {len(parsed)} responses: 1 process {t_one:.2f} s, {processes} processes {t_pool:.2f} s '
+              f'({t_one / t_pool:.1f}x)')
+        if t_pool > TARGET_SECONDS:
+            sys.exit('The rebuild is slower than the target')
@@ -0,0 +1,69 @@
+# Benchmark for the start up time of the worldcat command and the text search tool
+# Measures `worldcat --help` and the time from a fresh Python process to the moment the
+# text tool could send its first request: importing the tool, making the stop word set
+# and the client. No network is used; the measurement fails when it takes longer than the budget
+#
+# Run from the repository folder: python benchmarks/bench_startup.py
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import subprocess
+import sys
+import tempfile
+
+# Seconds from the start of the process to the first request
+STARTUP_BUDGET = 2.0
+# Seconds for `worldcat --help`, which should not import pandas etc.
+HELP_BUDGET = 0.3
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a new process, so nothing is imported yet
+STARTUP = r'''
+import time
+start = time.perf_counter()
+import socket
+def no_network(*args, **kwargs):
+    raise RuntimeError('network access during start up')
+socket.socket.connect = no_network
+import worldcat.text_tool
+imported = time.perf_counter()
+from worldcat.stopwords import SPECIAL_WORDS, stopword_set
+words = stopword_set(['english', 'dutch'], SPECIAL_WORDS)
+stopwords = time.perf_counter()
+from worldcat.client import WorldCatClient
+wc = WorldCatClient({'key': 'k', 'secret': 's', 'token_url': 'https://localhost/token',
+                     'worldcat_api_url': 'https://localhost'}, ['wcapi:view_brief_bib'])
+ready = time.perf_counter()
+print(imported - start, stopwords - imported, ready - stopwords)
+'''
+
+
+def elapsed(command, folder):
+    start = os.times().elapsed
+    out = subprocess.run(command, cwd=folder, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=REPO))
+    if out.returncode != 0:
+        sys.exit(out.stderr)
+    return os.times().elapsed - start, out.stdout
+
+
+if __name__ == "__main__":
+    runs = []
+    helps = []
+    # The tool writes its log file in the working folder, so run it in a temporary one
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(3):
+            helps.append(elapsed([sys.executable, '-m', 'worldcat', '--help'], folder)[0])
+            total, out = elapsed([sys.executable, '-c', STARTUP], folder)
+            runs.append((total, *map(float, out.split())))
+    total, imported, stopwords, client = min(runs)
+    print(f'worldcat --help: {min(helps):.3f} s (budget {HELP_BUDGET} s, includes starting Python)')
+    print(f'Process start to first request: {total:.2f} s (budget {STARTUP_BUDGET} s)')
+    print(f'  import of the tool {imported:.2f} s, stop word set {stopwords * 1000:.2f} ms, client {client * 1000:.1f} ms')
+    if min(helps) > HELP_BUDGET:
+        sys.exit(f'worldcat --help takes longer than the budget of {HELP_BUDGET} s')
+    if total > STARTUP_BUDGET:
+        sys.exit(f'Start up takes longer than the budget of {STARTUP_BUDGET} s')
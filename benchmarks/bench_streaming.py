@@ -0,0 +1,78 @@
+# Benchmark for the streaming output of the WorldCat tools
+# Writes the same edition table once as a whole (DataFrame, drop_duplicates, to_csv) and
+# once chunk by chunk (ChunkWriter with a HashSet for the duplicates), for a growing
+# number of rows, and compares the peak memory and the output files. The memory is
+# measured with tracemalloc, which makes both runs a few times slower
+#
+# Run from the repository folder: python benchmarks/bench_streaming.py
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import time
+import filecmp
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worldcat.stream import ChunkWriter, HashSet
+
+CHUNK_SIZE = 50000
+COLUMNS = ['ISBN1', 'Publisher', 'OCLC_nr', 'Title', 'Search_ISBN', 'Pub_year']
+
+
+def synthetic_chunk(start, n):
+    """Rows start..start+n of an edition table with about one duplicate row in five."""
+    # Row i repeats row i - 4 when i % 5 == 4, also over the chunk borders
+    ids = np.arange(start, start + n)
+    ids = np.where(ids % 5 == 4, ids - 4, ids)
+    return pd.DataFrame({'ISBN1': (9780000000000 + ids).astype(str),
+                         'Publisher': np.array(['Pub' + str(i) for i in range(50)], dtype=object)[ids % 50],
+                         'OCLC_nr': (1000000 + ids).astype(str),
+                         'Title': ['Title of book number ' + str(i) for i in ids],
+                         'Search_ISBN': (9780000000000 + ids).astype(str),
+                         'Pub_year': 1950 + ids % 75})
+
+
+def whole(rows, path):
+    table = pd.concat([synthetic_chunk(start, min(CHUNK_SIZE, rows - start)) for start in range(0, rows, CHUNK_SIZE)],
+                      ignore_index=True)
+    table = table.drop_duplicates(subset=['ISBN1', 'OCLC_nr', 'Title'])
+    table.to_csv(path, sep='\t', encoding='utf-8')
+
+
+def streamed(rows, path):
+    writer = ChunkWriter(path, COLUMNS, sep='\t', encoding='utf-8')
+    seen = HashSet()
+    for start in range(0, rows, CHUNK_SIZE):
+        chunk = synthetic_chunk(start, min(CHUNK_SIZE, rows - start))
+        chunk.index = range(start, start + len(chunk))
+        writer.write(chunk[seen.add_new(chunk[['ISBN1', 'OCLC_nr', 'Title']])])
+    writer.close()
+
+
+def peak(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak_bytes / 2 ** 20
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in (200000, 400000, 800000):
+            a = os.path.join(folder, 'whole.txt')
+            b = os.path.join(folder, 'streamed.txt')
+            t_whole, m_whole = peak(whole, rows, a)
+            t_stream, m_stream = peak(streamed, rows, b)
+            same = filecmp.cmp(a, b, shallow=False)
+            print(f'{rows} rows: whole table {t_whole:.1f} s, peak {m_whole:.0f} MB; '
+                  f'chunks of {CHUNK_SIZE} {t_stream:.1f} s, peak {m_stream:.0f} MB; same file: {same}')
@@ -0,0 +1,217 @@
+# Local stand-in for the OCLC token endpoint and the WorldCat Search API, for benchmarks
+# Serves /token, /brief-bibs and /bibs on localhost with synthetic records (the same for
+# the same ISBN, OCLC number or search every time), or replays the responses of a
+# response archive of a real run (see worldcat/archive.py). Latency, errors and 429s
+# with Retry-After can be switched on to see how the tools behave when the API is slow
+# or busy. Used by bench_e2e.py; it can also run on its own for a test run of a tool:
+#
+#   python benchmarks/mock_server.py --port 8321 --latency 0.05 --error-rate 0.01
+#
+# and in the config file:  token_url: http://127.0.0.1:8321/token
+#                          worldcat_api_url: http://127.0.0.1:8321
+# (oauthlib only accepts http with the environment variable OAUTHLIB_INSECURE_TRANSPORT=1)
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import sys
+import json
+import time
+import random
+import zlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PUBLISHERS = ['Elsevier', 'Springer', 'Wiley', 'Routledge', 'Amsterdam University Press', 'Boom', 'Sage',
+              'Oxford University Press', 'Cambridge University Press', 'Noordhoff']
+FORMATS = ['PrintBook', 'Digital', 'EBook', 'ThesisDissertation']
+DESCRIPTIONS = ['xii, {p} pages : illustrations ; 24 cm', '1 online resource ({p} pages)', '{p} p. ; 23 cm',
+                'xvi, {p} blz. ; 25 cm', '2 volumes ({p} pages) ; 24 cm']
+
+
+def seed(text):
+    """A number that is the same for the same text in every run (hash() is not)."""
+    return zlib.crc32(str(text).encode('utf-8'))
+
+
+def brief_record(isbn, n, key):
+    s = seed(key) + n
+    year = 1990 + s % 35
+    return {'oclcNumber': str(100000 + (seed(key) % 5000000) * 10 + n),
+            'title': f'Synthetic title {key} {n}', 'creator': f'Author {s % 997}',
+            'date': f'©{year}' if n % 2 else str(year), 'publisher': PUBLISHERS[s % len(PUBLISHERS)],
+            'isbns': [isbn, isbn[-10:]] if isbn else [], 'specificFormat': FORMATS[s % len(FORMATS)],
+            'generalFormat': 'Book', 'institutionHoldingIndicators': [{'holdsItem': bool(s % 2)}]}
+
+
+def synthetic_brief_records(term):
+    """0 to 3 records for one search term (an ISBN with bn: or text); about 1 in 10 has none."""
+    isbn = term[3:] if term.startswith('bn:') else None
+    count = seed(term) % 10
+    count = 0 if count == 0 else 1 + count % 3
+    return [brief_record(isbn, n, isbn or term) for n in range(count)]
+
+
+def synthetic_bib(oclc_nr):
+    s = seed(oclc_nr)
+    return {'numberOfRecords': 1, 'bibRecords': [{
+        'identifier': {'oclcNumber': str(oclc_nr)},
+        'description': {'physicalDescription': DESCRIPTIONS[s % len(DESCRIPTIONS)].format(p=40 + s % 900)},
+        'digitalAccessAndLocations': [{'uri': f'https://example.org/{oclc_nr}', 'materialSpecified': 'ebook'}]
+        if s % 3 == 0 else []}]}
+
+
+class MockWorldCat:
+    """The server with its settings; ``start`` runs it in a background thread.
+
+    ``latency`` is the mean time per answer in seconds (exponentially distributed),
+    ``error_rate`` the share of answers that are a 500, and ``rate_limit`` the number of
+    requests per second above which a 429 with Retry-After is given. ``archive`` is a
+    response archive folder whose responses are used for the ISBNs and OCLC numbers in it.
+    """
+
+    def __init__(self, port=0, latency=0.0, error_rate=0.0, rate_limit=None, retry_after=1, archive=None,
+                 token_lifetime=1199):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.token_lifetime = token_lifetime
+        self.archive = None
+        if archive:
+            from worldcat.archive import ArchiveReader
+            self.archive = ArchiveReader(archive)
+        self.counts = {'token': 0, 'brief-bibs': 0, 'bibs': 0, '429': 0, '500': 0}
+        self._lock = threading.Lock()
+        self._window = (0, 0)
+        self._random = random.Random(1)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately: without this every answer waits 40 ms for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                server.handle(self, 'POST')
+
+            def do_GET(self):
+                server.handle(self, 'GET')
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def config(self, **settings):
+        """Config dictionary for the tools with this server as token and API endpoint."""
+        return {'key': 'benchmark', 'secret': 'benchmark', 'token_url': self.url + '/token',
+                'worldcat_api_url': self.url, **settings}
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _over_rate(self):
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            second, count = self._window
+            now = int(time.monotonic())
+            count = count + 1 if now == second else 1
+            self._window = (now, count)
+            return count > self.rate_limit
+
+    def handle(self, request, method):
+        url = urlsplit(request.path)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+        if method == 'POST':
+            # The body of the token request is not needed, but has to be read
+            request.rfile.read(int(request.headers.get('Content-Length') or 0))
+        if endpoint == 'token' and method == 'POST':
+            self._count('token')
+            return self.send(request, 200, {'access_token': f'mock-{time.time()}', 'token_type': 'bearer',
+                                            'expires_in': self.token_lifetime})
+        if endpoint not in ('brief-bibs', 'bibs') or method != 'GET':
+            return self.send(request, 404, {'message': 'Not found'})
+        if not request.headers.get('Authorization', '').startswith('Bearer '):
+            return self.send(request, 401, {'message': 'Unauthorized'})
+        if self._over_rate():
+            self._count('429')
+            return self.send(request, 429, {'message': 'Too many requests'}, {'Retry-After': str(self.retry_after)})
+        if self.latency:
+            with self._lock:
+                wait = self._random.expovariate(1 / self.latency)
+            time.sleep(wait)
+        with self._lock:
+            error = self.error_rate and self._random.random() < self.error_rate
+        if error:
+            self._count('500')
+            return self.send(request, 500, {'message': 'Internal server error'})
+        self._count(endpoint)
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        if endpoint == 'bibs':
+            return self.send(request, 200, self.bibs(query.get('q', '')))
+        return self.send(request, 200, self.brief_bibs(query.get('q', ''), int(query.get('offset', 1)),
+                                                       int(query.get('limit', 10))))
+
+    def bibs(self, q):
+        if self.archive is not None and q in self.archive:
+            return self.archive.get(q)
+        return synthetic_bib(q)
+
+    def brief_bibs(self, q, offset, limit):
+        records = []
+        for term in q.split(' OR '):
+            if self.archive is not None and term.startswith('bn:') and term[3:] in self.archive:
+                records += self.archive.get(term[3:]).get('briefRecords', [])
+            else:
+                records += synthetic_brief_records(term)
+        page = records[offset - 1:offset - 1 + limit]
+        # Like the API: without records there is no briefRecords at all
+        return {'numberOfRecords': len(records), 'briefRecords': page} if page else {'numberOfRecords': len(records)}
+
+    @staticmethod
+    def send(request, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local mock of the OCLC token endpoint and the WorldCat Search API')
+    parser.add_argument('--port', type=int, default=8321)
+    parser.add_argument('--latency', type=float, default=0.0, help='mean seconds per answer')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of answers that are a 500')
+    parser.add_argument('--rate-limit', type=float, help='requests per second above which a 429 is given')
+    parser.add_argument('--retry-after', type=int, default=1, help='seconds in the Retry-After of a 429')
+    parser.add_argument('--archive', help='response archive folder with recorded responses to replay')
+    args = parser.parse_args()
+    mock = MockWorldCat(args.port, args.latency, args.error_rate, args.rate_limit, args.retry_after, args.archive)
+    print(f'Mock WorldCat API on {mock.url} (Ctrl+C to stop)')
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print('Requests:', mock.counts)
@@ -0,0 +1,108 @@
+# Tests of the response archive (worldcat/archive.py)
+
+import os
+from worldcat.archive import ResponseArchive, ArchiveReader, PENDING_FILE, list_runs
+from worldcat.journal import Journal
+from worldcat.rebuild import parse_archive
+
+
+def response(n):
+    return {'numberOfRecords': 1, 'briefRecords': [{'oclcNumber': str(n), 'title': f'Title {n}'}]}
+
+
+def kill(archive):
+    # What is on disk when the run is killed: the files are closed without the flush of close()
+    for file in (archive._file, archive._index, archive._pending):
+        file.close()
+
+
+def test_round_trip(tmp_path):
+    archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip', block_records=3)
+    for n in range(7):
+        archive.put(n, response(n))
+    archive.close()
+    assert not os.path.exists(os.path.join(archive.path, PENDING_FILE))
+    reader = ArchiveReader(archive.path)
+    assert len(reader) == 7
+    assert reader.get(5) == response(5)
+    assert reader.get('missing') is None
+    assert dict(iter(reader)) == {str(n): response(n) for n in range(7)}
+
+
+def test_unclean_stop_loses_nothing(tmp_path):
+    # Killed before close: 2 blocks of 3 are written, the last 2 responses are only pending
+    archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip', block_records=3)
+    for n in range(8):
+        archive.put(n, response(n))
+    kill(archive)
+    reader = ArchiveReader(archive.path)
+    assert len(reader) == 8
+    assert set(reader.pending) == {'6', '7'}
+    assert reader.get(7) == response(7)
+    parsed = parse_archive(archive.path, 'isbn', processes=1)
+    assert sorted(parsed, key=int) == [str(n) for n in range(8)]
+
+    # A resumed run puts the pending responses in its first block
+    resumed = ResponseArchive(str(tmp_path), 'isbn', resume=True, compression='gzip', block_records=3)
+    assert resumed.path == archive.path
+    resumed.put(8, response(8))
+    resumed.close()
+    assert list_runs(str(tmp_path), 'isbn') == [archive.path]
+    reader = ArchiveReader(archive.path)
+    assert reader.pending == {}
+    assert dict(iter(reader)) == {str(n): response(n) for n in range(9)}
+
+
+def test_torn_pending_line_is_skipped(tmp_path):
+    archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip', block_records=10)
+    archive.put('a', response(1))
+    with open(os.path.join(archive.path, PENDING_FILE), 'a', encoding='utf-8') as f:
+        f.write('{"key": "b", "resp')
+    kill(archive)
+    reader = ArchiveReader(archive.path)
+    assert list(reader.keys()) == ['a']
+
+
+def test_pending_response_wins_over_older_block(tmp_path):
+    archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip', block_records=1)
+    archive.put('a', response(1))
+    archive.block_records = 10
+    archive.put('a', response(2))
+    kill(archive)
+    reader = ArchiveReader(archive.path)
+    assert len(reader) == 1
+    assert reader.get('a') == response(2)
+    assert dict(iter(reader)) == {'a': response(2)}
+
+
+def test_one_sync_for_the_responses_of_a_journal_record(tmp_path, monkeypatch):
+    archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip', block_records=10)
+    journal = Journal(str(tmp_path / 'journal.jsonl'), before_sync=archive.sync)
+    syncs = []
+    monkeypatch.setattr(os, 'fsync', lambda fd: syncs.append(fd))
+    for n in range(5):
+        archive.put(n, response(n))
+    assert syncs == []
+    journal.record_many([(str(n), {'OCLC_nr': [str(n)]}) for n in range(5)])
+    # The pending file of the archive first, then the journal
+    assert syncs == [archive._pending.fileno(), journal._file.fileno()]
+    # Nothing new in the archive: only the journal is synced
+    journal.record('5', {'OCLC_nr': []})
+    assert syncs[2:] == [journal._file.fileno()]
+    journal.close()
+    archive.close()
+
+
+def test_reuse_copies_the_newest_earlier_response(tmp_path):
+    archive_dir = tmp_path / 'archive'
+    for n, run in enumerate(['2026-01-01_000000_isbn', '2026-02-01_000000_isbn']):
+        archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip')
+        archive.put('a', response(n))
+        archive.put(f'only{n}', response(n))
+        archive.close()
+        os.rename(archive.path, archive_dir / run)
+    archive = ResponseArchive(str(tmp_path), 'isbn', compression='gzip')
+    assert archive.reuse(['a', 'only0', 'new']) == ['new']
+    archive.close()
+    # An offline rebuild of the new run has the reused keys
+    assert dict(iter(ArchiveReader(archive.path))) == {'a': response(1), 'only0': response(0)}
@@ -0,0 +1,75 @@
+# Tests of the persistent response cache (worldcat/cache.py) with a fake clock
+
+import pytest
+from worldcat import cache as cache_module
+from worldcat.cache import ResponseCache, normalize_query
+
+DAY = 86400
+FOUND = {'numberOfRecords': 1, 'briefRecords': [{'oclcNumber': '1'}]}
+EMPTY = {'numberOfRecords': 0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, 'time', clock)
+    return clock
+
+
+def test_same_query_in_another_form_is_the_same_entry():
+    assert normalize_query('/brief-bibs', 'q=BN:123&limit=10') == normalize_query('/brief-bibs', 'limit=10&q=bn:123 ')
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl=30 * DAY)
+    cache.put('/brief-bibs', 'q=bn:1', FOUND)
+    clock.now += 30 * DAY
+    assert cache.get('/brief-bibs', 'q=bn:1') == FOUND
+    clock.now += 1
+    assert cache.get('/brief-bibs', 'q=bn:1') is None
+    # An expired entry is removed: it stays gone when the clock is turned back
+    clock.now -= 10 * DAY
+    assert cache.get('/brief-bibs', 'q=bn:1') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.close()
+
+
+def test_not_found_entries_have_their_own_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl=30 * DAY, not_found_ttl=7 * DAY)
+    cache.put('/brief-bibs', 'q=bn:1', FOUND)
+    cache.put('/brief-bibs', 'q=bn:2', EMPTY)
+    assert cache.is_known_empty('/brief-bibs', 'q=bn:2')
+    # A response with records is not a known empty search
+    assert not cache.is_known_empty('/brief-bibs', 'q=bn:1')
+    clock.now += 7 * DAY + 1
+    assert not cache.is_known_empty('/brief-bibs', 'q=bn:2')
+    assert cache.get('/brief-bibs', 'q=bn:2') is None
+    assert cache.get('/brief-bibs', 'q=bn:1') == FOUND
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ResponseCache(path, max_entries=2)
+    for n in (1, 2):
+        clock.now += 1
+        cache.put('/brief-bibs', f'q=bn:{n}', FOUND)
+    # Using entry 1 makes entry 2 the least recently used one
+    clock.now += 1
+    cache.get('/brief-bibs', 'q=bn:1')
+    clock.now += 1
+    cache.put('/brief-bibs', 'q=bn:3', FOUND)
+    cache.close()
+    cache = ResponseCache(path, max_entries=2)
+    assert cache.get('/brief-bibs', 'q=bn:2') is None
+    assert cache.get('/brief-bibs', 'q=bn:1') == FOUND
+    assert cache.get('/brief-bibs', 'q=bn:3') == FOUND
+    cache.close()
@@ -0,0 +1,96 @@
+# Tests of the paging of the WorldCat client (worldcat/client.py) against a stub session
+
+import json
+import threading
+from urllib.parse import parse_qs, urlsplit
+import requests
+from worldcat.client import WorldCatClient
+
+CONFIG = {'worldcat_api_url': 'http://api', 'key': 'k', 'secret': 's', 'token_url': 'http://token', 'workers': 2}
+
+
+class StubTokens:
+    def get_token(self):
+        return 'token'
+
+    def invalidate(self):
+        pass
+
+
+class StubSession:
+    """Answers /brief-bibs with ``total`` records, numbered from 1, and lists the requests (offset, limit, thread)."""
+
+    def __init__(self, total):
+        self.total = total
+        self.requests = []
+        self.requested = threading.Condition()
+
+    def get(self, url, timeout=None):
+        params = {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+        offset, limit = int(params['offset']), int(params['limit'])
+        with self.requested:
+            self.requests.append((offset, limit, threading.current_thread()))
+            self.requested.notify_all()
+        records = [{'oclcNumber': str(n)} for n in range(offset, min(offset + limit, self.total + 1))]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({'numberOfRecords': self.total, 'briefRecords': records}).encode()
+        return response
+
+
+def client(total):
+    wc = WorldCatClient(CONFIG, ['wcapi:view_brief_bib'])
+    wc.tokens = StubTokens()
+    wc.session = StubSession(total)
+    return wc
+
+
+def numbers(records):
+    return [int(record['oclcNumber']) for record in records]
+
+
+def test_all_pages():
+    wc = client(23)
+    assert numbers(wc.iter_records('/brief-bibs', 'q=x', page_size=10)) == list(range(1, 24))
+    assert [(offset, limit) for offset, limit, _ in wc.session.requests] == [(1, 10), (11, 10), (21, 10)]
+    wc.close()
+
+
+def test_max_records_asks_only_for_the_records_that_are_needed():
+    wc = client(100)
+    assert numbers(wc.iter_records('/brief-bibs', 'q=x', page_size=10, max_records=25)) == list(range(1, 26))
+    # The last page is shorter and no page after it is requested
+    assert [(offset, limit) for offset, limit, _ in wc.session.requests] == [(1, 10), (11, 10), (21, 5)]
+    wc.close()
+
+
+def test_no_request_after_stop():
+    wc = client(100)
+    records = wc.iter_records('/brief-bibs', 'q=x', page_size=10, stop=lambda record: record['oclcNumber'] == '12')
+    assert numbers(records) == list(range(1, 13))
+    assert [offset for offset, _, _ in wc.session.requests] == [1, 11]
+    wc.close()
+
+
+def test_next_page_is_fetched_in_the_background():
+    wc = client(30)
+    session = wc.session
+    records = wc.iter_records('/brief-bibs', 'q=x', page_size=10)
+    next(records)
+    # While the first page is used, the second one is requested by the prefetch thread
+    with session.requested:
+        assert session.requested.wait_for(lambda: len(session.requests) >= 2, timeout=5)
+    assert session.requests[0][2] is threading.main_thread()
+    assert session.requests[1][0] == 11 and session.requests[1][2] is not threading.main_thread()
+    assert numbers(records) == list(range(2, 31))
+    wc.close()
+
+
+def test_closing_the_iteration_early_requests_no_more_pages():
+    wc = client(100)
+    records = wc.iter_records('/brief-bibs', 'q=x', page_size=10)
+    assert numbers(next(records) for _ in range(3)) == [1, 2, 3]
+    records.close()
+    # At most the page that was being prefetched: the iteration is over
+    assert len(wc.session.requests) <= 2
+    wc.close()
@@ -0,0 +1,29 @@
+# Tests of the shared parts of the tools (worldcat/core.py)
+
+import json
+import pytest
+import requests
+from worldcat.core import log_failed_lookup
+from worldcat.retry import CircuitOpenError
+
+
+def raising(err):
+    @log_failed_lookup
+    def lookup(listitem, key):
+        raise err
+    return lookup
+
+
+@pytest.mark.parametrize('err', [requests.exceptions.ConnectionError('down'), CircuitOpenError('open'),
+                                 json.JSONDecodeError('bad', '{', 0)])
+def test_request_errors_give_none(err):
+    assert raising(err)(0, 'key') is None
+
+
+def test_other_errors_are_not_caught():
+    with pytest.raises(KeyError):
+        raising(KeyError('briefRecords'))(0, 'key')
+
+
+def test_result_is_passed_on():
+    assert log_failed_lookup(lambda listitem, key: [key])(0, 'a') == ['a']
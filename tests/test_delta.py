@@ -0,0 +1,76 @@
+# Tests of the delta mode state (worldcat/delta.py)
+
+import pandas as pd
+from worldcat.delta import DeltaState, NEW, CHANGED, changes_table
+
+
+def rows(title):
+    return {'OCLC_nr': ['1'], 'Title': [title]}
+
+
+def test_new_changed_and_unchanged_keys(tmp_path):
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'isbn')
+    assert state.update([('a', None, rows('A')), ('b', None, rows('B'))]) == {'a': NEW, 'b': NEW}
+    state.close()
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'isbn')
+    assert state.update([('a', None, rows('A')), ('b', None, rows('B2'))]) == {'b': CHANGED}
+    assert state.changes == {NEW: 0, CHANGED: 1}
+    state.close()
+
+
+def test_fresh_keys_and_rows(tmp_path):
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'text')
+    state.update([(1, 'x AND y', rows('A')), (2, 'z', rows('B'))])
+    # Another search string for key 2: looked up again
+    fresh = state.fresh_keys({1: 'x AND y', 2: 'other', 3: 'new'})
+    assert fresh == {'1'}
+    assert state.rows(fresh) == {'1': rows('A')}
+    assert state.reused == 1
+    state.close()
+
+
+def test_stale_keys_are_not_fresh(tmp_path):
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'isbn', max_age=0)
+    state.update([('a', None, rows('A'))])
+    state.close()
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'isbn', max_age=0)
+    assert state.fresh_keys({'a': None}) == set()
+    state.close()
+
+
+def test_tools_are_kept_apart(tmp_path):
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'isbn')
+    state.update([('1', None, rows('A'))])
+    state.close()
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'pages')
+    assert state.fresh_keys({'1': None}) == set()
+    state.close()
+
+
+def test_failed_lookups_are_not_stored(tmp_path):
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'isbn')
+    assert state.update([('a', None, None)]) == {}
+    assert state.fresh_keys({'a': None}) == set()
+    state.close()
+
+
+def test_duplicate_keys_are_stored_once_with_their_own_rows(tmp_path):
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'text')
+    changes = state.update([('1', 'q1', rows('A')), ('2', 'q2', rows('B')), ('1', 'q1', rows('A')),
+                            ('3', 'q3', rows('C'))])
+    assert changes == {'1': NEW, '2': NEW, '3': NEW}
+    assert state.changes[NEW] == 3
+    assert state.rows(['1', '2', '3']) == {'1': rows('A'), '2': rows('B'), '3': rows('C')}
+    state.close()
+    # Nothing changed: the next run has no false changes
+    state = DeltaState(str(tmp_path / 'delta.sqlite'), 'text')
+    assert state.update([('1', 'q1', rows('A')), ('2', 'q2', rows('B')), ('3', 'q3', rows('C'))]) == {}
+    state.close()
+
+
+def test_changes_table_keeps_keys_without_rows():
+    frame = pd.DataFrame({'Search_ISBN': ['a', 'a', 'b', 'c'], 'Title': ['A1', 'A2', 'B', 'C']})
+    table = changes_table(frame, 'Search_ISBN', {'a': NEW, 'd': CHANGED})
+    assert table['Search_ISBN'].tolist() == ['a', 'a', 'd']
+    assert table['Change'].tolist() == [NEW, NEW, CHANGED]
+    assert table['Title'].isna().tolist() == [False, False, True]
@@ -0,0 +1,49 @@
+# Tests of the ISBN normalization and validation (worldcat/isbn.py)
+
+import numpy as np
+import pandas as pd
+from worldcat.isbn import canonical_isbn13, isbn13_numbers, normalize_isbns, unique_valid_isbns
+
+
+def test_isbn10_and_isbn13_give_the_same_canonical_code():
+    codes = ['9780306406157', '0306406152', '0-306-40615-2', '978-0-306-40615-7']
+    assert canonical_isbn13(codes).tolist() == ['9780306406157'] * 4
+
+
+def test_isbn10_with_x_check_digit():
+    assert canonical_isbn13(['080442957X', '080442957x']).tolist() == ['9780804429573'] * 2
+    # X is only allowed as the check digit
+    assert canonical_isbn13(['08044295X7']).tolist() == [None]
+
+
+def test_excel_and_prefix_leftovers_are_cleaned():
+    codes = ['9780306406157.0', 'ISBN-13: 978-0-262-13472-9', 'ISBN 0306406152', ' 9780306406157 ']
+    assert canonical_isbn13(codes).tolist() == ['9780306406157', '9780262134729', '9780306406157', '9780306406157']
+
+
+def test_invalid_codes():
+    codes = ['9780306406158', '0306406153', '12345', 'syllabus', '', None, np.nan, '97803064061570', 'ʼ9780306406157']
+    assert (isbn13_numbers(codes)[:-1] == 0).all()
+    # Characters outside Latin-1 can be cleaned away like any other separator
+    assert isbn13_numbers(codes)[-1] == 9780306406157
+
+
+def test_unique_valid_isbns_keep_input_order():
+    codes = pd.Series(['0262134721', 'not an isbn', '9780306406157', '978-0-262-13472-9', '0306406152'])
+    assert unique_valid_isbns(codes) == ['9780262134729', '9780306406157']
+
+
+def test_canonical_isbn13_keeps_the_index():
+    codes = pd.Series(['0306406152', 'x'], index=[10, 20])
+    result = canonical_isbn13(codes)
+    assert result.index.tolist() == [10, 20]
+    assert result.tolist() == ['9780306406157', None]
+
+
+def test_normalize_isbns():
+    assert normalize_isbns(['isbn: 0-8044-2957-x', None, '978 0306 406157.0']).tolist() == ['080442957X', '', '9780306406157']
+
+
+def test_numbers_and_nul_characters():
+    # Excel can turn an ISBN into a number; a NUL character is not part of the code
+    assert isbn13_numbers([9780306406157, '978030640\x006157', 306406152.0]).tolist() == [9780306406157] * 2 + [0]
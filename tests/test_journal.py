@@ -0,0 +1,111 @@
+# Tests of the write-ahead journal (worldcat/journal.py)
+
+import json
+from worldcat.journal import Journal
+
+
+def rows(n):
+    return {'OCLC_nr': [str(n)], 'Title': [f'Title {n} é']}
+
+
+def test_streaming_reads_rows_back_from_the_file(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path, keep_rows=False)
+    journal.record('1', rows(1))
+    journal.record_many([('2', rows(2)), ('3', rows(3))])
+    # Not in memory, but still there for a number that comes back in a later chunk
+    assert journal.done == {'1': None, '2': None, '3': None}
+    assert [journal.get(k) for k in '123'] == [rows(1), rows(2), rows(3)]
+    calls = []
+    lookup = journal.wrap(lambda index, item: calls.append(item) or rows(item))
+    assert lookup(0, '2') == rows(2)
+    assert lookup(1, '4') == rows('4')
+    assert calls == ['4']
+    journal.close()
+
+
+def test_streaming_resume_reads_rows_back(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    journal.record_many([('1', rows(1)), ('2', rows(2))])
+    journal.close()
+    journal = Journal(path, resume=True, keep_rows=False)
+    assert journal.done == {'1': None, '2': None}
+    assert journal.get('2') == rows(2)
+    journal.record('3', rows(3))
+    assert journal.get('3') == rows(3)
+    journal.close()
+
+
+def test_without_file_rows_stay_in_memory(tmp_path):
+    journal = Journal(None)
+    journal.record('1', rows(1))
+    assert journal.get('1') == rows(1)
+    journal.close()
+
+
+def test_resume_skips_finished_keys(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    journal.record('1', rows(1))
+    journal.close()
+    journal = Journal(path, resume=True)
+    calls = []
+    lookup = journal.wrap(lambda index, item: calls.append(item) or rows(item))
+    assert [lookup(n, k) for n, k in enumerate(['1', '2'])] == [rows(1), rows('2')]
+    assert calls == ['2']
+    journal.close()
+
+
+def test_without_resume_the_journal_is_emptied(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    journal.record('1', rows(1))
+    journal.close()
+    Journal(path).close()
+    journal = Journal(path, resume=True)
+    assert '1' not in journal
+    journal.close()
+
+
+def test_incomplete_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    journal.record('1', rows(1))
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"key": "2", "rows": {"OCLC')
+    journal = Journal(path, resume=True)
+    assert list(journal.done) == ['1']
+    journal.record('3', rows(3))
+    journal.close()
+    # The new key starts on a line of its own
+    journal = Journal(path, resume=True)
+    assert list(journal.done) == ['1', '3']
+    journal.close()
+
+
+def test_failed_lookups_go_to_the_dead_letters(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+    lookup = journal.wrap(lambda index, item: None, key=lambda index, item: f'key{index}')
+    assert lookup(0, 'search string') is None
+    journal.record_many([('a', rows('a')), ('b', None)])
+    journal.close()
+    assert set(journal.failed) == {'key0', 'b'}
+    with open(tmp_path / 'journal_dead_letters.jsonl', encoding='utf-8') as f:
+        dead = [json.loads(line) for line in f]
+    assert [(d['key'], d['item']) for d in dead] == [('key0', 'search string'), ('b', None)]
+    # Not done: a resumed run looks them up again, and gets a new dead-letter list
+    journal = Journal(path, resume=True)
+    assert 'key0' not in journal and 'b' not in journal and 'a' in journal
+    journal.close()
+    assert (tmp_path / 'journal_dead_letters.jsonl').read_text(encoding='utf-8') == ''
+
+
+def test_failed_rows_of_older_versions_are_not_done(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    path.write_text('{"key": "1", "rows": null}\n{"key": "2", "rows": {"OCLC_nr": []}}\n', encoding='utf-8')
+    journal = Journal(str(path), resume=True)
+    assert '1' not in journal and '2' in journal
+    journal.close()
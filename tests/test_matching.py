@@ -0,0 +1,28 @@
+# Tests of the title matching of the text tool (worldcat/matching.py)
+
+from difflib import SequenceMatcher
+import pytest
+from worldcat.matching import match_backend, title_similarity
+
+LEFT = ['introduction to statistics', 'the social animal', '']
+RIGHT = ['an introduction to statistics', 'social animals', 'anything']
+
+
+def test_difflib_is_the_default_and_auto_is_resolved():
+    assert match_backend() == 'difflib'
+    assert match_backend('auto') in ('rapidfuzz', 'ngram')
+    with pytest.raises(ValueError):
+        match_backend('levenshtein')
+
+
+def test_difflib_gives_the_old_scores():
+    expected = [SequenceMatcher(lambda y: y == " ", a, b).ratio() for a, b in zip(LEFT, RIGHT)]
+    assert title_similarity(LEFT, RIGHT).tolist() == expected
+
+
+@pytest.mark.parametrize('backend', ['auto', 'ngram'])
+def test_scores_between_0_and_1(backend):
+    scores = title_similarity(LEFT, RIGHT, backend=backend)
+    assert ((scores >= 0) & (scores <= 1)).all()
+    assert scores[0] > scores[2]
+    assert title_similarity(['same title'], ['same title'], backend=backend)[0] == 1
@@ -0,0 +1,41 @@
+# Tests of the run metrics (worldcat/metrics.py)
+
+import json
+from worldcat.metrics import Histogram, Metrics, export_metrics
+
+
+def test_quantiles_are_bucket_bounds():
+    h = Histogram()
+    for _ in range(98):
+        h.observe(0.003)
+    h.observe(0.2)
+    h.observe(7)
+    assert (h.quantile(0.5), h.quantile(0.95), h.quantile(0.99), h.quantile(1)) == (0.005, 0.005, 0.25, 10)
+    assert Histogram().quantile(0.99) is None
+
+
+def test_summary_has_p99(tmp_path):
+    metrics = Metrics()
+    for seconds in [0.02] * 98 + [3] * 2:
+        metrics.observe('request_seconds', seconds, endpoint='brief-bibs')
+    export_metrics({}, str(tmp_path), 'isbn', metrics)
+    with open(tmp_path / 'metrics_isbn.json') as f:
+        timings = json.load(f)['timings']['request_seconds[brief-bibs]']
+    assert (timings['count'], timings['p50'], timings['p95'], timings['p99']) == (100, 0.025, 0.025, 5)
+
+
+def test_merge_since_adds_only_what_is_new(tmp_path):
+    # The client of a batch: the second job only exports its own requests
+    client = Metrics()
+    client.inc('requests_total', 3, endpoint='brief-bibs')
+    client.observe('request_seconds', 2, endpoint='brief-bibs')
+    start = client.snapshot()
+    client.inc('requests_total', 2, endpoint='brief-bibs')
+    client.inc('requests_total', endpoint='bibs')
+    client.observe('request_seconds', 0.02, endpoint='brief-bibs')
+    metrics = Metrics()
+    metrics.merge(client, since=start)
+    assert metrics.counters == {('requests_total', (('endpoint', 'brief-bibs'),)): 2,
+                                ('requests_total', (('endpoint', 'bibs'),)): 1}
+    h = metrics.histograms[('request_seconds', (('endpoint', 'brief-bibs'),))]
+    assert (h.count, round(h.sum, 6), h.quantile(1)) == (1, 0.02, 0.025)
@@ -0,0 +1,55 @@
+# Tests of the physical description parser of the pages tool (worldcat/physical.py)
+
+import pandas as pd
+import pytest
+from worldcat.physical import PAGES, VOLUMES, HEIGHT, roman_to_int, parse_physical_descriptions
+
+DESCRIPTIONS = ['xii, 345 p.', '[8] bl.', '[8], 120 p. ; 24 cm', 'xii, 345 pages : illustrations ; 24 cm',
+                '2 delen (XVI, 812 blz.) ; 25 cm', '2 v. (xii, 800 p.) : ill. ; 24 cm', '1 online resource (xii, 345 pages)',
+                "250 pagina's", 'ix, 200 leaves', '3 vols. ; 23.5cm', '24,5 cm',
+                # Ranges: the page count is the number before the unit
+                '45-67 p.', '120-130 pages ; 21 cm', 'p. 45-67',
+                # The parts in another order than usual
+                '345 p. ; 2 v.', '24 cm, 345 p.', 'ill. ; 24 cm ; 345 p.',
+                'xii, [2], 345 p.', '1 online resource', 'None', '']
+
+
+def baseline(text):
+    """The numbers of one description with a search per pattern, the way a loop over the rows does it."""
+    m = PAGES.search(text)
+    v = VOLUMES.search(text)
+    h = HEIGHT.search(text)
+    return (int(m['pages']) if m else None,
+            roman_to_int(m['front']) if m and m['front'] else None,
+            int(v['volumes']) if v else None,
+            float(h['height'].replace(',', '.')) if h else None)
+
+
+def rows(parsed):
+    return [tuple(None if pd.isna(value) else value for value in row) for row in parsed.itertuples(index=False)]
+
+
+def test_same_numbers_as_the_baseline_parser():
+    assert rows(parse_physical_descriptions(DESCRIPTIONS)) == [baseline(text) for text in DESCRIPTIONS]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('xii, 345 p.', (345, 12, None, None)),
+    ('[8] bl.', (8, None, None, None)),
+    ('2 delen (XVI, 812 blz.) ; 25 cm', (812, 16, 2, 25.0)),
+    ('120-130 pages ; 21 cm', (130, None, None, 21.0)),
+    ('345 p. ; 2 v.', (345, None, 2, None)),
+    # "cm" is not a roman numeral of front matter pages
+    ('24 cm, 345 p.', (345, None, None, 24.0)),
+    ('None', (None, None, None, None)),
+])
+def test_numbers(text, expected):
+    assert rows(parse_physical_descriptions([text])) == [expected]
+
+
+def test_repeated_descriptions_and_index():
+    descriptions = pd.Series(['xii, 345 p.', '1 online resource', 'xii, 345 p.'], index=[5, 6, 7])
+    parsed = parse_physical_descriptions(descriptions)
+    assert parsed.index.tolist() == [5, 6, 7]
+    assert parsed['Pages'].tolist() == [345, pd.NA, 345]
+    assert len(parse_physical_descriptions([])) == 0
@@ -0,0 +1,83 @@
+# Tests of the relaxed searches of the text tool (worldcat/query_planner.py)
+
+import numpy as np
+from worldcat.cache import ResponseCache
+from worldcat.query_planner import QueryPlanner
+
+# 'guide' is in every file name and 'data' in two: they are dropped first
+WORD_LISTS = [['statistics', 'data', 'analysis', 'guide'], ['data', 'science', 'guide'], ['chemistry', 'guide']]
+
+
+def test_plan_drops_the_year_then_the_most_common_words():
+    planner = QueryPlanner(WORD_LISTS)
+    assert planner.plan(WORD_LISTS[0], 2019) == [
+        'statistics AND data AND analysis AND guide AND yr:2019',
+        'statistics AND data AND analysis AND guide',
+        'statistics AND data AND analysis',
+        'statistics AND analysis',
+        'ti:"statistics data analysis guide"',
+    ]
+
+
+def test_plan_drops_the_shortest_of_equally_common_words():
+    planner = QueryPlanner([['history', 'art', 'modern']])
+    assert planner.plan(['history', 'art', 'modern'])[:2] == ['history AND art AND modern', 'history AND modern']
+
+
+def test_plan_without_a_year():
+    planner = QueryPlanner(WORD_LISTS)
+    for year in (None, np.nan, 'nan'):
+        assert planner.plan(WORD_LISTS[2], year) == ['chemistry AND guide', 'ti:"chemistry guide"']
+
+
+def test_title_phrase_has_the_first_words():
+    planner = QueryPlanner(WORD_LISTS, phrase_words=2)
+    assert planner.plan(WORD_LISTS[0])[-1] == 'ti:"statistics data"'
+
+
+def test_without_relaxation_only_the_strict_search():
+    planner = QueryPlanner(WORD_LISTS, relax=False)
+    assert planner.plan(WORD_LISTS[1], 2020) == ['data AND science AND guide AND yr:2020']
+    assert planner.plan(WORD_LISTS[1]) == ['data AND science AND guide']
+
+
+def searcher(found):
+    """A search function with records for the queries in ``found``; it lists what was sent."""
+    sent = []
+
+    def search(query):
+        sent.append(query)
+        return [{'oclcNumber': '1'}] if query in found else []
+    return search, sent
+
+
+def test_run_returns_the_first_search_with_records():
+    planner = QueryPlanner(WORD_LISTS)
+    search, sent = searcher({'statistics AND analysis'})
+    assert planner.run(WORD_LISTS[0], 2019, search) == ('statistics AND analysis', [{'oclcNumber': '1'}])
+    assert sent == planner.plan(WORD_LISTS[0], 2019)[:4]
+    assert (planner.sent, planner.skipped) == (4, 0)
+
+
+def test_empty_searches_are_not_sent_again():
+    planner = QueryPlanner(WORD_LISTS)
+    search, sent = searcher(set())
+    assert planner.run(['guide', 'chemistry'], None, search) == (None, [])
+    # The same search with the words in another order and case is known to be empty; a
+    # title phrase in another word order is another search
+    sent.clear()
+    assert planner.run(['Chemistry', 'Guide'], None, search) == (None, [])
+    assert sent == ['ti:"Chemistry Guide"']
+    assert planner.skipped == 1
+
+
+def test_empty_searches_are_remembered_in_the_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    search, sent = searcher(set())
+    QueryPlanner(WORD_LISTS, cache=cache).run(WORD_LISTS[2], None, search)
+    # A later run with a new planner
+    planner = QueryPlanner(WORD_LISTS, cache=cache)
+    sent.clear()
+    assert planner.run(WORD_LISTS[2], None, search) == (None, [])
+    assert sent == [] and planner.skipped == 2
+    cache.close()
@@ -0,0 +1,34 @@
+# Tests of the offline rebuild (worldcat/rebuild.py)
+
+import pytest
+from worldcat.archive import ResponseArchive
+from worldcat.rebuild import OfflineResponses, MissingResponsesError
+
+
+def make_archive(folder):
+    archive = ResponseArchive(str(folder), 'isbn', compression='gzip')
+    archive.put('9780306406157', {'numberOfRecords': 1, 'briefRecords': [{'oclcNumber': '1', 'title': 'A'}]})
+    archive.close()
+    return archive.path
+
+
+def test_lookup_gives_the_rows_of_the_archive(tmp_path):
+    offline = OfflineResponses(make_archive(tmp_path), 'isbn', processes=1)
+    assert offline.lookup(0, '9780306406157')['OCLC_nr'] == ['1']
+    offline.check()
+
+
+def test_missing_keys_fail_the_rebuild(tmp_path):
+    offline = OfflineResponses(make_archive(tmp_path), 'isbn', processes=1)
+    assert offline.lookup(1, '9780131103627') is None
+    assert offline.lookup(2, '9780131103627') is None
+    assert list(offline.missing) == ['9780131103627']
+    with pytest.raises(MissingResponsesError, match='9780131103627'):
+        offline.check()
+
+
+def test_missing_keys_allowed(tmp_path):
+    offline = OfflineResponses(make_archive(tmp_path), 'isbn', processes=1, allow_missing=True)
+    offline.lookup(1, '9780131103627')
+    offline.check()
+    assert len(offline.missing) == 1
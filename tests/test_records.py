@@ -0,0 +1,95 @@
+# Tests of the assignment of batched search results to ISBNs (worldcat/records.py, worldcat/isbn_tool.py)
+
+from datetime import datetime
+import pandas as pd
+from worldcat import isbn_tool
+from worldcat.metrics import Metrics
+from worldcat.records import match_records_to_isbns
+
+# The same books as ISBN-13 and as ISBN-10
+STATS, STATS10 = '9780306406157', '0306406152'
+ML, ML10 = '9780262134729', '0262134721'
+CHEM = '9780804429573'
+
+
+def record(oclc, *isbns):
+    return {'oclcNumber': oclc, 'title': f'Title {oclc}', 'isbns': list(isbns)}
+
+
+def test_one_record_can_belong_to_several_isbns():
+    both = record('1', STATS, ML)
+    stats = record('2', STATS)
+    matched, unmatched = match_records_to_isbns([both, stats], [STATS, ML, CHEM])
+    assert matched == {STATS: [both, stats], ML: [both], CHEM: []}
+    assert unmatched == []
+
+
+def test_isbn10_and_hyphenated_forms_match_the_isbn13():
+    records = [record('1', STATS10), record('2', '978-0-262-13472-9', ML10), record('3', '080442957x')]
+    matched, unmatched = match_records_to_isbns(records, [STATS, ML, CHEM])
+    # A record that lists a book twice (10 and 13 digits) is assigned to it once
+    assert matched == {STATS: [records[0]], ML: [records[1]], CHEM: [records[2]]}
+
+
+def test_records_without_a_search_isbn_are_unmatched():
+    records = [record('1', STATS), record('2'), record('3', '9781234567897'), {'oclcNumber': '4'}]
+    matched, unmatched = match_records_to_isbns(records, [STATS, ML])
+    assert matched == {STATS: [records[0]], ML: []}
+    assert unmatched == records[1:]
+
+
+class FakeClient:
+    """The parts of WorldCatClient the ISBN tool uses, with fixed answers and a list of the requests."""
+
+    workers = 1
+    cache = None
+
+    def __init__(self, batch_records, single_records):
+        self.batch_records = batch_records
+        self.single_records = single_records
+        self.searches = []
+        self.gets = []
+        self.metrics = Metrics()
+
+    def iter_records(self, path, query, page_size=50, **kwargs):
+        self.searches.append(query)
+        return iter(self.batch_records)
+
+    def get(self, path, query):
+        isbn = query.split('&')[0].replace('q=bn:', '')
+        self.gets.append(isbn)
+        records = self.single_records.get(isbn, [])
+        return {'numberOfRecords': len(records), 'briefRecords': records}
+
+    def update_metrics(self):
+        pass
+
+    def metrics_snapshot(self):
+        return self.metrics.snapshot()
+
+
+def run_batched(tmp_path, monkeypatch, client, isbns):
+    # The tool makes its output folder in the working folder
+    monkeypatch.chdir(tmp_path)
+    excelfile = tmp_path / 'isbns.xlsx'
+    pd.DataFrame({'ISBN': isbns, 'Publisher': [None] * len(isbns)}).to_excel(excelfile, sheet_name='S', index=False)
+    isbn_tool.run(client, {'batch_size': 10}, str(excelfile), 'S', folder=str(tmp_path / 'out'),
+                  journal_file=str(tmp_path / 'journal.jsonl'))
+    runday = datetime.today().date()
+    return pd.read_csv(tmp_path / 'out' / f'WorldCat_Book_list_{runday}.txt', sep='\t', dtype=str)
+
+
+def test_batch_without_unmatched_records_needs_no_single_lookups(tmp_path, monkeypatch):
+    client = FakeClient([record('1', STATS10, ML), record('2', STATS)], {})
+    books = run_batched(tmp_path, monkeypatch, client, [STATS, ML10, CHEM])
+    assert len(client.searches) == 1 and client.gets == []
+    assert sorted(zip(books['Search_ISBN'], books['Title'])) == [(ML, 'Title 1'), (STATS, 'Title 1'), (STATS, 'Title 2')]
+
+
+def test_unmatched_records_make_the_isbns_without_records_be_looked_up_alone(tmp_path, monkeypatch):
+    # Record 2 lists no ISBN: it may belong to ML or CHEM, so those are searched on their own
+    client = FakeClient([record('1', STATS), record('2')], {ML: [record('3', ML)]})
+    books = run_batched(tmp_path, monkeypatch, client, [STATS, ML, CHEM])
+    assert sorted(client.gets) == [ML, CHEM]
+    assert sorted(zip(books['Search_ISBN'], books['Title'])) == [(ML, 'Title 3'), (STATS, 'Title 1')]
+    assert (tmp_path / 'out' / 'ISBNs_not_found.txt').read_text() == f'{CHEM}, '
@@ -0,0 +1,170 @@
+# Tests of the retries and the circuit breaker (worldcat/retry.py)
+
+import time
+import threading
+import pytest
+import requests
+from worldcat.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f'{status} error', response=response)
+
+
+def failing(*errors, result='ok'):
+    """A request function that raises the errors one by one and then returns ``result``."""
+    errors = list(errors)
+
+    def request():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return request
+
+
+def open_breaker(cooldown=0.05):
+    breaker = CircuitBreaker(threshold=2, cooldown=cooldown)
+    breaker.failure()
+    breaker.failure()
+    return breaker
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    breaker.failure()
+    assert breaker.before_request() is False
+    breaker.failure()
+    assert breaker.opened == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(wait=False)
+
+
+def test_breaker_trial_closes_on_success():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.before_request() is True
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(wait=False)
+    breaker.success()
+    assert breaker.before_request() is False
+
+
+def test_breaker_failed_trial_opens_again():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.before_request() is True
+    breaker.failure()
+    assert breaker.opened == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(wait=False)
+
+
+def test_workers_wait_for_the_trial_while_breaker_is_open():
+    # One outage does not fail the waiting items: one trial, then all requests go through
+    policy = RetryPolicy(max_retries=0, breaker=open_breaker(cooldown=0.1))
+    sent = []
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            sent.append(time.monotonic())
+            if len(sent) == 1:
+                # The trial is slow: the others must wait for it, not for the cooldown alone
+                time.sleep(0.05)
+        return 'ok'
+
+    start = time.monotonic()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(policy.call(request))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['ok'] * 5
+    assert sent[0] - start >= 0.09
+    # Only after the trial closed the breaker
+    assert all(t - sent[0] >= 0.04 for t in sent[1:])
+    assert policy.breaker.opened == 1
+
+
+def test_failed_trial_makes_the_workers_wait_another_cooldown():
+    policy = RetryPolicy(max_retries=1, backoff=0, breaker=open_breaker(cooldown=0.05))
+    start = time.monotonic()
+    assert policy.call(failing(requests.exceptions.ConnectionError())) == 'ok'
+    assert time.monotonic() - start >= 0.09
+    assert policy.breaker.opened == 2
+
+
+def test_breaker_off_without_threshold():
+    breaker = CircuitBreaker(threshold=0)
+    for _ in range(100):
+        breaker.failure()
+    assert breaker.before_request() is False
+
+
+def test_trial_with_client_error_closes_breaker():
+    # A 404 is an answer of the API: the breaker closes and the error goes to the caller
+    policy = RetryPolicy(max_retries=0, breaker=open_breaker())
+    time.sleep(0.06)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(failing(http_error(404)))
+    assert policy.call(failing()) == 'ok'
+
+
+def test_trial_with_other_error_lets_next_request_try():
+    # A bad JSON answer says nothing about the API, but the breaker must not wait for the trial forever
+    policy = RetryPolicy(max_retries=0, breaker=open_breaker())
+    time.sleep(0.06)
+    with pytest.raises(ValueError):
+        policy.call(failing(ValueError('bad json')))
+    assert policy.call(failing()) == 'ok'
+
+
+def test_retries_temporary_errors():
+    policy = RetryPolicy(max_retries=3, backoff=0.001, breaker=CircuitBreaker(threshold=10))
+    request = failing(http_error(503), requests.exceptions.ConnectionError(), http_error(500))
+    assert policy.call(request) == 'ok'
+    assert policy.retries == 3
+    assert policy.breaker.failures == 0
+
+
+def test_gives_up_after_max_retries():
+    policy = RetryPolicy(max_retries=1, backoff=0.001)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(failing(http_error(502), http_error(502)))
+    assert policy.retries == 1
+
+
+def test_client_error_is_not_retried():
+    policy = RetryPolicy(max_retries=3, backoff=0.001)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(failing(http_error(400)))
+    assert policy.retries == 0
+
+
+def test_unauthorized_gets_one_retry_with_new_token():
+    calls = []
+    policy = RetryPolicy(max_retries=3, backoff=0.001, on_unauthorized=lambda: calls.append(1))
+    assert policy.call(failing(http_error(401))) == 'ok'
+    assert calls == [1]
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(failing(http_error(401), http_error(401)))
+
+
+def test_retry_after_is_the_minimum_wait():
+    policy = RetryPolicy(backoff=0.001, backoff_max=0.001)
+    assert policy.delay(0, retry_after=2) == 2
+
+
+def test_retries_counted_from_all_threads():
+    policy = RetryPolicy(max_retries=5, backoff=0)
+    threads = [threading.Thread(target=policy.call, args=(failing(*[http_error(503)] * 5),)) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert policy.retries == 100
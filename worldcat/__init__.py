@@ -0,0 +1,16 @@
+# WorldCat tools: publisher, text search and page number data from the OCLC WorldCat Search API
+# Author: Mark Bruyneel
+#
+# The tools are started with the worldcat command (see worldcat/cli.py). This file is
+# kept small so the command starts quickly; pandas etc. are imported by the tools
+#
+# Date: 2026-10-17
+# Version: 2.0
+# Created using Python version 3.10
+
+__version__ = '2.0'
+
+# Location of the config file with the WorldCat Search API key and secret
+DEFAULT_CONFIG = r'U:\Werk\OWO\WC_Search_config.yml'
+# The pages tool has always used its own copy
+PAGES_CONFIG = r'U:\Werk\OWO\AIP\WC_Search_config.yml'
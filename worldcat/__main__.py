@@ -0,0 +1,5 @@
+# Makes `python -m worldcat isbn` etc. work next to the worldcat command
+import sys
+from worldcat.cli import main
+
+sys.exit(main())
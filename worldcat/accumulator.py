@@ -0,0 +1,78 @@
+# Columnar record accumulator for the WorldCat tools
+# Rows are collected in one growing buffer per column and turned into a single
+# DataFrame at the end, instead of a pd.concat onto a growing table for every item
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+from array import array
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+# array typecodes for the typed column buffers and the matching numpy types
+TYPECODES = {'int64': ('q', np.int64), 'float64': ('d', np.float64)}
+
+
+class ColumnAccumulator:
+    """Append-only table with one buffer per column.
+
+    Appending is amortized O(1) per value: object columns are Python lists and
+    columns given a dtype ('int64' or 'float64') in ``dtypes`` are compact
+    array.array buffers. ``to_frame`` builds the DataFrame once at the end.
+    """
+
+    def __init__(self, columns, dtypes=None):
+        dtypes = dtypes or {}
+        self.columns = list(columns)
+        self.dtypes = {c: dtypes.get(c) for c in self.columns}
+        self._data = {}
+        for c in self.columns:
+            if self.dtypes[c] is not None:
+                self._data[c] = array(TYPECODES[self.dtypes[c]][0])
+            else:
+                self._data[c] = []
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def append(self, *values, **named):
+        """Add one row, given in column order or by column name."""
+        if values:
+            named = dict(zip(self.columns, values))
+        for c in self.columns:
+            self._data[c].append(named[c])
+        self._rows += 1
+
+    def extend(self, columns):
+        """Add several rows at once from a dict of equally long lists per column.
+
+        A column that is not a list (e.g. the search key) is repeated for every row.
+        """
+        lengths = {len(v) for v in columns.values() if isinstance(v, (list, tuple, array))}
+        if len(lengths) > 1:
+            raise ValueError(f'Columns have different lengths: {sorted(lengths)}')
+        n = lengths.pop() if lengths else 1
+        for c in self.columns:
+            value = columns[c]
+            if isinstance(value, (list, tuple, array)):
+                self._data[c].extend(value)
+            else:
+                self._data[c].extend([value] * n)
+        self._rows += n
+
+    def to_frame(self):
+        """Return all rows as one DataFrame."""
+        data = {}
+        for c in self.columns:
+            if self.dtypes[c] is not None:
+                data[c] = np.frombuffer(self._data[c], dtype=TYPECODES[self.dtypes[c]][1]).copy()
+            else:
+                data[c] = self._data[c]
+        return pd.DataFrame(data, columns=self.columns)
+
+    def to_arrow(self):
+        """Return all rows as a pyarrow Table (needs the optional pyarrow package)."""
+        import pyarrow as pa
+        return pa.Table.from_pandas(self.to_frame(), preserve_index=False)
@@ -0,0 +1,362 @@
+# Archive of the raw API responses of the WorldCat tools
+# Instead of one json file per ISBN, Material id or OCLC number (and moving all of them
+# to a backup folder at the next start) every run appends its responses to one archive:
+# compressed JSON lines segments plus an index with the place of every response, so a
+# single response can be read back without decompressing the whole archive
+#
+# An archive is a folder <folder>\archive\<date>_<time>_<tool> with:
+#   responses-0001.jsonl.zst   blocks of responses, every block a separate zstd frame
+#                              (.jsonl.gz with gzip members when zstandard is not installed);
+#                              zstd -dc / zcat of a segment gives the JSON lines
+#   index.jsonl                per response: key, segment, offset and length of its block
+#                              and its line in the block
+#   pending.jsonl              the responses of the block that is not written yet, one per
+#                              line with its key; synced by the journal (one sync for all
+#                              responses since the last one) before it marks the keys as
+#                              done, so a crash loses nothing (a resumed run and the reader
+#                              take them from here)
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import gzip
+import json
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+from .core import backup_json_files
+
+# archive_compression in the config file: 'auto' uses zstd when the optional zstandard
+# package is installed and gzip (standard library) otherwise
+COMPRESSIONS = ('auto', 'zstd', 'gzip')
+EXTENSIONS = {'zstd': '.jsonl.zst', 'gzip': '.jsonl.gz'}
+# Responses per compressed block: a larger block compresses better, a smaller one is
+# faster to read back one response from
+BLOCK_RECORDS = 100
+# A new segment file is started after this many bytes
+SEGMENT_BYTES = 256 * 2 ** 20
+INDEX_FILE = 'index.jsonl'
+PENDING_FILE = 'pending.jsonl'
+
+
+def _codec(compression):
+    """Return the name, compress and decompress functions of a compression."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f'Unknown archive_compression {compression!r}, use one of: {", ".join(COMPRESSIONS)}')
+    if compression in ('auto', 'zstd'):
+        try:
+            import zstandard  # optional, version 0.22 or later
+        except ImportError:
+            if compression == 'zstd':
+                raise
+        else:
+            return 'zstd', zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    return 'gzip', lambda data: gzip.compress(data, compresslevel=6), gzip.decompress
+
+
+def read_block(path, segment, offset, length):
+    """Return the JSON lines of one block of a segment in the archive folder ``path``."""
+    decompress = _codec('zstd' if segment.endswith(EXTENSIONS['zstd']) else 'gzip')[2]
+    with open(os.path.join(path, segment), 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    return decompress(data).decode('utf-8').split('\n')
+
+
+def _sync(file):
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def _pending_line(key, line):
+    return '{"key": ' + json.dumps(key) + ', "response": ' + line + '}\n'
+
+
+def read_pending(path):
+    """The responses in the pending file of the archive ``path`` as {key: response}."""
+    pending = {}
+    try:
+        with open(os.path.join(path, PENDING_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line can be incomplete if the run was killed while writing it
+                    continue
+                pending[entry['key']] = entry['response']
+    except FileNotFoundError:
+        pass
+    return pending
+
+
+def list_runs(folder, tool=None):
+    """Archive folders of the runs in ``folder`` (of one tool if given), oldest first."""
+    archive = Path(folder) / 'archive'
+    if not archive.is_dir():
+        return []
+    runs = [p for p in archive.iterdir() if p.is_dir() and (tool is None or p.name.endswith('_' + tool))]
+    # The names start with the date and time, so sorting by name is sorting by age
+    return sorted(str(p) for p in runs)
+
+
+def remove_old_runs(folder, tool, keep):
+    """Remove the archives of ``tool`` in ``folder`` except the newest ``keep``."""
+    runs = list_runs(folder, tool)
+    for run in runs[:max(0, len(runs) - keep)]:
+        shutil.rmtree(run)
+        logger.debug(f'Removed response archive {run}')
+
+
+class ResponseArchive:
+    """Writer of the response archive of one run; ``put`` may be called from several threads.
+
+    Without ``resume`` a new archive folder is made for the run; with ``resume`` the last
+    archive of the tool is continued in a new segment. ``keep_runs`` removes the archives
+    of older runs of the tool (all are kept when it is None).
+    """
+
+    def __init__(self, folder, tool, resume=False, compression='auto', keep_runs=None,
+                 block_records=BLOCK_RECORDS):
+        self.folder = folder
+        self.tool = tool
+        runs = list_runs(folder, tool)
+        if resume and runs:
+            self.path = runs[-1]
+        else:
+            self.path = os.path.join(folder, 'archive', datetime.now().strftime('%Y-%m-%d_%H%M%S_') + tool)
+        Path(self.path).mkdir(parents=True, exist_ok=True)
+        if keep_runs:
+            remove_old_runs(folder, tool, keep_runs)
+        self.compression, self._compress, _ = _codec(compression)
+        self.block_records = block_records
+        self._lock = threading.Lock()
+        # Continue after the segments that are already there (when resuming)
+        self._segment = len([f for f in os.listdir(self.path) if f.startswith('responses-')])
+        self._file = None
+        self._new_segment()
+        self._index = open(os.path.join(self.path, INDEX_FILE), 'a', encoding='utf-8')
+        # The responses of a run that stopped before their block was written go into the first block
+        self._block = [(key, json.dumps(response)) for key, response in read_pending(self.path).items()]
+        self.count = len(self._block)
+        self._pending = open(os.path.join(self.path, PENDING_FILE), 'w', encoding='utf-8')
+        self._pending.write(''.join(_pending_line(key, line) for key, line in self._block))
+        _sync(self._pending)
+        # Responses in the pending file that are not synced yet
+        self._unsynced = False
+        # Readers of the archives of earlier runs, newest first, opened when reuse needs them
+        self._earlier = []
+        self._earlier_runs = None
+
+    def _new_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._segment += 1
+        self.segment_name = f'responses-{self._segment:04d}' + EXTENSIONS[self.compression]
+        self._file = open(os.path.join(self.path, self.segment_name), 'ab')
+
+    def put(self, key, response):
+        """Add the response for ``key`` (e.g. an ISBN); a later response for the same key wins.
+
+        The response goes into the pending file until its block is written; it is on disk
+        after the next ``sync``, which the journal calls before it marks keys as done.
+        """
+        line = json.dumps(response)
+        with self._lock:
+            self._block.append((str(key), line))
+            self._pending.write(_pending_line(str(key), line))
+            self._unsynced = True
+            self.count += 1
+            if len(self._block) >= self.block_records:
+                self._flush()
+
+    def _earlier_readers(self):
+        if self._earlier_runs is None:
+            self._earlier_runs = [run for run in reversed(list_runs(self.folder, self.tool)) if run != self.path]
+        yield from self._earlier
+        while self._earlier_runs:
+            reader = ArchiveReader(self._earlier_runs.pop(0))
+            self._earlier.append(reader)
+            yield reader
+
+    def reuse(self, keys):
+        """Copy the newest responses of ``keys`` from the archives of earlier runs into this one.
+
+        For the keys that delta mode takes from the state file without a lookup (see
+        delta.py), so an offline rebuild of this run has their responses too. Returns the
+        keys that none of the earlier archives has.
+        """
+        left = [str(key) for key in keys]
+        for reader in self._earlier_readers():
+            if not left:
+                break
+            for key in left:
+                if key in reader:
+                    self.put(key, reader.get(key))
+            left = [key for key in left if key not in reader]
+        if left:
+            logger.warning(f'No archived response of an earlier run for {len(left)} keys taken from the delta state; '
+                           f'an offline rebuild of this run leaves them out')
+        return left
+
+    def sync(self):
+        """Make sure all responses that were put are on disk, with one sync for all of them."""
+        with self._lock:
+            if self._unsynced:
+                _sync(self._pending)
+                self._unsynced = False
+
+    def _flush(self):
+        if not self._block:
+            return
+        data = self._compress(('\n'.join(line for _, line in self._block) + '\n').encode('utf-8'))
+        offset = self._file.tell()
+        self._file.write(data)
+        self._file.flush()
+        # The index is written after the block, so an entry always points at a whole block
+        self._index.write(''.join(json.dumps({'key': key, 'segment': self.segment_name, 'offset': offset,
+                                              'length': len(data), 'line': n}) + '\n'
+                                  for n, (key, _) in enumerate(self._block)))
+        self._index.flush()
+        os.fsync(self._file.fileno())
+        _sync(self._index)
+        # The block is on disk now, so its responses are not pending any more
+        self._block = []
+        self._pending.seek(0)
+        self._pending.truncate()
+        self._unsynced = False
+        if self._file.tell() >= SEGMENT_BYTES:
+            self._new_segment()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.close()
+            self._index.close()
+            self._pending.close()
+            os.remove(os.path.join(self.path, PENDING_FILE))
+        logger.debug(f'{self.count} responses archived in {self.path}')
+
+
+class ArchiveReader:
+    """Read the responses of one archive folder by key, or all of them in order.
+
+    Only the block with the response is read and decompressed; the last block is kept,
+    so reading the responses of one block one after the other decompresses it once.
+    The responses in the pending file of a run that did not close its archive are read too.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line can be incomplete if the run was killed while writing it
+                    continue
+                self._entries[entry['key']] = entry
+        # Newer than the blocks in the index: a pending response wins
+        self.pending = read_pending(path)
+        for key in self.pending:
+            self._entries.pop(key, None)
+        self._last_block = (None, None)
+
+    def __len__(self):
+        return len(self._entries) + len(self.pending)
+
+    def __contains__(self, key):
+        return str(key) in self._entries or str(key) in self.pending
+
+    def keys(self):
+        return list(self._entries) + list(self.pending)
+
+    def _lines(self, segment, offset, length):
+        if self._last_block[0] != (segment, offset):
+            self._last_block = ((segment, offset), read_block(self.path, segment, offset, length))
+        return self._last_block[1]
+
+    def _ordered(self):
+        return sorted(self._entries.values(), key=lambda e: (e['segment'], e['offset'], e['line']))
+
+    def blocks(self):
+        """Return (segment, offset, length, [(line, key), ...]) for every block, in the order they were written.
+
+        Only the responses that count are listed: of a key that was written more than
+        once (a resumed run) the last response. The pending responses are not in a block.
+        """
+        blocks = {}
+        for entry in self._ordered():
+            blocks.setdefault((entry['segment'], entry['offset'], entry['length']), []).append((entry['line'], entry['key']))
+        return [(segment, offset, length, lines) for (segment, offset, length), lines in blocks.items()]
+
+    def get(self, key, default=None):
+        """Return the response for ``key``, or ``default`` if it is not in the archive."""
+        if str(key) in self.pending:
+            return self.pending[str(key)]
+        entry = self._entries.get(str(key))
+        if entry is None:
+            return default
+        return json.loads(self._lines(entry['segment'], entry['offset'], entry['length'])[entry['line']])
+
+    def __iter__(self):
+        """Yield (key, response) for all keys, block by block in the order they were written, pending ones last."""
+        for entry in self._ordered():
+            yield entry['key'], json.loads(self._lines(entry['segment'], entry['offset'], entry['length'])[entry['line']])
+        yield from self.pending.items()
+
+
+class JsonFiles:
+    """The old way: one json file per key in ``folder``, with the same ``put`` as the archive.
+
+    The json files of the previous run are moved to ``backup_folder`` at the start,
+    unless the run is resumed.
+    """
+
+    def __init__(self, folder, backup_folder, resume=False):
+        self.path = folder
+        self.backup_folder = backup_folder
+        if not resume:
+            backup_json_files(folder, backup_folder)
+
+    def put(self, key, response):
+        with open(os.path.join(self.path, f'{key}.json'), 'w') as f:
+            f.write(json.dumps(response))
+
+    def reuse(self, keys):
+        """Copy the json files of ``keys`` back from the backup of the previous run; returns the keys without one."""
+        left = []
+        for key in keys:
+            source = os.path.join(self.backup_folder, f'{key}.json')
+            if os.path.isfile(source):
+                shutil.copyfile(source, os.path.join(self.path, f'{key}.json'))
+            else:
+                left.append(str(key))
+        return left
+
+    def sync(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_responses(config, folder, tool, backup_folder, resume=False):
+    """Return the store for the raw responses of a run, as set with response_store in the config file.
+
+    'archive' (default) gives a ResponseArchive in ``folder``, 'json' the json files of
+    earlier versions with the backup of the previous run in ``backup_folder``.
+    """
+    store = config.get('response_store', 'archive')
+    if store == 'json':
+        return JsonFiles(folder, backup_folder, resume=resume)
+    if store != 'archive':
+        raise ValueError(f"Unknown response_store {store!r}, use 'archive' or 'json'")
+    keep_runs = config.get('archive_keep_runs')
+    return ResponseArchive(folder, tool, resume=resume, compression=config.get('archive_compression', 'auto'),
+                           keep_runs=int(keep_runs) if keep_runs else None)
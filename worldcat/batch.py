@@ -0,0 +1,168 @@
+# Batch runner of the WorldCat tools
+# Runs the jobs in a job file (YAML) in one process, without questions: e.g. the ISBN and
+# text searches of all faculty sheets of the nightly run. The jobs share the session,
+# access token, connection pool and response cache of one WorldCatClient per config
+# file, and independent jobs can run at the same time. Started with: worldcat batch
+#
+# A job file looks like:
+#
+# config: U:\Werk\OWO\WC_Search_config.yml    (optional, config file of all jobs)
+# output: U:\Werk\OWO\Batch                   (optional, every job gets a folder in here)
+# parallel: 2                                 (optional, number of jobs that run at once)
+# jobs:
+#   - name: fgw_isbn
+#     tool: isbn
+#     input: U:\Werk\OWO\Input\FGW.xlsx
+#     sheet: Sheet1
+#   - name: fgw_text
+#     tool: text
+#     input: U:\Werk\OWO\Input\FGW.xlsx
+#     sheet: Sheet1
+#   - name: fgw_pages
+#     tool: pages
+#     input: U:\Werk\OWO\Batch\fgw_isbn\WorldCat_All_Editions_data.txt
+#     after: [fgw_isbn]
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+from . import DEFAULT_CONFIG, PAGES_CONFIG
+from .core import load_config, RunTimer
+from .rebuild import open_offline, MissingResponsesError
+
+# Tool: (module with run() and SCOPE, default config file)
+TOOLS = {
+    'isbn': ('worldcat.isbn_tool', DEFAULT_CONFIG),
+    'text': ('worldcat.text_tool', DEFAULT_CONFIG),
+    'pages': ('worldcat.pages_tool', PAGES_CONFIG),
+}
+# Every job writes its json files, results and journal to a folder with its name in here
+OUTPUT_FOLDER = r'U:\Werk\OWO\Batch'
+
+
+def load_jobs(path, config=None):
+    """Read a job file and return (parallel, jobs) with the defaults of every job filled in.
+
+    ``config`` is the config file from the command line; a config in the job file or in
+    a job comes first. Mistakes in the job file are reported before anything runs.
+    """
+    import yaml
+    with open(path, 'r') as stream:
+        spec = yaml.safe_load(stream) or {}
+    output = spec.get('output', OUTPUT_FOLDER)
+    jobs = []
+    names = set()
+    for number, job in enumerate(spec.get('jobs') or [], start=1):
+        tool = job.get('tool')
+        if tool not in TOOLS:
+            raise ValueError(f'Job {number} in {path}: unknown tool {tool!r}, use one of: {", ".join(TOOLS)}')
+        if not job.get('input'):
+            raise ValueError(f'Job {number} in {path}: no input file')
+        if tool != 'pages' and not job.get('sheet'):
+            raise ValueError(f'Job {number} in {path}: the {tool} tool needs the sheet name of the Excel file')
+        name = str(job.get('name') or f'{number:02d}_{tool}')
+        if name in names:
+            raise ValueError(f'Job {number} in {path}: the name {name} is used twice')
+        after = job.get('after') or []
+        after = [after] if isinstance(after, str) else [str(a) for a in after]
+        for earlier in after:
+            # Only earlier jobs, so a job never waits for a job that has not started yet
+            if earlier not in names:
+                raise ValueError(f'Job {name} in {path}: runs after {earlier}, which is not an earlier job')
+        names.add(name)
+        jobs.append({'name': name, 'tool': tool, 'input': job['input'], 'sheet': job.get('sheet'),
+                     'config': job.get('config') or spec.get('config') or config or TOOLS[tool][1],
+                     'output': job.get('output') or os.path.join(output, name),
+                     'after': after})
+    if not jobs:
+        raise ValueError(f'No jobs in {path}')
+    return int(spec.get('parallel', 1)), jobs
+
+
+def run_jobs(jobs, parallel=1, resume=False, offline=False, processes=None, allow_missing=False):
+    """Run the jobs and return a dict with the name and True/False (finished or not) per job.
+
+    One WorldCatClient is made per config file, with the login scopes of all tools that
+    use it. With ``parallel`` > 1 that many jobs run at the same time; a job with ``after``
+    waits for those jobs and is skipped if one of them did not finish. With ``offline``
+    every job rebuilds its result files from the last response archive in its folder
+    (see rebuild.py) and no client is made at all; a job with input rows without an
+    archived response does not finish, unless ``allow_missing``.
+    """
+    modules = {tool: importlib.import_module(TOOLS[tool][0]) for tool in {job['tool'] for job in jobs}}
+    # Config file: login scopes of the jobs that use it
+    scopes = {}
+    for job in jobs:
+        scopes.setdefault(job['config'], [])
+        scopes[job['config']] += [s for s in modules[job['tool']].SCOPE if s not in scopes[job['config']]]
+    from .client import WorldCatClient
+    clients = {}
+    for path, scope in scopes.items():
+        config = load_config(path)
+        clients[path] = (None if offline else WorldCatClient(config, scope, jobs=parallel), config)
+
+    futures = {}
+
+    def run_job(job):
+        for earlier in job['after']:
+            if not futures[earlier].result():
+                logger.warning(f'Job {job["name"]} is skipped because job {earlier} did not finish')
+                return False
+        wc, config = clients[job['config']]
+        inputs = [job['input']] if job['tool'] == 'pages' else [job['input'], job['sheet']]
+        started = datetime.now()
+        logger.debug(f'Job {job["name"]} started: {job["tool"]} {" ".join(str(i) for i in inputs)}')
+        try:
+            if offline:
+                rebuild = open_offline(config, job['output'], job['tool'], processes=processes,
+                                       allow_missing=allow_missing)
+                modules[job['tool']].run(None, config, *inputs, folder=job['output'], offline=rebuild)
+            else:
+                modules[job['tool']].run(wc, config, *inputs, resume=resume, folder=job['output'],
+                                         journal_file=os.path.join(job['output'], 'journal.jsonl'))
+        except MissingResponsesError as err:
+            logger.error(f'Job {job["name"]} failed: {err}')
+            return False
+        except Exception:
+            # One broken sheet should not stop the rest of the night
+            logger.exception(f'Job {job["name"]} failed')
+            return False
+        logger.debug(f'Job {job["name"]} finished in {datetime.now() - started}, results in {job["output"]}')
+        return True
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+            # The jobs start in the order of the job file, so the jobs in ``after`` have always started
+            for job in jobs:
+                futures[job['name']] = executor.submit(run_job, job)
+        return {name: future.result() for name, future in futures.items()}
+    finally:
+        for wc, config in clients.values():
+            if wc is not None:
+                wc.close()
+
+
+# An error is logged and gives exit status 1
+@logger.catch(default=1)
+def main(args):
+    """Run a job file; ``args`` has the job file, the config file, parallel and the resume flag (see cli.py)."""
+    timer = RunTimer()
+    logger.add(r'U:\Werk\OWO\WC_Batch.log', backtrace=True, diagnose=True, rotation="10 MB", retention="12 months")
+    parallel, jobs = load_jobs(args.jobfile, args.config)
+    results = run_jobs(jobs, args.parallel or parallel, resume=args.resume, offline=args.offline,
+                       processes=args.processes, allow_missing=args.allow_missing)
+    failed = [name for name, finished in results.items() if not finished]
+    logger.debug(f'{len(results) - len(failed)} of {len(results)} jobs finished')
+    if failed:
+        logger.error(f'Jobs that did not finish: {", ".join(failed)}')
+    # Logging of script run:
+    timer.log()
+    # Exit status 1 when a job did not finish, so a scheduled run shows it
+    return 1 if failed else 0
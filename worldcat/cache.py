@@ -0,0 +1,133 @@
+# Persistent response cache for the WorldCat tools
+# Responses of the /brief-bibs and /bibs endpoints are kept in a SQLite database
+# so a new run over (almost) the same input does not download everything again
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Entry types: a response with records and a response without any records
+FOUND = 'found'
+NOT_FOUND = 'not_found'
+
+
+def normalize_query(path, query):
+    """Return the cache key for an endpoint and query string.
+
+    Parameters are sorted and the values are lower case with single spaces, so
+    'q=bn:123&limit=10' and 'limit=10&q=BN:123' are the same entry.
+    """
+    params = []
+    for part in query.split('&'):
+        if not part:
+            continue
+        name, _, value = part.partition('=')
+        value = re.sub(r'\s+', ' ', value.strip()).lower()
+        params.append(name.strip().lower() + '=' + value)
+    return path + '?' + '&'.join(sorted(params))
+
+
+def is_empty_response(response):
+    """True when a response has no brief or bib records in it."""
+    return not (response.get('briefRecords') or response.get('bibRecords'))
+
+
+class ResponseCache:
+    """SQLite cache of API responses with a time to live and LRU eviction.
+
+    ``ttl`` and ``not_found_ttl`` are in seconds; empty results get their own
+    (usually shorter) time to live. When there are more than ``max_entries``
+    entries the least recently used ones are removed.
+    """
+
+    def __init__(self, path, ttl=30 * 86400, not_found_ttl=7 * 86400, max_entries=500000):
+        self.path = path
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the worker threads, access goes through the lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS responses ('
+                         'key TEXT PRIMARY KEY, kind TEXT NOT NULL, body TEXT NOT NULL, '
+                         'created REAL NOT NULL, last_used REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)')
+        self._db.commit()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create the cache from the config.yml settings, or None if no cache_file is set."""
+        if not config.get('cache_file'):
+            return None
+        return cls(config.get('cache_file'),
+                   ttl=float(config.get('cache_ttl_days', 30)) * 86400,
+                   not_found_ttl=float(config.get('cache_not_found_ttl_days', 7)) * 86400,
+                   max_entries=int(config.get('cache_max_entries', 500000)))
+
+    def get(self, path, query):
+        """Return the cached response, or None if it is not cached or has expired."""
+        key = normalize_query(path, query)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT kind, body, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            kind, body, created = row
+            ttl = self.not_found_ttl if kind == NOT_FOUND else self.ttl
+            if now - created > ttl:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(body)
+
+    def is_known_empty(self, path, query):
+        """True when the query is cached as a response without any records."""
+        key = normalize_query(path, query)
+        with self._lock:
+            row = self._db.execute('SELECT created FROM responses WHERE key = ? AND kind = ?',
+                                   (key, NOT_FOUND)).fetchone()
+        return row is not None and time.time() - row[0] <= self.not_found_ttl
+
+    def put(self, path, query, response):
+        """Store a response; responses without records are stored as 'not found' entries."""
+        key = normalize_query(path, query)
+        kind = NOT_FOUND if is_empty_response(response) else FOUND
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO responses (key, kind, body, created, last_used) '
+                             'VALUES (?, ?, ?, ?, ?)', (key, kind, json.dumps(response), now, now))
+            self._puts += 1
+            # Counting all rows for every insert is wasteful, so only check now and then
+            if self._puts % 1000 == 1:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        count = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute('DELETE FROM responses WHERE key IN '
+                             '(SELECT key FROM responses ORDER BY last_used LIMIT ?)',
+                             (count - self.max_entries,))
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,75 @@
+# Command line interface of the WorldCat tools
+# One command with a subcommand per tool:
+#   worldcat isbn    publisher data for the ISBN codes in an Excel file (brief-bibs)
+#   worldcat text    text search with the words of file names in an Excel file (brief-bibs)
+#   worldcat pages   page numbers and urls for the OCLC numbers in a tab-delimited file (bibs)
+#   worldcat batch   all jobs of a job file in one run, without questions (see batch.py)
+# Only argparse is imported here; pandas and the rest are imported by the tool that runs
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import sys
+import argparse
+import importlib
+from worldcat import __version__, DEFAULT_CONFIG, PAGES_CONFIG
+
+# Subcommand: (module with main(args), help text)
+TOOLS = {
+    'isbn': ('worldcat.isbn_tool', 'look up publisher data for ISBN codes'),
+    'text': ('worldcat.text_tool', 'look up books with the words of file names'),
+    'pages': ('worldcat.pages_tool', 'download page numbers and urls for OCLC numbers'),
+    'batch': ('worldcat.batch', 'run the jobs of a job file (YAML) with one login and cache'),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='worldcat', description='WorldCat Search API tools')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    subparsers = parser.add_subparsers(dest='tool', required=True)
+    for name, (module, help_text) in TOOLS.items():
+        sub = subparsers.add_parser(name, help=help_text, description=help_text)
+        if name == 'batch':
+            sub.add_argument('jobfile', help='YAML file with the jobs')
+            sub.add_argument('--parallel', type=int, help='number of jobs that run at the same time '
+                                                          '(default: parallel in the job file, or 1)')
+            sub.add_argument('--config', help='config file of the jobs that do not name one '
+                                              '(default: the config file of each tool)')
+            sub.add_argument('--resume', action='store_true',
+                             help='continue an interrupted batch and skip the items that are in the journals')
+            sub.add_argument('--offline', action='store_true',
+                             help='rebuild the result files of every job from its last response archive, without the API')
+            sub.add_argument('--processes', type=int, help='number of processes that parse the archived responses '
+                                                           '(default: rebuild_processes in the config file, or one per CPU)')
+            sub.add_argument('--allow-missing', action='store_true',
+                             help='with --offline: accept result files without the input rows that have no archived '
+                                  'response (default: rebuild_allow_missing in the config file, else the job fails)')
+            continue
+        sub.add_argument('--config', help='config file with the API key and settings '
+                                          f'(default: {PAGES_CONFIG if name == "pages" else DEFAULT_CONFIG})')
+        sub.add_argument('--input', help='input file; asked for when it is not given')
+        if name != 'pages':
+            sub.add_argument('--sheet', help='sheet name in the Excel file; asked for when it is not given')
+        sub.add_argument('--resume', action='store_true',
+                         help='continue an interrupted run and skip the items that are in the journal')
+        sub.add_argument('--offline', nargs='?', const='', metavar='ARCHIVE',
+                         help='rebuild the result files from the responses in a response archive (default: the '
+                              'archive of the last run) without the API')
+        sub.add_argument('--processes', type=int, help='number of processes that parse the archived responses '
+                                                       '(default: rebuild_processes in the config file, or one per CPU)')
+        sub.add_argument('--allow-missing', action='store_true',
+                         help='with --offline: accept result files without the input rows that have no archived '
+                              'response (default: rebuild_allow_missing in the config file, else exit status 1)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # The tool module (and with it pandas etc.) is only imported now
+    tool = importlib.import_module(TOOLS[args.tool][0])
+    return tool.main(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# Shared WorldCat Search API client for the WorldCat tools
+# One OAuth2Session with one connection pool is used by all worker threads
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import time
+import requests  # version 2.31.0
+from oauthlib.oauth2 import BackendApplicationClient  # version 3.2.2
+from requests.auth import HTTPBasicAuth  # version 2.31.0
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from requests_oauthlib import OAuth2Session
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+from .tokens import TokenManager
+from .engine import RateLimiter
+from .cache import ResponseCache
+from .retry import RetryPolicy
+from .metrics import Metrics
+
+
+class WorldCatClient:
+    """Session, token and request rate handling for the WorldCat Search API.
+
+    Settings are read from the config.yml dictionary: ``workers`` sets the size of
+    the connection pool and ``requests_per_second``/``rate_burst`` the global rate.
+    With ``cache_file`` set, responses are kept in a persistent ResponseCache. Failed
+    requests are tried again and a circuit breaker stops them when the API is down
+    (``max_retries``, ``retry_backoff`` etc., see retry.py). The times, status codes
+    and sizes of the requests are kept in ``metrics`` (see metrics.py).
+    ``jobs`` is the number of runs that use the client at the same time (batch runner).
+    """
+
+    def __init__(self, config, scope, jobs=1):
+        self.service_url = config.get('worldcat_api_url')
+        self.workers = int(config.get('workers', 1))
+        auth = HTTPBasicAuth(config.get('key'), config.get('secret'))
+        client = BackendApplicationClient(client_id=config.get('key'), scope=scope)
+        self.session = OAuth2Session(client=client)
+        # Make sure every worker can keep its own connection open
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, self.workers * jobs))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Reuse the token until it is about to expire instead of fetching one per item
+        self.tokens = TokenManager(self.session, config.get('token_url'), auth,
+                                   refresh_margin=config.get('token_refresh_margin', 60),
+                                   cache_file=config.get('token_cache_file'))
+        self.limiter = RateLimiter(config.get('requests_per_second'), config.get('rate_burst', 1))
+        self.cache = ResponseCache.from_config(config)
+        # Seconds to wait for an answer; without a timeout a dropped connection can hang a worker forever
+        self.timeout = float(config.get('request_timeout', 60))
+        self.retry = RetryPolicy.from_config(config, on_unauthorized=self.tokens.invalidate)
+        self.metrics = Metrics()
+        # Fetches the next result page while the current one is processed
+        self._prefetch = ThreadPoolExecutor(max_workers=max(1, self.workers * jobs))
+
+    def get(self, path, query):
+        """Send a GET request for ``path`` (e.g. /brief-bibs) and return the JSON response."""
+        if self.cache is not None:
+            response = self.cache.get(path, query)
+            if response is not None:
+                self.metrics.inc('cache_hits_total')
+                return response
+            self.metrics.inc('cache_misses_total')
+        response = self.retry.call(lambda: self._request(path, query))
+        if self.cache is not None:
+            self.cache.put(path, query, response)
+        return response
+
+    def _request(self, path, query):
+        # Every try gets a valid token and waits for its turn under the request rate
+        with self.metrics.timer('token_seconds'):
+            self.tokens.get_token()
+        with self.metrics.timer('rate_limit_wait_seconds'):
+            self.limiter.acquire()
+        start = time.perf_counter()
+        try:
+            r = self.session.get(self.service_url + path + '?' + query, timeout=self.timeout)
+        except requests.exceptions.RequestException as err:
+            self.metrics.inc('http_errors_total', error=type(err).__name__)
+            raise
+        self.metrics.observe('http_request_seconds', time.perf_counter() - start, path=path)
+        self.metrics.inc('http_responses_total', status=r.status_code, path=path)
+        self.metrics.inc('http_response_bytes_total', len(r.content), path=path)
+        r.raise_for_status()
+        with self.metrics.timer('json_parse_seconds', path=path):
+            return r.json()
+
+    def update_metrics(self):
+        """Put the numbers of the retries and the circuit breaker in ``metrics``."""
+        self.metrics.set('http_retries_total', self.retry.retries)
+        self.metrics.set('circuit_breaker_opened_total', self.retry.breaker.opened)
+
+    def metrics_snapshot(self):
+        """The request metrics so far, to export only those of one job later (see export_metrics)."""
+        self.update_metrics()
+        return self.metrics.snapshot()
+
+    def iter_records(self, path, query, records_key='briefRecords', page_size=50, max_records=None, stop=None):
+        """Yield the records of a search one by one, page after page (offset/limit).
+
+        The next page is requested in the background while the records of the current
+        page are used. Iteration ends after ``max_records`` records, after the first
+        record for which ``stop(record)`` is True, or after the last page. Pages past
+        ``max_records`` are never requested; with a ``stop`` function the pages are
+        only requested when needed, because it is not known beforehand where it stops.
+        """
+        def page(offset):
+            limit = page_size if max_records is None else min(page_size, max_records - offset + 1)
+            return self.get(path, query + f'&limit={limit}&offset={offset}'), limit
+
+        offset = 1
+        pending = None
+        try:
+            response, limit = page(offset)
+            while True:
+                records = response.get(records_key, [])
+                offset += len(records)
+                # numberOfRecords is not always right, a short page is the real end
+                more = (len(records) == limit and offset <= response.get('numberOfRecords', offset)
+                        and (max_records is None or offset <= max_records))
+                if more and stop is None:
+                    pending = self._prefetch.submit(page, offset)
+                for record in records:
+                    yield record
+                    if stop is not None and stop(record):
+                        return
+                if not more:
+                    return
+                if pending is None:
+                    response, limit = page(offset)
+                else:
+                    response, limit = pending.result()
+                    pending = None
+        finally:
+            # The caller stopped early: a page that has not been requested yet is not needed
+            if pending is not None:
+                pending.cancel()
+
+    def close(self):
+        self._prefetch.shutdown(wait=False, cancel_futures=True)
+        if self.retry.retries or self.retry.breaker.opened:
+            logger.debug(f'Requests tried again: {self.retry.retries}, '
+                         f'circuit breaker opened: {self.retry.breaker.opened} times')
+        if self.cache is not None:
+            logger.debug(f'Response cache: {self.cache.hits} hits, {self.cache.misses} misses')
+            self.cache.close()
@@ -0,0 +1,83 @@
+# Shared parts of the WorldCat tools: reading the config file, the backup of the json
+# files of the last run, the error handling around one lookup and the run time logging
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import json
+import shutil
+import time
+import functools
+from datetime import datetime
+from pathlib import Path
+import requests  # version 2.31.0
+from oauthlib.oauth2 import OAuth2Error  # version 3.2.2
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+from worldcat import DEFAULT_CONFIG
+from .retry import CircuitOpenError
+
+# Errors of one lookup that should not stop the run: the request failed (after the retries
+# of the client), the login failed or the answer is not JSON. (An open circuit breaker
+# makes the requests wait, CircuitOpenError is only raised when they are not allowed to.)
+# Anything else is a bug and stops the run
+LOOKUP_ERRORS = (requests.exceptions.RequestException, CircuitOpenError, OAuth2Error, json.JSONDecodeError)
+
+
+def load_config(path=None):
+    """Read the config.yml file into a dictionary (DEFAULT_CONFIG if no path is given)."""
+    import yaml
+    with open(path or DEFAULT_CONFIG, 'r') as stream:
+        return yaml.safe_load(stream)
+
+
+def backup_json_files(folder, backup_folder):
+    """Move the json files of the last run from ``folder`` to ``backup_folder``."""
+    Path(backup_folder).mkdir(parents=True, exist_ok=True)
+    for file in os.listdir(folder):
+        if file.endswith(".json"):
+            shutil.move(os.path.join(folder, file), os.path.join(backup_folder, file))
+
+
+def log_failed_lookup(func):
+    """Error handling for the lookup of one item, used by all tools.
+
+    Nothing is tried again here: the client already does that when the API is busy or
+    down (see retry.py). A request error that is left (retries used up, a bad request,
+    see LOOKUP_ERRORS) is logged and the lookup returns None, so the
+    other items still run; the journal puts the item on the dead-letter list. Other
+    errors are not caught.
+    """
+    @functools.wraps(func)
+    def lookup(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except LOOKUP_ERRORS as err:
+            logger.warning(f'{func.__name__}{args} failed: {err}')
+            return None
+    return lookup
+
+
+class RunTimer:
+    """Start and end time of a run, logged like the tools always did."""
+
+    def __init__(self):
+        self.started = str(datetime.now())
+        self.start_time = time.time()
+
+    def log(self):
+        end = str(datetime.now())
+        logger.debug('Processing started at: ' + self.started)
+        logger.debug('Processing completed at: ' + end)
+        duration_s = (round((time.time() - self.start_time), 2))
+        if duration_s > 3600:
+            duration = str(duration_s / 3600)
+            logger.debug('Search took: ' + duration + ' hours.')
+        elif duration_s > 60:
+            duration = str(duration_s / 60)
+            logger.debug('Search took: ' + duration + ' minutes.')
+        else:
+            duration = str(duration_s)
+            logger.debug('Search took: ' + duration + ' seconds.')
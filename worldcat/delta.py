@@ -0,0 +1,144 @@
+# Delta mode of the WorldCat tools
+# Our sheets change by a few percent per week, so most keys of a new run were looked up
+# last week already. With delta_file in the config file the tools keep, per key (ISBN,
+# Material id or OCLC number), when it was last looked up, a fingerprint of the result and
+# the extracted rows. Only new keys and keys older than delta_max_age_days are looked up
+# again; the rows of the other keys come from the state file. Next to the full result
+# table a table with only the new and changed keys is written
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+import pandas as pd  # version 2.2.3
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+
+# Values of the Change column of the changes table
+NEW = 'new'
+CHANGED = 'changed'
+
+
+def fingerprint(rows):
+    """Hash of the extracted rows of a key; the same rows give the same hash in every run."""
+    return hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def changes_table(frame, column, changes, missing=None):
+    """The rows of ``frame`` whose key in ``column`` is new or changed, with the Change column.
+
+    Changed keys without any row in ``frame`` (no records any more) are not left out: they
+    get their rows of ``missing`` (e.g. the input rows) or else a row with only the key.
+    """
+    keys = frame[column].astype(str)
+    table = frame.assign(Change=keys.map(changes))[keys.isin(list(changes))]
+    absent = set(changes) - set(keys)
+    if not absent:
+        return table
+    if missing is None:
+        extra = pd.DataFrame({column: sorted(absent)})
+    else:
+        extra = missing[missing[column].astype(str).isin(absent)]
+    extra = extra.assign(Change=extra[column].astype(str).map(changes))
+    return pd.concat([table, extra], ignore_index=True) if len(table) else extra.reset_index(drop=True)
+
+
+class DeltaState:
+    """SQLite file with the last lookup of every key of a tool.
+
+    ``query`` is what was looked up for a key (e.g. the search string of a Material id):
+    when it is different now, the key is looked up again whatever its age. Used by the
+    thread that runs the tool only; the workers do not touch it.
+    """
+
+    def __init__(self, path, tool, max_age=30 * 86400):
+        self.path = path
+        self.tool = tool
+        self.max_age = max_age
+        # One moment for the whole run, so a key does not turn stale halfway
+        self.now = time.time()
+        self.reused = 0
+        self.changes = {NEW: 0, CHANGED: 0}
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # The jobs of a batch can use the same file at the same time
+        self._db = sqlite3.connect(path, timeout=60)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS state ('
+                         'tool TEXT NOT NULL, key TEXT NOT NULL, query TEXT, fetched REAL NOT NULL, '
+                         'fingerprint TEXT NOT NULL, rows TEXT NOT NULL, PRIMARY KEY (tool, key))')
+        self._db.commit()
+
+    @classmethod
+    def from_config(cls, config, tool):
+        """Create the state from the config.yml settings, or None if no delta_file is set."""
+        if not config.get('delta_file'):
+            return None
+        return cls(config.get('delta_file'), tool, max_age=float(config.get('delta_max_age_days', 30)) * 86400)
+
+    def fresh_keys(self, items):
+        """The keys of ``items`` ({key: query}) that were looked up with the same query less than max_age ago."""
+        items = {str(key): None if query is None else str(query) for key, query in items.items()}
+        fresh = set()
+        for key, query, fetched in self._db.execute('SELECT key, query, fetched FROM state WHERE tool = ?',
+                                                    (self.tool,)):
+            if key in items and items[key] == query and self.now - fetched <= self.max_age:
+                fresh.add(key)
+        return fresh
+
+    def rows(self, keys):
+        """The stored rows of ``keys`` as {key: rows}, like the rows of the journal."""
+        keys = [str(key) for key in keys]
+        found = {}
+        # SQLite allows a limited number of parameters per statement
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            found.update((key, json.loads(rows)) for key, rows in self._db.execute(
+                f'SELECT key, rows FROM state WHERE tool = ? AND key IN ({",".join("?" * len(part))})',
+                [self.tool] + part))
+        self.reused += len(found)
+        return found
+
+    def update(self, results):
+        """Store the rows of the keys looked up in this run and return the new and changed keys.
+
+        ``results`` is a list of (key, query, rows); keys whose lookup failed (rows None)
+        are left as they were, so they are looked up again next time. A key that is in
+        ``results`` more than once is stored once. Returns {key: NEW or CHANGED}; keys with
+        the same result as last time are not in it.
+        """
+        results = list({str(key): (str(key), None if query is None else str(query), rows)
+                        for key, query, rows in results if rows is not None}.values())
+        if not results:
+            return {}
+        old = {}
+        keys = [key for key, _, _ in results]
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            old.update(self._db.execute(
+                f'SELECT key, fingerprint FROM state WHERE tool = ? AND key IN ({",".join("?" * len(part))})',
+                [self.tool] + part))
+        changes = {}
+        entries = []
+        for key, query, rows in results:
+            hashed = fingerprint(rows)
+            if key not in old:
+                changes[key] = NEW
+            elif old[key] != hashed:
+                changes[key] = CHANGED
+            entries.append((self.tool, key, query, self.now, hashed, json.dumps(rows, default=str)))
+        self._db.executemany('INSERT OR REPLACE INTO state (tool, key, query, fetched, fingerprint, rows) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', entries)
+        self._db.commit()
+        for change in changes.values():
+            self.changes[change] += 1
+        return changes
+
+    def close(self):
+        self._db.close()
+        logger.info(f'Delta mode: {self.reused} keys taken from {self.path} without a lookup, '
+                    f'{self.changes[NEW]} new and {self.changes[CHANGED]} changed keys')
@@ -0,0 +1,106 @@
+# Reading the Excel sheets of the WorldCat tools
+# Only the columns a tool needs are read, with the fast calamine engine when the optional
+# python-calamine package is installed (openpyxl in read-only mode otherwise). With
+# excel_snapshot_dir in the config file the columns are also saved as a Parquet snapshot,
+# named after the workbook, the sheet and the modification time of the workbook, so the
+# next run over the same workbook loads in milliseconds instead of parsing it again.
+# Snapshots need the optional pyarrow package (pip install .[arrow])
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import re
+import glob
+import json
+import hashlib
+from pathlib import Path
+import numpy as np
+import pandas as pd  # version 2.2.3
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+
+# excel_engine in the config file: 'auto' uses calamine when the optional python-calamine
+# package is installed and openpyxl otherwise
+EXCEL_ENGINES = ('auto', 'calamine', 'openpyxl')
+
+
+def excel_engine(engine='auto'):
+    """Return the pandas engine for reading workbooks."""
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f'Unknown excel_engine {engine!r}, use one of: {", ".join(EXCEL_ENGINES)}')
+    if engine in ('auto', 'calamine'):
+        try:
+            import python_calamine  # noqa: F401  optional, version 0.1.7 or later
+        except ImportError:
+            if engine == 'calamine':
+                raise
+        else:
+            return 'calamine'
+    return 'openpyxl'
+
+
+def snapshot_path(folder, excelfile, sheet, columns, converters=None):
+    """Path of the snapshot of some columns of a sheet, for the current version of the workbook.
+
+    The name has a hash of the workbook path, sheet, columns and converters and the
+    modification time of the workbook: a changed workbook gets a new snapshot.
+    """
+    identity = json.dumps([os.path.abspath(excelfile), str(sheet), list(columns),
+                           {c: getattr(f, '__name__', repr(f)) for c, f in (converters or {}).items()}])
+    name = re.sub(r'[^\w.-]+', '_', f'{Path(excelfile).stem}_{sheet}')
+    digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(folder, f'{name}_{digest}_{os.stat(excelfile).st_mtime_ns}.parquet')
+
+
+def _load_snapshot(path):
+    frame = pd.read_parquet(path)
+    # Empty text cells come back as None; read_excel gives NaN
+    text = frame.select_dtypes(object).columns
+    frame[text] = frame[text].where(frame[text].notna(), np.nan)
+    return frame
+
+
+def _save_snapshot(frame, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # Written to a temporary file first, so another run never reads half a snapshot
+        frame.to_parquet(path + '.tmp')
+    except (ValueError, TypeError) as err:
+        # e.g. a column with both numbers and text: no snapshot, the sheet is read again next time
+        logger.warning(f'No snapshot of the sheet: {err}')
+        if os.path.isfile(path + '.tmp'):
+            os.remove(path + '.tmp')
+        return
+    os.replace(path + '.tmp', path)
+    # The snapshots of older versions of the workbook are not used any more
+    for old in glob.glob(glob.escape(path.rsplit('_', 1)[0]) + '_*.parquet'):
+        if old != path:
+            os.remove(old)
+
+
+def read_sheet(config, excelfile, sheet, columns, converters=None):
+    """Read the ``columns`` of a sheet, in that order, like pd.read_excel.
+
+    The engine is excel_engine in the config file. With excel_snapshot_dir the columns
+    come from the snapshot of the workbook if there is one, and a snapshot is saved otherwise.
+    """
+    folder = config.get('excel_snapshot_dir')
+    path = None
+    if folder:
+        try:
+            import pyarrow  # noqa: F401  optional
+        except ImportError:
+            logger.warning('excel_snapshot_dir needs the optional pyarrow package (pip install .[arrow]); '
+                           'the workbook is read without a snapshot')
+        else:
+            path = snapshot_path(folder, excelfile, sheet, columns, converters)
+            if os.path.isfile(path):
+                logger.debug(f'Sheet {sheet} of {excelfile} read from the snapshot {path}')
+                return _load_snapshot(path)
+    frame = pd.read_excel(f'{excelfile}', sheet_name=sheet, usecols=list(columns), converters=converters,
+                          engine=excel_engine(config.get('excel_engine', 'auto')))[list(columns)]
+    if path is not None:
+        _save_snapshot(frame, path)
+    return frame
@@ -0,0 +1,133 @@
+# ISBN normalization and validation for the WorldCat tools
+# Works on a whole column at once: cleans the codes, checks the ISBN-10 and ISBN-13
+# check digits with NumPy and turns every valid code into a canonical ISBN-13, so the
+# 10 and 13 digit forms of the same book are only looked up once
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+# One regex pass for codes with letters in them: an ISBN prefix at the start, a '.0'
+# added by the Excel import at the end, and every other character that is not part of an ISBN
+CLEAN_PATTERN = r'^ISBN(?:-1[03])?:?|\.0$|[^0-9X]'
+
+ISBN10_WEIGHTS = np.arange(10, 0, -1, dtype=np.int32)
+ISBN13_WEIGHTS = np.array([1, 3] * 6 + [1], dtype=np.int32)
+POWERS13 = 10 ** np.arange(12, -1, -1, dtype=np.int64)
+
+ZERO, NINE, DOT, UPPER_X, LOWER_X = ord('0'), ord('9'), ord('.'), ord('X'), ord('x')
+
+# Digit value of every character code: 0-9 for the digits, 10 for X or x and
+# 255 for everything else, so one table lookup both converts and classifies
+DIGIT_VALUES = np.full(256, 255, dtype=np.uint8)
+DIGIT_VALUES[ZERO:NINE + 1] = np.arange(10)
+DIGIT_VALUES[[UPPER_X, LOWER_X]] = 10
+# Letters other than X: codes with those need the regex clean up
+LETTERS = np.zeros(256, dtype=bool)
+LETTERS[NINE + 1:] = True
+LETTERS[[UPPER_X, LOWER_X]] = False
+
+
+def normalize_isbns(codes):
+    """Return the codes as upper case strings with only digits and X left."""
+    codes = pd.Series(codes, dtype=object).fillna('').astype(str)
+    return codes.str.strip().str.upper().str.replace(CLEAN_PATTERN, '', regex=True)
+
+
+def _code_points(codes):
+    # All codes as a (n, width) array of character codes, padded with zeros. The codes are
+    # joined and encoded to Latin-1 in one go, which is much faster than a NumPy unicode
+    # array. Characters above 255 can not be part of an ISBN and become '?', which is
+    # cleaned like any other letter
+    codes = np.asarray(codes, dtype=object)
+    if len(codes) == 0:
+        return np.zeros((0, 1), dtype=np.uint8)
+    if pd.api.types.infer_dtype(codes, skipna=False) != 'string':
+        # Empty cells, or e.g. ISBNs that Excel turned into numbers
+        missing = pd.isna(codes)
+        codes = np.array(['' if gone else str(code) for code, gone in zip(codes, missing)], dtype=object)
+    data = np.frombuffer('\0'.join(codes).encode('latin-1', 'replace'), dtype=np.uint8)
+    ends = np.append(np.flatnonzero(data == 0), len(data))
+    if len(ends) != len(codes):
+        # A code with a NUL character in it: that is not part of an ISBN either
+        return _code_points(np.array([code.replace('\0', ' ') for code in codes], dtype=object))
+    lengths = ends - np.concatenate(([0], ends[:-1] + 1))
+    width = max(int(lengths.max()), 1)
+    chars = np.zeros((len(codes), width), dtype=np.uint8)
+    chars[np.arange(width) < lengths[:, None]] = data[data != 0]
+    return chars
+
+
+def _digits(values, keep, count, length):
+    # Digit values (X = 10) of the codes with exactly `length` kept characters. Every
+    # selected row has the same number of kept characters, so a boolean mask over the
+    # whole array drops the separators and the result can be reshaped into rows
+    rows = np.flatnonzero(count == length)
+    digits = values[rows][keep[rows]].reshape(-1, length)
+    return rows, digits.astype(np.int32)
+
+
+def _isbn13_numbers_from_points(chars):
+    # Returns the ISBN-13 as an int64 per row, 0 where the code is not valid
+    numbers = np.zeros(len(chars), dtype=np.int64)
+    values = DIGIT_VALUES[chars]
+    keep = values != 255
+    # A '.0' that the Excel import added to a number: the last two characters
+    # of the code, not counting padding and spaces
+    visible = chars > ord(' ')
+    last = chars.shape[1] - 1 - np.argmax(visible[:, ::-1], axis=1)
+    rows = np.flatnonzero((last >= 1) & (chars[np.arange(len(chars)), last] == ZERO))
+    dot_zero = rows[chars[rows, last[rows] - 1] == DOT]
+    keep[dot_zero, last[dot_zero]] = False
+    count = keep.sum(axis=1, dtype=np.int32)
+
+    rows, digits = _digits(values, keep, count, 13)
+    valid = (digits.max(axis=1, initial=0) <= 9) & (digits @ ISBN13_WEIGHTS % 10 == 0)
+    numbers[rows[valid]] = (digits[valid] @ POWERS13.astype(np.float64)).astype(np.int64)
+
+    rows, digits = _digits(values, keep, count, 10)
+    # X is only allowed as the check digit
+    valid = (digits[:, :9].max(axis=1, initial=0) <= 9) & (digits @ ISBN10_WEIGHTS % 11 == 0)
+    digits = digits[valid]
+    # 978 + the first nine digits + a new check digit
+    body = digits[:, :9] @ POWERS13[4:] + 978 * 10 ** 9
+    check = (10 - (38 + digits[:, :9] @ ISBN13_WEIGHTS[3:12]) % 10) % 10
+    numbers[rows[valid]] = body * 10 + check
+    return numbers
+
+
+def isbn13_numbers(codes):
+    """Return the canonical ISBN-13 of every code as an int64, or 0 where it is not valid."""
+    codes = np.asarray(codes, dtype=object)
+    chars = _code_points(codes)
+    # Codes with letters other than X (like an 'ISBN-13:' prefix) are rare and
+    # are cleaned with the regex first; all other codes stay in the array.
+    # Only the rows with a character above '9' (mostly an X) are checked for letters
+    above_nine = np.flatnonzero(chars.max(axis=1) > NINE)
+    special = above_nine[LETTERS[chars[above_nine]].any(axis=1)]
+    if len(special):
+        cleaned = normalize_isbns(codes[special])
+        special_chars = _code_points(cleaned)
+        numbers = _isbn13_numbers_from_points(chars)
+        numbers[special] = _isbn13_numbers_from_points(special_chars)
+        return numbers
+    return _isbn13_numbers_from_points(chars)
+
+
+def canonical_isbn13(codes):
+    """Return the canonical ISBN-13 for every code, or None where the code is not valid."""
+    numbers = isbn13_numbers(codes)
+    result = np.full(len(numbers), None, dtype=object)
+    valid = numbers > 0
+    result[valid] = numbers[valid].astype(str)
+    return pd.Series(result, index=codes.index if isinstance(codes, pd.Series) else None)
+
+
+def unique_valid_isbns(codes):
+    """Return the unique canonical ISBN-13 codes of the valid codes, in input order."""
+    numbers = isbn13_numbers(codes)
+    unique = pd.unique(numbers[numbers > 0])
+    return unique.astype(str).tolist()
@@ -0,0 +1,336 @@
+# Publishers tool to be able to augment data with
+# publisher data from WorldCat using the OCLC Discovery API
+# Author: Mark Bruyneel
+# Started with: worldcat isbn (see cli.py)
+#
+# Date: 2026-10-17
+# Version: 2.0
+# Created using Python version 3.10
+#
+# Re-use note: Make sure to change folder names that are relevant to your computer
+
+import pandas as pd # version 2.2.3
+import os
+# To catch errors, use the logger option from loguru
+from loguru import logger #version 0.7.2
+# Also needed to get the run time of the script
+from datetime import datetime #version 5.5
+from pathlib import Path
+from .client import WorldCatClient
+from .engine import run_concurrent
+from .journal import Journal
+from .accumulator import ColumnAccumulator
+from .records import BRIEF_COLUMNS, extract_brief_records, match_records_to_isbns
+from .isbn import unique_valid_isbns
+from .stream import ChunkWriter, HashSet
+from .archive import open_responses
+from .metrics import Metrics, export_metrics
+from .rebuild import open_offline, MissingResponsesError
+from .delta import DeltaState, NEW, CHANGED, changes_table
+from .excel import read_sheet
+from .core import load_config, log_failed_lookup, RunTimer
+
+# A single bn: search returns the first page of the API: 10 records. Batched searches
+# keep the same number of records per ISBN
+ISBN_RECORDS = 10
+# Records per page when paging through the result of a batched search
+BATCH_PAGE_SIZE = 50
+
+# Show all data in screen
+pd.set_option("display.max.columns", None)
+
+
+# Login scope of the brief-bibs endpoint
+SCOPE = ['wcapi:view_brief_bib']
+# Folder with the response archive and the results, and the journal of the lookups
+FOLDER = r'U:\Werk\OWO\WC_test'
+JOURNAL_FILE = r'U:\Werk\OWO\Journal\WorldCat_isbn_journal.jsonl'
+
+
+# An error is logged and gives exit status 1
+@logger.catch(default=1)
+def main(args):
+    """Run the tool; ``args`` has the config file, the input file and the resume flag (see cli.py)."""
+    # Get configuration information to connect to WorldCat Search API
+    config = load_config(args.config)
+    timer = RunTimer()
+    logger.add(r'U:\Werk\OWO\WC_Publisher_Search_test.log', backtrace=True, diagnose=True, rotation="10 MB", retention="12 months")
+
+    # Provide the file name and location for which to look up data
+    excelfile = args.input or input('Please provide the location and name of the Excel file.\nExample: C:\\temp\\keyword_list.xlsx \n')
+    sh_name = args.sheet or input('Please provide the exact sheet name that has the ISBN column: \n')
+
+    if args.offline is not None:
+        # Rebuild the result files from the archived responses of an earlier run, without the API
+        offline = open_offline(config, FOLDER, 'isbn', args.offline or None, args.processes,
+                               allow_missing=args.allow_missing)
+        try:
+            run(None, config, excelfile, sh_name, offline=offline)
+        except MissingResponsesError as err:
+            # Exit status 1, so an incomplete rebuild is not taken for a good one
+            logger.error(str(err))
+            return 1
+    else:
+        # One session, token and connection pool shared by all workers
+        wc = WorldCatClient(config, SCOPE)
+        run(wc, config, excelfile, sh_name, resume=args.resume)
+        # Close the response cache and log how many lookups it saved
+        wc.close()
+
+    # Logging of script run:
+    timer.log()
+
+
+def run(wc, config, excelfile, sh_name, resume=False, folder=FOLDER, journal_file=JOURNAL_FILE, offline=None):
+    """Look up the ISBNs of one Excel sheet and write the result files to ``folder``.
+
+    ``wc`` is a WorldCatClient with the brief-bibs scope. Nothing is asked, so the batch
+    runner can call this for many sheets with the same client. With ``offline`` (an
+    OfflineResponses, see rebuild.py) ``wc`` is not used and the files are made from the
+    archived responses of an earlier run.
+    """
+    # Date for file names
+    runday = str(datetime.today().date())
+    # Number of ISBNs that are combined in one search (bn:a OR bn:b OR ...)
+    batch_size = int(config.get('batch_size', 1))
+
+    # create download folder if it doesn't exist
+    Path(folder).mkdir(parents=True, exist_ok=True)
+
+    # The raw responses go into one compressed archive per run (see archive.py), or into
+    # json files with a backup folder for those of last time (response_store: json).
+    # An offline rebuild uses the responses of an earlier run and looks nothing up
+    responses = None
+    if offline is None:
+        responses = open_responses(config, folder, 'isbn', os.path.join(folder, f'backup_{runday}'), resume=resume)
+    workers = wc.workers if offline is None else 1
+    # Times of the stages and the requests of the run, written at the end (see metrics.py)
+    metrics = Metrics(config.get('profile_stage'))
+    # The client can be shared with earlier jobs of a batch: only the requests from here on count
+    client_start = wc.metrics_snapshot() if wc is not None else None
+
+    with metrics.stage('excel_load'):
+        # Only the columns that are needed (see excel.py for the engine and the snapshot)
+        Pubs = read_sheet(config, excelfile, sh_name, ['ISBN', 'Publisher'], converters={'ISBN':str})
+    with metrics.stage('preprocess'):
+        # Keep part of the list with essential data:
+        Publication_list = Pubs[['ISBN', 'Publisher']].copy()
+
+        # Keep DataFrame where ISBN is available and where Publisher is not available'
+        Pubs_R_new1 = Publication_list.dropna(subset=['ISBN'])
+        Pubs_R_new = Pubs_R_new1.loc[Pubs_R_new1['Publisher'].isnull()]
+        # Make a list of the ISBN codes that need to be looked up based on the Excel file
+        ISBN_list = Pubs_R_new['ISBN'].unique()
+
+        # Get the data for each publication in the ISBN list
+        Listsize = len(ISBN_list)
+        print('\n Original number of ISBN codes in Excel file: ', Listsize, '\n')
+
+        # Check first if the ISBN is correct or not. The ISBN strings originally were harvested
+        # using Regex string searches in PDF documents. Valid codes are turned into ISBN-13, so
+        # duplicates are removed after the check: the ISBN-10 and ISBN-13 of a book are searched once
+        vISBN_list = unique_valid_isbns(ISBN_list)
+        # A workbook can only be read as a whole, but from here on only the list of valid
+        # ISBNs is needed: the sheet is not kept in memory during the lookups
+        del Pubs, Publication_list, Pubs_R_new1, Pubs_R_new, ISBN_list
+
+    valid_isbn = len(vISBN_list)
+    print(f'\n Number of valid ISBN codes: {valid_isbn}\n')
+
+    # Create an output folder if it doesn't exist
+    Path(r'U:\Werk\OWO\Output').mkdir(parents=True, exist_ok=True)
+
+    # Get WorldCat Records for each ISBN in the list. All fields of the brief records,
+    # including date, year and format, are taken from the response straight away.
+    # Returns None if the lookup failed
+    @log_failed_lookup
+    def lookup_isbn(listitem, isbn):
+        logger.debug(f'Retrieving data from WorldCat for ISBN {isbn}, {listitem + 1} of a total of {valid_isbn} ISBNs)')
+        response = wc.get("/brief-bibs", "q=bn:" + str(isbn) + "&groupRelatedEditions=false&showHoldingsIndicators=true")
+        # keep the response as backup
+        responses.put(isbn, response)
+        # To get all data for every edition
+        return extract_brief_records(response)
+
+    # All result pages of the combined search for several ISBNs
+    @log_failed_lookup
+    def search_batch(batchitem, batch):
+        query = "q=" + " OR ".join("bn:" + str(isbn) for isbn in batch) + "&groupRelatedEditions=false&showHoldingsIndicators=true"
+        logger.debug(f'Retrieving data from WorldCat for ISBN batch {batchitem + 1} of {batch_count}')
+        return list(wc.iter_records("/brief-bibs", query, page_size=BATCH_PAGE_SIZE))
+
+    # Search for several ISBNs at once and assign the records to the ISBN(s) in their isbns
+    # array. Returns a dict with the columns per ISBN, or None if the search failed
+    def lookup_batch(batchitem, batch):
+        records = search_batch(batchitem, batch)
+        if records is None:
+            return None
+        matched, unmatched = match_records_to_isbns(records, batch)
+        found = {}
+        for isbn in batch:
+            if unmatched and not matched[isbn]:
+                # Some records do not list the ISBN they were found with, so this ISBN
+                # may have records after all: search for it on its own
+                found[isbn] = lookup_isbn(batchitem, isbn)
+                continue
+            response = {'numberOfRecords': len(matched[isbn]), 'briefRecords': matched[isbn][:ISBN_RECORDS]}
+            # keep the response as backup, under the ISBN as for a single search
+            responses.put(isbn, response)
+            found[isbn] = extract_brief_records(response)
+        return found
+
+    # Offline rebuild: the rows come from the archived responses, which are kept per ISBN
+    if offline is not None:
+        lookup_isbn = offline.lookup
+        batch_size = 1
+
+    # The lookups run in parallel when workers > 1 in the config file. The results
+    # come back in the order of the ISBN list
+    # Every finished lookup goes into the journal, so an interrupted run can be resumed.
+    # With chunk_size in the config file the ISBNs are looked up and written chunk by chunk
+    # and the journal does not keep the rows in memory
+    chunk_size = int(config.get('chunk_size') or max(1, valid_isbn))
+    # (an offline rebuild keeps it in memory only). The journal syncs the response archive
+    # before its own file, once per record
+    journal = Journal(journal_file if offline is None else None, resume=resume and offline is None,
+                      keep_rows=chunk_size >= valid_isbn,
+                      before_sync=responses.sync if responses is not None else None)
+    # Delta mode (delta_file in the config file): ISBNs that were looked up less than
+    # delta_max_age_days ago are not looked up again, their rows come from the state file
+    delta = DeltaState.from_config(config, 'isbn') if offline is None else None
+    reusable = delta.fresh_keys(dict.fromkeys(vISBN_list)) if delta is not None else set()
+    # The journal keeps one entry per ISBN, also when the ISBNs are searched in batches
+    batch_count = sum(-(-sum(isbn not in journal and isbn not in reusable for isbn in vISBN_list[i:i + chunk_size])
+                        // batch_size)
+                      for i in range(0, valid_isbn, chunk_size))
+    batches_done = 0
+
+    def lookup_chunk(start, isbns):
+        nonlocal batches_done
+        if batch_size <= 1:
+            lookup = journal.wrap(lookup_isbn)
+            return run_concurrent(lambda item, isbn: lookup(start + item, isbn), isbns, workers)
+        todo = [isbn for isbn in isbns if isbn not in journal]
+        batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+        first = batches_done
+        batches_done += len(batches)
+        def journaled_batch(batchitem, batch):
+            found = lookup_batch(first + batchitem, batch)
+            entries = [(isbn, found[isbn] if found else None) for isbn in batch]
+            journal.record_many(entries)
+            return entries
+        found = dict(entry for entries in run_concurrent(journaled_batch, batches, workers) for entry in entries)
+        # ISBNs of an interrupted run come from the journal
+        return [found[isbn] if isbn in found else journal.get(isbn) for isbn in isbns]
+
+    # The output files are written chunk by chunk (output_format: csv or parquet). Duplicates
+    # are removed with a set of row hashes, so the tables are never in memory as a whole
+    fmt = config.get('output_format', 'csv')
+    book_columns = BRIEF_COLUMNS[:7] + ['Search_ISBN']
+    edition_columns = book_columns + ['Publication_Date', 'Pub_year', 'SpecificFormat']
+    Publisher_Book_Table = ChunkWriter(os.path.join(folder, f'WorldCat_Book_list_{runday}.txt'), book_columns,
+                                       fmt, sep='\t', encoding='utf-8')
+    # An abbreviated table with just ISBN numbers and duplicates removed
+    Publisher_Book_Table_abb = ChunkWriter(os.path.join(folder, f'WorldCat_Book_list_abb_{runday}.txt'),
+                                           [c for c in book_columns if c != 'OCLC_nr'], fmt, sep='\t', encoding='utf-8')
+    OCLC_Rec_data = ChunkWriter(os.path.join(folder, 'OCLC_Rec_data.csv'),
+                                ['OCLC_nr', 'Publication_Date', 'Pub_year', 'SpecificFormat'], fmt, encoding='utf-8')
+    WorldCat_Book_Data = ChunkWriter(os.path.join(folder, 'WorldCat_All_Editions_data.txt'),
+                                     edition_columns + ['OCLC_Link'], fmt, sep='\t', encoding='utf-8')
+    # Delta mode: the rows of the book list of the ISBNs that are new or have another result than last time
+    Book_Table_changes = ChunkWriter(os.path.join(folder, f'WorldCat_Book_list_changes_{runday}.txt'),
+                                     book_columns + ['Change'], fmt, sep='\t', encoding='utf-8')
+    abb_seen = HashSet()
+    editions_seen = HashSet()
+    not_found = []
+    # Row numbers of the tables so far, so the index of the files is the same as in one go
+    rows_done = 0
+    records_done = 0
+
+    for start in range(0, valid_isbn, chunk_size):
+        chunk = vISBN_list[start:start + chunk_size]
+        with metrics.stage('lookup'):
+            reused = [isbn for isbn in chunk if isbn in reusable]
+            if reused:
+                journal.preload(delta.rows(reused))
+                # Their responses go into the archive of this run too, for an offline rebuild
+                responses.reuse(reused)
+            results = lookup_chunk(start, chunk)
+            if delta is not None:
+                changes = delta.update([(isbn, None, columns) for isbn, columns in zip(chunk, results)
+                                        if isbn not in reusable])
+                if reused and not journal.keep_rows:
+                    # Streaming: the rows of this chunk are not needed any more
+                    journal.preload(dict.fromkeys(reused))
+        with metrics.stage('accumulate'):
+            # Collect the rows per column and make one DataFrame per chunk
+            Publisher_Book_Acc = ColumnAccumulator(BRIEF_COLUMNS + ['Search_ISBN'])
+            for isbn, columns in zip(chunk, results):
+                if columns is None:
+                    continue
+                if len(columns['OCLC_nr']) == 0:
+                    # The search worked but WorldCat has no records for this ISBN
+                    not_found.append(str(isbn))
+                    continue
+                columns['Search_ISBN'] = str(isbn)
+                Publisher_Book_Acc.extend(columns)
+            WorldCat_Book_Data_full = Publisher_Book_Acc.to_frame()
+            WorldCat_Book_Data_full.index = range(rows_done, rows_done + len(WorldCat_Book_Data_full))
+            rows_done += len(WorldCat_Book_Data_full)
+
+        with metrics.stage('write'):
+            # Export end result
+            Publisher_Book_Table.write(WorldCat_Book_Data_full[book_columns])
+            if delta is not None:
+                Book_Table_changes.write(changes_table(WorldCat_Book_Data_full[book_columns], 'Search_ISBN', changes),
+                                         renumber=True)
+            Book_Table_abb = WorldCat_Book_Data_full[Publisher_Book_Table_abb.columns]
+            Publisher_Book_Table_abb.write(Book_Table_abb[abb_seen.add_new(Book_Table_abb)])
+
+            # Only records with an OCLC number can be linked to WorldCat
+            WorldCat_Book_Data_full = WorldCat_Book_Data_full[WorldCat_Book_Data_full['OCLC_nr'] != "None"]
+            WorldCat_Book_Data_full.index = range(records_done, records_done + len(WorldCat_Book_Data_full))
+            records_done += len(WorldCat_Book_Data_full)
+
+            # Export result as a CSV file with the date of the Python run
+            OCLC_Rec_data.write(WorldCat_Book_Data_full[OCLC_Rec_data.columns])
+
+            # Put the book data and the edition data in the same column order as before and
+            # make an abbreviated table with duplicates removed
+            Book_Data = WorldCat_Book_Data_full[edition_columns]
+            Book_Data = Book_Data[Book_Data.Publication_Date != "uuuu"]
+            Book_Data = Book_Data[editions_seen.add_new(Book_Data)]
+            Book_Data = Book_Data.assign(OCLC_Link='https://vu.on.worldcat.org/search?queryString=' + Book_Data['OCLC_nr'].astype(str))
+            WorldCat_Book_Data.write(Book_Data)
+    journal.close()
+    if responses is not None:
+        responses.close()
+    with metrics.stage('write'):
+        for writer in (Publisher_Book_Table, Publisher_Book_Table_abb, OCLC_Rec_data, WorldCat_Book_Data):
+            writer.close()
+        if delta is not None:
+            Book_Table_changes.close()
+    if delta is not None:
+        delta.close()
+        metrics.set('delta_reused_total', delta.reused)
+        metrics.set('delta_changes_total', delta.changes[NEW], change=NEW)
+        metrics.set('delta_changes_total', delta.changes[CHANGED], change=CHANGED)
+
+    # Log and list the ISBNs for which WorldCat returned no records
+    file = open(os.path.join(folder, 'ISBNs_not_found.txt'), 'w')
+    for item in not_found:
+        file.write(item + ", ")
+    file.close()
+    logger.debug(f'\nDid not find any records in WorldCat for {len(not_found)} ISBNs:\n {not_found}.\n')
+
+    # The metrics of the run: a JSON summary in the folder and the Prometheus textfile
+    metrics.set('items_total', valid_isbn)
+    metrics.set('items_not_found_total', len(not_found))
+    metrics.set('items_failed_total', len(journal.failed))
+    if offline is not None:
+        metrics.set('rebuild_missing_total', len(offline.missing))
+    export_metrics(config, folder, 'isbn', metrics, wc, since=client_start)
+    if offline is not None:
+        # Keys of the input without an archived response fail the rebuild (see rebuild.py)
+        offline.check()
+
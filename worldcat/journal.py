@@ -0,0 +1,187 @@
+# Write-ahead journal for the WorldCat tools
+# Every finished lookup is appended to a journal file straight away, so a run that
+# stops halfway can be resumed without looking up the finished items again.
+# Lookups that failed go to a dead-letter list next to the journal instead: they are
+# not done, so a run with --resume looks them up again
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+
+
+class Journal:
+    """Append-only JSON lines file with the extracted rows per input key.
+
+    Without ``resume`` an existing journal is emptied at the start of the run. With
+    ``resume`` the finished keys are read back and their rows are used instead of
+    looking the keys up again. Without ``keep_rows`` the rows are not kept in ``done``
+    (streaming mode): only the place of their line in the file is, and ``get`` reads
+    them back from there. With ``path`` None nothing is written (offline rebuild, see
+    rebuild.py).
+
+    A key whose lookup failed (rows None) is kept in ``failed`` and written to the
+    dead-letter file ``<journal>_dead_letters.jsonl`` with the item that was looked up.
+
+    ``before_sync`` is called before the journal syncs its file, e.g. the sync of the
+    response archive, so the responses are on disk before their keys are done.
+    """
+
+    def __init__(self, path, resume=False, keep_rows=True, before_sync=None):
+        self.path = path
+        self.before_sync = before_sync
+        self.done = {}
+        self.failed = {}
+        self.keep_rows = keep_rows
+        # Without keep_rows: the offset of the line of every finished key in the file
+        self._offsets = {}
+        self._reader = None
+        self._torn = False
+        self._lock = threading.Lock()
+        self._file = None
+        self._dead = None
+        if path is None:
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            self._load()
+            logger.debug(f'Resuming run: {len(self.done)} items already done according to {path}')
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._torn:
+            # Start on a new line after an incomplete last line
+            self._file.write('\n')
+        # The dead letters of this run; those of an earlier run are looked up again when resuming
+        self.dead_letter_path = os.path.splitext(path)[0] + '_dead_letters.jsonl'
+        self._dead = open(self.dead_letter_path, 'w', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                self._torn = not line.endswith(b'\n')
+                start, offset = offset, offset + len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line can be incomplete if the run was killed while writing it
+                    continue
+                # Failed lookups of older versions are in the journal with rows null: not done
+                if entry['rows'] is not None:
+                    self._keep(entry['key'], entry['rows'], start)
+
+    def _keep(self, key, rows, offset):
+        # Rows in memory, or (streaming mode) where they are in the file
+        if self.keep_rows:
+            self.done[key] = rows
+            return
+        self.done[key] = None
+        if offset is not None:
+            self._offsets[key] = offset
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def get(self, key):
+        """The rows of a finished key; in streaming mode they are read back from the file."""
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                return self.done.get(key)
+            if self._reader is None:
+                self._reader = open(self.path, 'rb')
+            self._reader.seek(offset)
+            return json.loads(self._reader.readline())['rows']
+
+    def preload(self, rows):
+        """Mark keys as done with rows from somewhere else (delta mode, see delta.py), without writing them."""
+        with self._lock:
+            self.done.update(rows)
+            for key in rows:
+                self._offsets.pop(key, None)
+
+    def record(self, key, rows):
+        """Append the rows of a finished key and make sure they are on disk."""
+        if rows is None:
+            self.fail(key)
+            return
+        line = json.dumps({'key': key, 'rows': rows}) + '\n'
+        if self.before_sync is not None and self._file is not None:
+            self.before_sync()
+        with self._lock:
+            offset = None
+            if self._file is not None:
+                offset = self._file.tell()
+                self._file.write(line)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._keep(key, rows, offset)
+
+    def record_many(self, entries):
+        """Append the rows of several finished keys, given as (key, rows) pairs, with one sync."""
+        for key, rows in entries:
+            if rows is None:
+                self.fail(key)
+        entries = [(key, rows) for key, rows in entries if rows is not None]
+        if not entries:
+            return
+        lines = [json.dumps({'key': key, 'rows': rows}) + '\n' for key, rows in entries]
+        if self.before_sync is not None and self._file is not None:
+            self.before_sync()
+        with self._lock:
+            offsets = [None] * len(entries)
+            if self._file is not None:
+                for n, line in enumerate(lines):
+                    offsets[n] = self._file.tell()
+                    self._file.write(line)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            for (key, rows), offset in zip(entries, offsets):
+                self._keep(key, rows, offset)
+
+    def fail(self, key, item=None):
+        """Put a key whose lookup failed on the dead-letter list, with the item that was looked up."""
+        line = json.dumps({'key': key, 'item': item, 'time': str(datetime.now())}, default=str) + '\n'
+        with self._lock:
+            self.failed[key] = item
+            if self._dead is not None:
+                self._dead.write(line)
+                self._dead.flush()
+
+    def wrap(self, func, key=None):
+        """Return a lookup function that skips keys that are already in the journal.
+
+        ``func`` is called as func(index, item) like with run_concurrent. ``key``
+        turns (index, item) into the journal key; by default the item itself is used.
+        """
+        def journaled(index, item):
+            k = str(key(index, item) if key else item)
+            if k in self.done:
+                return self.get(k)
+            rows = func(index, item)
+            if rows is None:
+                self.fail(k, item)
+            else:
+                self.record(k, rows)
+            return rows
+        return journaled
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            if self._reader is not None:
+                self._reader.close()
+            if self._dead is not None:
+                self._dead.close()
+        if self.failed and self.path is not None:
+            logger.warning(f'{len(self.failed)} items failed and are on the dead-letter list {self.dead_letter_path}; '
+                           f'run again with --resume to look them up again')
@@ -0,0 +1,135 @@
+# Title matching for the text search tool
+# Scores all (file name, title) pairs of a search result at once instead of one
+# difflib.SequenceMatcher per row, and keeps only the best candidates per search
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+# 'difflib' (default) gives the exact scores of the earlier versions of the tool (slow).
+# The faster backends are opt-in, because they give other scores and pick another best
+# title for part of the files (see benchmarks/bench_matching.py and the README): 'auto'
+# uses rapidfuzz when it is installed and character n-grams otherwise
+BACKENDS = ('difflib', 'auto', 'rapidfuzz', 'ngram')
+NGRAM = 3
+# Characters that count as a space between words
+WHITESPACE = np.zeros(256, dtype=bool)
+WHITESPACE[[ord(c) for c in ' \t\n\r\x0b\x0c\xa0']] = True
+
+
+def _code_points(texts):
+    # All texts in one array of code points with a 0 between them, spaces around them
+    # and single spaces inside them, plus the row number of every position
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+    if texts.str.contains('\x00', regex=False).any():
+        texts = texts.str.replace('\x00', ' ', regex=False)
+    joined = ' ' + ' \x00 '.join(texts) + ' '
+    chars = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).copy()
+    chars[WHITESPACE[np.minimum(chars, 255)] & (chars < 256)] = 32
+    double_space = (chars[1:] == 32) & (chars[:-1] == 32)
+    chars = chars[np.concatenate(([True], ~double_space))]
+    return chars, np.cumsum(chars == 0, dtype=np.int32)
+
+
+def _ngrams(chars, row, n, bits):
+    # (row, n-gram) pairs for every n-gram that does not cross the 0 between two
+    # texts. The characters of an n-gram are packed into one int32 or int64
+    size = max(len(chars) - n + 1, 0)
+    grams = np.zeros(size, dtype=np.int32 if n * bits < 32 else np.int64)
+    inside = np.ones(size, dtype=bool)
+    for i in range(n):
+        part = chars[i:size + i]
+        grams = (grams << bits) | part.astype(grams.dtype)
+        inside &= part != 0
+    return row[:size][inside], grams[inside]
+
+
+def _unique(keys):
+    keys = np.sort(keys, kind='stable')
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def ngram_similarity(left, right, n=NGRAM):
+    """Dice similarity of the character n-gram sets of every pair (left[i], right[i]).
+
+    Both columns are turned into sparse (row, n-gram) sets and the overlap of all
+    pairs is counted with one sorted intersection, so there is no Python loop per pair.
+    """
+    size = len(left)
+    chars_l, row_l = _code_points(left)
+    chars_r, row_r = _code_points(right)
+    if max(chars_l.max(initial=0), chars_r.max(initial=0)) < 256 and n <= 3:
+        # Only Latin-1 characters: with 8 bits per character the (row, n-gram) key
+        # fits in one int64 without numbering the n-grams first
+        rows_l, ids_l = _ngrams(chars_l, row_l, n, 8)
+        rows_r, ids_r = _ngrams(chars_r, row_r, n, 8)
+        vocabulary = 1 << (n * 8)
+    else:
+        # 21 bits per character covers all of Unicode; number the n-grams of both
+        # sides with one vocabulary
+        rows_l, grams_l = _ngrams(chars_l, row_l, n, 21)
+        rows_r, grams_r = _ngrams(chars_r, row_r, n, 21)
+        ids = pd.factorize(np.concatenate([grams_l, grams_r]))[0].astype(np.int64)
+        vocabulary = int(ids.max()) + 1 if len(ids) else 1
+        ids_l, ids_r = ids[:len(grams_l)], ids[len(grams_l):]
+    # The keys are already in row order, a stable sort is mostly merging
+    keys_l = _unique(rows_l.astype(np.int64) * vocabulary + ids_l)
+    keys_r = _unique(rows_r.astype(np.int64) * vocabulary + ids_r)
+    both = np.sort(np.concatenate([keys_l, keys_r]), kind='stable')
+    common = both[1:][both[1:] == both[:-1]]
+    overlap = np.bincount(common // vocabulary, minlength=size)
+    total = np.bincount(keys_l // vocabulary, minlength=size) + np.bincount(keys_r // vocabulary, minlength=size)
+    return np.where(total > 0, 2 * overlap / np.maximum(total, 1), 0.0)
+
+
+def match_backend(backend='difflib'):
+    """Return the backend that ``title_similarity`` uses for ``backend``: 'auto' becomes rapidfuzz or ngram."""
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown match_backend {backend!r}, use one of {BACKENDS}')
+    if backend in ('auto', 'rapidfuzz'):
+        try:
+            import rapidfuzz  # noqa: F401  optional, version 3.6 or later
+        except ImportError:
+            if backend == 'rapidfuzz':
+                raise
+            return 'ngram'
+        return 'rapidfuzz'
+    return backend
+
+
+def title_similarity(left, right, backend='difflib'):
+    """Return a similarity between 0 and 1 for every pair (left[i], right[i])."""
+    backend = match_backend(backend)
+    left = pd.Series(left, dtype=object).fillna('').astype(str).to_numpy()
+    right = pd.Series(right, dtype=object).fillna('').astype(str).to_numpy()
+    # The editions of a book often have the same title, so every different pair is scored once
+    left_codes, left = pd.factorize(left)
+    right_codes, right = pd.factorize(right)
+    pairs, unique = pd.factorize(left_codes.astype(np.int64) * max(len(right), 1) + right_codes)
+    left = left[unique // max(len(right), 1)]
+    right = right[unique % max(len(right), 1)]
+    if backend == 'rapidfuzz':
+        from rapidfuzz import fuzz, process
+        # Normalized Indel similarity: 2 * longest common subsequence / total length. Not the
+        # score of SequenceMatcher.ratio, which counts the matching blocks it finds with its
+        # junk heuristic; the two rank candidates differently (bench_matching.py)
+        return (process.cpdist(left.tolist(), right.tolist(), scorer=fuzz.ratio, workers=-1) / 100)[pairs]
+    if backend == 'ngram':
+        return ngram_similarity(left, right)[pairs]
+    return np.array([SequenceMatcher(lambda y: y == " ", a, b).ratio() for a, b in zip(left, right)])[pairs]
+
+
+def top_matches(frame, key, score, top_k=None, threshold=0.0):
+    """Keep the rows with a score of at least ``threshold`` and at most ``top_k`` rows per key.
+
+    The rows keep their original order; ties are broken by that order.
+    """
+    keep = frame[score] >= threshold
+    if top_k:
+        rank = frame[score].where(keep).groupby(frame[key]).rank(method='first', ascending=False)
+        keep &= rank <= int(top_k)
+    return frame[keep]
@@ -0,0 +1,245 @@
+# Run metrics of the WorldCat tools
+# Times of the stages of a run (Excel load, preprocessing, lookups, accumulation, merge,
+# write) and of every API request (token, latency, JSON parse, status, bytes), so a slow
+# nightly run shows where the time went. At the end of a run they are written to a JSON
+# summary in the output folder and, with metrics_textfile_dir in the config file, to a
+# Prometheus textfile (for the textfile collector of node_exporter)
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import io
+import re
+import json
+import time
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+
+# Upper bounds (seconds) of the histogram buckets, the default buckets of the Prometheus clients
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum and count."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for n, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[n] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket with quantile ``q`` (like histogram_quantile, without interpolation)."""
+        if not self.count:
+            return None
+        seen = 0
+        for n, bound in enumerate(BUCKETS):
+            seen += self.buckets[n]
+            if seen >= q * self.count:
+                return bound
+        return float('inf')
+
+
+class Metrics:
+    """Counters and latency histograms of a run, with labels; can be shared by threads.
+
+    ``stage`` times a part of the run. With ``profile_stage`` that stage also runs under
+    cProfile (only the thread that runs the stage is profiled).
+    """
+
+    def __init__(self, profile_stage=None):
+        self.counters = {}
+        self.histograms = {}
+        self.profile_stage = profile_stage
+        self.profiler = None
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a counter to a number that is kept somewhere else (e.g. the hits of the response cache)."""
+        with self._lock:
+            self.counters[self._key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the time of the block in the histogram ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def stage(self, stage):
+        """Time a stage of the run; a stage can run more than once (e.g. once per chunk)."""
+        profile = stage == self.profile_stage
+        if profile:
+            if self.profiler is None:
+                self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        try:
+            with self.timer('stage_seconds', stage=stage):
+                yield
+        finally:
+            if profile:
+                self.profiler.disable()
+
+    def timed_iter(self, stage, iterable):
+        """Yield the items of ``iterable`` with the time of getting each item in ``stage`` (e.g. reading chunks)."""
+        items = iter(iterable)
+        while True:
+            with self.stage(stage):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            yield item
+
+    def snapshot(self):
+        """The counters and histograms as they are now, for ``merge(..., since=...)`` later."""
+        with self._lock:
+            return (dict(self.counters),
+                    {key: (list(h.buckets), h.count, h.sum) for key, h in self.histograms.items()})
+
+    def merge(self, other, since=None):
+        """Add the counters and histograms of ``other`` (e.g. those of the client) to these.
+
+        With ``since``, a snapshot of ``other`` taken earlier, only what was added to
+        ``other`` after the snapshot is added.
+        """
+        counters, histograms = other.snapshot()
+        if since is not None:
+            old_counters, old_histograms = since
+            counters = {key: value - old_counters.get(key, 0) for key, value in counters.items()}
+            counters = {key: value for key, value in counters.items() if value or key not in old_counters}
+            for key, (old_buckets, old_count, old_sum) in old_histograms.items():
+                buckets, count, total = histograms[key]
+                if count == old_count:
+                    del histograms[key]
+                else:
+                    histograms[key] = ([a - b for a, b in zip(buckets, old_buckets)], count - old_count, total - old_sum)
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (buckets, count, total) in histograms.items():
+                h = self.histograms.setdefault(key, Histogram())
+                h.buckets = [a + b for a, b in zip(h.buckets, buckets)]
+                h.count += count
+                h.sum += total
+
+    def stage_seconds(self):
+        """Total seconds per stage, in the order the stages first ran."""
+        with self._lock:
+            return {dict(pairs)['stage']: h.sum for (name, pairs), h in self.histograms.items() if name == 'stage_seconds'}
+
+    def to_prometheus(self, prefix='worldcat', **const_labels):
+        """The metrics in the Prometheus text format."""
+        def labels(pairs, extra=()):
+            pairs = sorted(const_labels.items()) + list(pairs) + list(extra)
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}' if pairs else ''
+
+        lines = []
+        with self._lock:
+            for name in sorted({key[0] for key in self.counters}):
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                for (n, pairs), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f'{prefix}_{name}{labels(pairs)} {value}')
+            for name in sorted({key[0] for key in self.histograms}):
+                lines.append(f'# TYPE {prefix}_{name} histogram')
+                for (n, pairs), h in sorted(self.histograms.items()):
+                    if n != name:
+                        continue
+                    seen = 0
+                    for bound, count in zip(BUCKETS, h.buckets):
+                        seen += count
+                        lines.append(f'{prefix}_{name}_bucket{labels(pairs, [("le", bound)])} {seen}')
+                    lines.append(f'{prefix}_{name}_bucket{labels(pairs, [("le", "+Inf")])} {h.count}')
+                    lines.append(f'{prefix}_{name}_sum{labels(pairs)} {h.sum:.6f}')
+                    lines.append(f'{prefix}_{name}_count{labels(pairs)} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """The metrics as a dictionary for the JSON run summary."""
+        def name(n, pairs):
+            return n + ''.join(f'[{v}]' for _, v in pairs)
+
+        with self._lock:
+            return {
+                'started': str(self.started),
+                'finished': str(datetime.now()),
+                'counters': {name(n, pairs): value for (n, pairs), value in sorted(self.counters.items())},
+                'timings': {name(n, pairs): {'count': h.count, 'seconds': round(h.sum, 3),
+                                             'mean': round(h.sum / h.count, 4) if h.count else None,
+                                             'p50': h.quantile(0.5), 'p95': h.quantile(0.95), 'p99': h.quantile(0.99)}
+                            for (n, pairs), h in sorted(self.histograms.items())},
+            }
+
+
+def export_metrics(config, folder, tool, metrics, wc=None, since=None):
+    """Write the metrics of a run: the JSON summary in ``folder`` and the Prometheus textfile.
+
+    The request metrics of the client ``wc`` are added. A client that is shared by the
+    jobs of a batch has the requests of all those jobs, so ``since`` (the
+    wc.metrics_snapshot() of the start of the run) limits them to the requests made
+    since; jobs that run at the same time (parallel) still count each other's requests.
+    """
+    if wc is not None:
+        wc.update_metrics()
+        metrics.merge(wc.metrics, since=since)
+    # The name of the output folder tells the jobs of a batch apart
+    job = re.split(r'[\\/]', folder.rstrip('\\/'))[-1]
+    summary = {'tool': tool, 'job': job, **metrics.summary()}
+    hits = summary['counters'].get('cache_hits_total', 0)
+    misses = summary['counters'].get('cache_misses_total', 0)
+    if hits + misses:
+        summary['cache_hit_ratio'] = round(hits / (hits + misses), 4)
+    with open(os.path.join(folder, f'metrics_{tool}.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    logger.debug('Time per stage: ' + ', '.join(f'{stage} {seconds:.1f} s' for stage, seconds in metrics.stage_seconds().items()))
+
+    textfile_dir = config.get('metrics_textfile_dir')
+    if textfile_dir:
+        os.makedirs(textfile_dir, exist_ok=True)
+        path = os.path.join(textfile_dir, f'worldcat_{tool}_{job}.prom')
+        # Written to a temporary file first, so the collector never reads half a file
+        with open(path + '.tmp', 'w') as f:
+            f.write(metrics.to_prometheus(tool=tool, job=job))
+        os.replace(path + '.tmp', path)
+
+    if metrics.profiler is not None:
+        path = os.path.join(folder, f'profile_{tool}_{metrics.profile_stage}.prof')
+        metrics.profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(metrics.profiler, stream=out).sort_stats('cumulative').print_stats(15)
+        logger.debug(f'Profile of stage {metrics.profile_stage} (open {path} with snakeviz or pstats):\n{out.getvalue()}')
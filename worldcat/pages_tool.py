@@ -0,0 +1,277 @@
+# Publishers tool to be able to augment data with
+# publisher data from WorldCat using the OCLC Discovery API
+# Author: Mark Bruyneel
+# Started with: worldcat pages (see cli.py)
+#
+# Date: 2026-10-17
+# Version: 2.0
+# Created using Python version 3.10
+#
+# Re-use note: Make sure to change folder names that are relevant to your computer
+
+import pandas as pd # version 2.2.3
+import os
+import numpy as np
+# To catch errors, use the logger option from loguru
+from loguru import logger #version 0.7.2
+# Also needed to get the run time of the script
+from datetime import datetime #version 5.5
+from pathlib import Path
+from .client import WorldCatClient
+from .engine import run_concurrent
+from .journal import Journal
+from .accumulator import ColumnAccumulator
+from .records import BIB_COLUMNS, URL_COLUMNS, extract_bib_records
+from .physical import PHYSICAL_COLUMNS, parse_physical_descriptions
+from .stream import ChunkWriter, HashSet
+from .archive import open_responses
+from .metrics import Metrics, export_metrics
+from .rebuild import open_offline, MissingResponsesError
+from .delta import DeltaState, NEW, CHANGED, changes_table
+from .core import load_config, log_failed_lookup, RunTimer
+from . import PAGES_CONFIG
+
+# Show all data in screen
+pd.set_option("display.max.columns", None)
+
+
+# Login scope of the bibs endpoint
+# SCOPE = ['wcapi:view_brief_bib']
+SCOPE = ['wcapi:view_bib']
+# Folder with the response archive and the results, and the journal of the lookups
+FOLDER = r'U:\Werk\OWO\WC_pages_test'
+JOURNAL_FILE = r'U:\Werk\OWO\Journal\WorldCat_pages_journal.jsonl'
+
+
+def oclc_numbers(column):
+    """OCLC numbers as integers (missing or not a number: <NA>), the same type in all tables."""
+    return pd.to_numeric(column, errors='coerce').astype('Int64')
+
+
+# An error is logged and gives exit status 1
+@logger.catch(default=1)
+def main(args):
+    """Run the tool; ``args`` has the config file, the input file and the resume flag (see cli.py)."""
+    # Get configuration information to connect to WorldCat Search API
+    config = load_config(args.config or PAGES_CONFIG)
+    timer = RunTimer()
+    logger.add(r'U:\Werk\OWO\WC_Pages_Search_test.log', backtrace=True, diagnose=True, rotation="10 MB", retention="12 months")
+
+    # Provide the file name and location for which to look up data
+    csvfile = args.input or input('Please provide the location and name of the tab-delimited file.\nExample: C:\\temp\\file_data.csv or .txt file\n')
+
+    if args.offline is not None:
+        # Rebuild the result files from the archived responses of an earlier run, without the API
+        offline = open_offline(config, FOLDER, 'pages', args.offline or None, args.processes,
+                               allow_missing=args.allow_missing)
+        try:
+            run(None, config, csvfile, offline=offline)
+        except MissingResponsesError as err:
+            # Exit status 1, so an incomplete rebuild is not taken for a good one
+            logger.error(str(err))
+            return 1
+    else:
+        # One session, token and connection pool shared by all workers
+        wc = WorldCatClient(config, SCOPE)
+        run(wc, config, csvfile, resume=args.resume)
+        # Close the response cache and log how many lookups it saved
+        wc.close()
+
+    # Logging of script run:
+    timer.log()
+
+
+def run(wc, config, csvfile, resume=False, folder=FOLDER, journal_file=JOURNAL_FILE, offline=None):
+    """Download the page numbers and urls for the OCLC numbers in one tab-delimited file.
+
+    ``wc`` is a WorldCatClient with the bibs scope and the result files are written to
+    ``folder``. Nothing is asked, so the batch runner can call this for many files.
+    With ``offline`` (an OfflineResponses, see rebuild.py) ``wc`` is not used and the
+    files are made from the archived responses of an earlier run.
+    """
+    # Date for file names
+    runday = str(datetime.today().date())
+
+    # create download folder if it doesn't exist
+    Path(folder).mkdir(parents=True, exist_ok=True)
+
+    # The raw responses go into one compressed archive per run (see archive.py), or into
+    # json files with a backup folder for those of last time (response_store: json).
+    # An offline rebuild uses the responses of an earlier run and looks nothing up
+    responses = None
+    if offline is None:
+        responses = open_responses(config, folder, 'pages', os.path.join(folder, f'backup_{runday}'), resume=resume)
+    workers = wc.workers if offline is None else 1
+    # Times of the stages and the requests of the run, written at the end (see metrics.py)
+    metrics = Metrics(config.get('profile_stage'))
+    # The client can be shared with earlier jobs of a batch: only the requests from here on count
+    client_start = wc.metrics_snapshot() if wc is not None else None
+
+    # Create an output folder if it doesn't exist
+    Path(r'U:\Werk\OWO\Output').mkdir(parents=True, exist_ok=True)
+
+    # Get WorldCat Records for each OCLC number in the list
+    # Returns None if the lookup failed
+    @log_failed_lookup
+    def lookup_oclc(listitem, oclc_nr):
+        logger.debug(f'Retrieving data for Oclc number {oclc_nr}, {listitem + 1} of a total of {length_list})')
+        result = wc.get("/bibs", "q=" + str(oclc_nr) + "&groupRelatedEditions=false&openAccess&showHoldingsIndicators=true")
+        # keep the response as backup
+        responses.put(oclc_nr, result)
+        # The physical description and the urls of all records in the response
+        return extract_bib_records(result)
+
+    # Offline rebuild: the rows come from the archived responses per OCLC number
+    if offline is not None:
+        lookup_oclc = offline.lookup
+
+    # With chunk_size in the config file the input file is read, looked up and written
+    # chunk by chunk, so the input and the result tables are never in memory as a whole.
+    # A number can come back in a later chunk: its rows are then read back from the
+    # journal file, which does not keep them in memory
+    chunk_size = config.get('chunk_size')
+    chunks = pd.read_csv(f'{csvfile}', sep='\t', chunksize=int(chunk_size)) if chunk_size else [pd.read_csv(f'{csvfile}', sep='\t')]
+    # Every finished lookup goes into the journal, so an interrupted run can be resumed
+    # (an offline rebuild keeps it in memory only). The journal syncs the response archive
+    # before its own file, once per record
+    journal = Journal(journal_file if offline is None else None, resume=resume and offline is None,
+                      keep_rows=not chunk_size or offline is not None,
+                      before_sync=responses.sync if responses is not None else None)
+    # Delta mode (delta_file in the config file): OCLC numbers that were looked up less than
+    # delta_max_age_days ago are not looked up again, their rows come from the state file.
+    # delta_done has the numbers that are taken from the state file or stored in it in this run
+    delta = DeltaState.from_config(config, 'pages') if offline is None else None
+    delta_done = set()
+    changes = {}
+
+    # The output files are written chunk by chunk (output_format: csv or parquet)
+    fmt = config.get('output_format', 'csv')
+    Pages_Book_File = ChunkWriter(os.path.join(folder, f'WorldCat_Book_attributes_list_{runday}.txt'),
+                                  BIB_COLUMNS + PHYSICAL_COLUMNS, fmt, sep='\t', encoding='utf-8')
+    Urls_File = ChunkWriter(os.path.join(folder, f'WorldCat_Book_attributes_urls_list_{runday}.txt'),
+                            URL_COLUMNS, fmt, sep='\t', encoding='utf-8')
+    Finalurls_File = ChunkWriter(os.path.join(folder, f'WorldCat_Books_&_Pages_&_urls_list_{runday}.txt'),
+                                 [], fmt, sep='\t', encoding='utf-8')
+    # Delta mode: the rows of the merged table of the OCLC numbers that are new or have another result than last time
+    Finalurls_changes = ChunkWriter(os.path.join(folder, f'WorldCat_Books_&_Pages_&_urls_list_changes_{runday}.txt'),
+                                    [], fmt, sep='\t', encoding='utf-8')
+    # Records and urls that are already in the attribute files
+    pages_seen = HashSet()
+    urls_seen = HashSet()
+    page_counts = []
+    rows_read = 0
+    length_list = 0
+
+    for Pubs in metrics.timed_iter('csv_load', chunks):
+        with metrics.stage('preprocess'):
+            rows_read += len(Pubs)
+            # Remove added .0 from each field where it was added by importing
+            Pubs['ISBN1'] = Pubs['ISBN1'].astype(str)
+            Pubs['ISBN1'] = Pubs['ISBN1'].str.replace('.0', '')
+            Pubs['Search_ISBN'] = Pubs['Search_ISBN'].astype(str)
+            Pubs['Search_ISBN'] = Pubs['Search_ISBN'].str.replace('.0', '')
+            Pubs['Pub_year'] = Pubs['Pub_year'].astype(str)
+            Pubs['Pub_year'] = Pubs['Pub_year'].str.replace('.0', '')
+
+            # Create a list of OCLC numbers to look up data for. The input has a row per search ISBN
+            # and edition, so the same OCLC number is often in it more than once: every number is
+            # looked up once and the merge at the end puts the result on all rows with that number
+            Pubs['OCLC_nr'] = oclc_numbers(Pubs['OCLC_nr'])
+            OCLC_list = Pubs['OCLC_nr'].dropna().drop_duplicates().tolist()
+            first = length_list
+            length_list += len(OCLC_list)
+
+        # The lookups run in parallel when workers > 1 in the config file. The results
+        # come back in the order of the OCLC number list. Numbers that are in the journal
+        # already (from an earlier chunk or an interrupted run) are not looked up again
+        lookup = journal.wrap(lookup_oclc)
+        with metrics.stage('lookup'):
+            if delta is not None:
+                keys = [str(oclc_nr) for oclc_nr in OCLC_list]
+                reused = delta.fresh_keys(dict.fromkeys(k for k in keys if k not in journal and k not in delta_done))
+                # Their responses go into the archive of this run too, for an offline rebuild
+                responses.reuse([k for k in keys if k in reused])
+                if journal.keep_rows:
+                    journal.preload(delta.rows(reused))
+                else:
+                    # Streaming: into the journal file, so a later chunk can read them back from there
+                    journal.record_many(delta.rows(reused).items())
+                delta_done |= reused
+            results = run_concurrent(lambda item, oclc_nr: lookup(first + item, oclc_nr), OCLC_list, workers)
+            if delta is not None:
+                looked_up = [(k, None, result) for k, result in zip(keys, results) if k not in delta_done and result is not None]
+                changes.update(delta.update(looked_up))
+                delta_done.update(k for k, _, _ in looked_up)
+
+        with metrics.stage('accumulate'):
+            # Create Dataframe for information from WorldCat
+            # Collect the rows per column and make one DataFrame per table
+            Pages_Book_Acc = ColumnAccumulator(BIB_COLUMNS)
+            Urls_Acc = ColumnAccumulator(URL_COLUMNS)
+            for result in results:
+                if result is None:
+                    continue
+                bibs, urls = result
+                Pages_Book_Acc.extend(bibs)
+                Urls_Acc.extend(urls)
+            # A record can be in the response for more than one number; keep it once, or the
+            # merge would give its input rows more than once
+            Pages_Book_Table = Pages_Book_Acc.to_frame().drop_duplicates(ignore_index=True)
+            Urls_Table = Urls_Acc.to_frame().drop_duplicates(ignore_index=True)
+            Pages_Book_Table['OCLC_nr'] = oclc_numbers(Pages_Book_Table['OCLC_nr'])
+            Urls_Table['OCLC_nr'] = oclc_numbers(Urls_Table['OCLC_nr'])
+
+        with metrics.stage('parse'):
+            # Page count, front matter pages, volumes and height in cm from the physical descriptions
+            Pages_Book_Table = Pages_Book_Table.join(parse_physical_descriptions(Pages_Book_Table['Physical_Attributes']))
+
+        with metrics.stage('write'):
+            # Export end result: the records and urls that are not in the files yet
+            new_pages = Pages_Book_Table[pages_seen.add_new(Pages_Book_Table[BIB_COLUMNS])]
+            Pages_Book_File.write(new_pages, renumber=True)
+            page_counts.append(new_pages['Pages'].dropna().to_numpy(dtype=np.int64))
+            Urls_File.write(Urls_Table[urls_seen.add_new(Urls_Table)], renumber=True)
+
+        with metrics.stage('merge'):
+            # Merge the download table with the original data file
+            Final = pd.merge(Pubs, Pages_Book_Table, how='outer', on=['OCLC_nr'])
+            # drop rows where value in column is null
+            Final = Final.dropna(subset=['Holding'])
+            Final.drop(Final.columns[Final.columns.str.contains('unnamed', case=False)], axis=1, inplace=True)
+            NewFinal = Final.reset_index()
+            NewFinal.drop(NewFinal.columns[NewFinal.columns.str.contains('index', case=False)], axis=1, inplace=True)
+
+            # Merge the download table with the urls_table
+            Finalurls = pd.merge(NewFinal, Urls_Table, how='outer', on=['OCLC_nr'])
+        with metrics.stage('write'):
+            Finalurls_File.write(Finalurls, renumber=True)
+            if delta is not None:
+                Finalurls_changes.write(changes_table(Finalurls, 'OCLC_nr', {k: changes[k] for k in keys if k in changes}),
+                                        renumber=True)
+    journal.close()
+    if responses is not None:
+        responses.close()
+    with metrics.stage('write'):
+        for writer in (Pages_Book_File, Urls_File, Finalurls_File):
+            writer.close()
+        if delta is not None:
+            Finalurls_changes.close()
+    if delta is not None:
+        delta.close()
+        metrics.set('delta_reused_total', delta.reused)
+        metrics.set('delta_changes_total', delta.changes[NEW], change=NEW)
+        metrics.set('delta_changes_total', delta.changes[CHANGED], change=CHANGED)
+    logger.debug(f'Nr. of OCLC numbers in the list: {rows_read}, of which {len(journal.done)} different numbers \n')
+    page_counts = np.concatenate(page_counts) if page_counts else np.empty(0, dtype=np.int64)
+    logger.debug(f'Page count found for {len(page_counts)} of {Pages_Book_File.rows} records'
+                 + (f', median {np.median(page_counts):.0f} pages' if len(page_counts) else ''))
+
+    # The metrics of the run: a JSON summary in the folder and the Prometheus textfile
+    metrics.set('items_total', length_list)
+    metrics.set('items_failed_total', len(journal.failed))
+    if offline is not None:
+        metrics.set('rebuild_missing_total', len(offline.missing))
+    export_metrics(config, folder, 'pages', metrics, wc, since=client_start)
+    if offline is not None:
+        # Keys of the input without an archived response fail the rebuild (see rebuild.py)
+        offline.check()
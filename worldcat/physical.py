@@ -0,0 +1,90 @@
+# Numbers from the physical description of a bib record
+# A physicalDescription like "xii, 345 pages : illustrations ; 24 cm" or "2 delen (XVI, 812 blz.) ; 25 cm"
+# is turned into numeric columns: page count, front matter pages, volumes and height in cm.
+# The whole column is done at once: the different descriptions are put in one text, the
+# precompiled regular expressions run over that text and the result is spread over the rows
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import re
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+# Numeric columns added to the table of the pages tool
+PHYSICAL_COLUMNS = ['Pages', 'Front_pages', 'Volumes', 'Height_cm']
+
+# Page counts in English and Dutch: "345 pages", "345 p.", "345 pp.", "345 blz.", "345 pagina's",
+# "345 bladzijden", "345 leaves"; optionally after roman front matter pages: "xii, 345 p." or "[8], 345 p."
+# ("cm" is not a roman numeral here, but the height before the pages: "24 cm, 345 p.")
+PAGES = re.compile(r"(?:\b(?!cm\b)(?P<front>[ivxlcdm]+)\]?[^\S\n]*,[^\S\n]*|\[\d+\][^\S\n]*,[^\S\n]*)?\[?(?P<pages>\d+)\]?[^\S\n]*"
+                   r"(?:pages?\b|pp?\.|pp?\b|blz\.?|bladz\.?|bladzijden\b|pagina(?:'s|s)?\b|pag\.|leaves\b|bl\.)",
+                   re.IGNORECASE)
+# Number of volumes: "2 volumes", "3 vols.", "2 v.", "2 delen", "3 dln.", "2 banden"
+VOLUMES = re.compile(r"(?P<volumes>\d+)[^\S\n]*(?:volumes?\b|vols?\.?|v\.|delen\b|deel\b|dln\.?|band(?:en)?\b)",
+                     re.IGNORECASE)
+# Height: "24 cm", "24,5 cm", "23.5cm"
+# ([^\S\n] is white space but not a line break, so a match always stays on one line)
+HEIGHT = re.compile(r"(?P<height>\d+(?:[.,]\d+)?)[^\S\n]*cm\b", re.IGNORECASE)
+
+ROMAN = {'i': 1, 'v': 5, 'x': 10, 'l': 50, 'c': 100, 'd': 500, 'm': 1000}
+
+
+def roman_to_int(numeral):
+    """Value of a roman numeral like 'xii' (either case), or NaN if it is not one."""
+    if not isinstance(numeral, str) or not numeral:
+        return np.nan
+    values = [ROMAN.get(c) for c in numeral.lower()]
+    if None in values:
+        return np.nan
+    # A smaller value before a larger one is subtracted (ix = 9)
+    return sum(-v if v < after else v for v, after in zip(values, values[1:] + [0]))
+
+
+
+def _per_line(pattern):
+    # The pattern as an optional match after the shortest possible start of a line: it
+    # matches once on every line of a text, at the first place re.search would find, and
+    # also if nothing is found. Each pattern is searched on its own, so the parts of a
+    # description can be in any order ("345 p. ; 2 v." as well as "2 v. (xii, 800 p.)")
+    return re.compile(r'^(?:[^\n]*?' + pattern.pattern + r')?', re.IGNORECASE | re.MULTILINE)
+
+
+LINE_VOLUMES, LINE_PAGES, LINE_HEIGHT = (_per_line(p) for p in (VOLUMES, PAGES, HEIGHT))
+
+
+def parse_physical_descriptions(descriptions):
+    """Return a DataFrame with PHYSICAL_COLUMNS for a column of physicalDescription strings.
+
+    The result has the index of ``descriptions``. Numbers that are not in a description
+    are missing (<NA>); the text "None" used for records without a description gives
+    an empty row as well. The first page count of a description is used, so for
+    "1 online resource (xii, 345 pages)" that is 345 with 12 front matter pages.
+    """
+    descriptions = pd.Series(descriptions)
+    # Descriptions repeat a lot (all "1 online resource" etc.), so only the different ones are parsed
+    codes, unique = pd.factorize(descriptions.astype(str), sort=False)
+    # One line per description and one findall per pattern over all lines: the loop runs in the regex engine
+    unique = pd.Series(unique, dtype=object).str.replace('\n', ' ', regex=False)
+    text = '\n'.join(unique)
+    if len(unique):
+        parsed = pd.DataFrame(LINE_PAGES.findall(text), columns=list(LINE_PAGES.groupindex))
+        parsed['volumes'] = LINE_VOLUMES.findall(text)
+        parsed['height'] = LINE_HEIGHT.findall(text)
+        parsed = parsed.replace('', None)
+    else:
+        parsed = pd.DataFrame(columns=['front', 'pages', 'volumes', 'height'])
+    # Only a few different roman numerals, so each one is converted once
+    front_codes, front_unique = pd.factorize(parsed['front'])
+    front = np.append(np.array([roman_to_int(f) for f in front_unique], dtype=float), np.nan)[front_codes]
+    parsed = pd.DataFrame({
+        'Pages': pd.to_numeric(parsed['pages'], errors='coerce'),
+        'Front_pages': front,
+        'Volumes': pd.to_numeric(parsed['volumes'], errors='coerce'),
+        'Height_cm': pd.to_numeric(parsed['height'].str.replace(',', '.'), errors='coerce'),
+    }).astype({'Pages': 'Int64', 'Front_pages': 'Int64', 'Volumes': 'Int64', 'Height_cm': 'Float64'})
+    # Spread the parsed descriptions over all rows
+    result = parsed.take(codes)
+    result.index = descriptions.index
+    return result
@@ -0,0 +1,96 @@
+# Query planner for the text search tool
+# Tries a strict search first and relaxes it step by step (no year, fewer words,
+# title phrase) until a search has results. Searches that are known to have no
+# results are not sent again, also not for other files or in a later run
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import threading
+from collections import Counter
+import pandas as pd  # version 2.2.3
+
+
+class QueryPlanner:
+    """Builds and runs the relaxed searches for the word lists of the file names.
+
+    ``word_lists`` are all word lists of the run: words that are in many file names
+    carry the least information and are dropped first. With a ResponseCache as
+    ``cache`` the searches without results are remembered between runs.
+    """
+
+    def __init__(self, word_lists, cache=None, path='/brief-bibs', relax=True, min_words=2, phrase_words=4):
+        self.frequency = Counter(word for words in word_lists for word in set(words))
+        self.cache = cache
+        self.path = path
+        self.relax = relax
+        self.min_words = min_words
+        self.phrase_words = phrase_words
+        self.sent = 0
+        self.skipped = 0
+        self._empty = set()
+        self._lock = threading.Lock()
+
+    def plan(self, words, year=None):
+        """Return the searches for a word list, from strict to relaxed."""
+        words = list(words)
+        has_year = year is not None and not pd.isna(year) and str(year) != 'nan'
+        queries = []
+        if has_year:
+            queries.append(' AND '.join(words) + ' AND yr:' + str(year))
+        if not self.relax and queries:
+            return queries
+        queries.append(' AND '.join(words))
+        if self.relax:
+            # Drop the most common word (then the shortest one) until min_words are left
+            remaining = list(words)
+            while len(remaining) > self.min_words:
+                drop = max(remaining, key=lambda w: (self.frequency[w], -len(w)))
+                remaining.remove(drop)
+                queries.append(' AND '.join(remaining))
+            # Last try: the first words of the file name as a phrase in the title
+            if words:
+                queries.append('ti:"' + ' '.join(words[:self.phrase_words]) + '"')
+        # The same search can come up twice, e.g. with a short word list
+        return list(dict.fromkeys(queries))
+
+    @staticmethod
+    def form(query):
+        """Key of a search: the order of the AND terms and upper/lower case do not matter."""
+        if query.startswith('ti:"'):
+            return query.lower()
+        return ' AND '.join(sorted(term.strip().lower() for term in query.split(' AND ')))
+
+    def is_known_empty(self, query):
+        form = self.form(query)
+        with self._lock:
+            if form in self._empty:
+                return True
+        return self.cache is not None and self.cache.is_known_empty(self.path, 'q=' + form)
+
+    def mark_empty(self, query):
+        form = self.form(query)
+        with self._lock:
+            self._empty.add(form)
+        if self.cache is not None:
+            self.cache.put(self.path, 'q=' + form, {'numberOfRecords': 0})
+
+    def run(self, words, year, search):
+        """Send the planned searches until one has records.
+
+        ``search(query)`` returns the list of records of a search. Returns the
+        productive search and its records, or (None, []) if all searches are empty.
+        """
+        for query in self.plan(words, year):
+            if self.is_known_empty(query):
+                with self._lock:
+                    self.skipped += 1
+                continue
+            with self._lock:
+                self.sent += 1
+            records = search(query)
+            if records:
+                return query, records
+            self.mark_empty(query)
+        return None, []
@@ -0,0 +1,136 @@
+# Offline rebuild of the result files of the WorldCat tools
+# After a change of a column or of a parsing rule all result files of a tool can be made
+# again from the response archive of an earlier run (see archive.py), without a single
+# request to the API. The responses are parsed in a pool of processes, block by block,
+# so a run of 50.000 responses is rebuilt in seconds instead of hours of lookups.
+# Started with: worldcat isbn --offline (and text, pages or batch). Keys of the input
+# without an archived response are reported at the end and the run fails (exit status 1),
+# unless --allow-missing or rebuild_allow_missing: true in the config file
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+from .archive import ArchiveReader, INDEX_FILE, list_runs, read_block
+from .records import extract_brief_records, extract_bib_records
+
+# The function that turns a response into the rows of the tool, as in the lookups of the tools
+EXTRACTORS = {'isbn': extract_brief_records, 'text': extract_brief_records, 'pages': extract_bib_records}
+# Blocks of the archive (of 100 responses) that a process parses in one task
+TASK_BLOCKS = 20
+
+
+def find_archive(folder, tool, archive=None):
+    """Return the archive folder to rebuild from: ``archive`` if given, else the last run of ``tool`` in ``folder``."""
+    if archive:
+        if not os.path.isfile(os.path.join(archive, INDEX_FILE)):
+            raise FileNotFoundError(f'{archive} is not a response archive (no {INDEX_FILE})')
+        return archive
+    runs = list_runs(folder, tool)
+    if not runs:
+        raise FileNotFoundError(f'No response archive of the {tool} tool in {folder}; '
+                                f'the tool has to run once with response_store: archive first')
+    return runs[-1]
+
+
+def _parse_blocks(path, tool, blocks):
+    """Parse the responses in ``blocks`` of the archive ``path`` and return (key, rows) pairs."""
+    extract = EXTRACTORS[tool]
+    parsed = []
+    for segment, offset, length, lines in blocks:
+        block = read_block(path, segment, offset, length)
+        for line, key in lines:
+            parsed.append((key, extract(json.loads(block[line]))))
+    return parsed
+
+
+def parse_archive(path, tool, processes=None):
+    """Return a dict with the rows per key of all responses in the archive ``path``.
+
+    The blocks are divided over ``processes`` processes (default: one per CPU); with 1
+    process, or an archive of one task, everything is parsed in this process. The pending
+    responses of a run that did not close its archive are parsed here as well.
+    """
+    reader = ArchiveReader(path)
+    blocks = reader.blocks()
+    tasks = [blocks[i:i + TASK_BLOCKS] for i in range(0, len(blocks), TASK_BLOCKS)]
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+    if processes <= 1:
+        parts = [_parse_blocks(path, tool, task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            # map gives the parts in the order of the tasks
+            parts = list(executor.map(_parse_blocks, repeat(path), repeat(tool), tasks))
+    results = {key: rows for part in parts for key, rows in part}
+    extract = EXTRACTORS[tool]
+    results.update((key, extract(response)) for key, response in reader.pending.items())
+    return results
+
+
+class MissingResponsesError(Exception):
+    """Keys of the input have no response in the archive, so the rebuilt result files are incomplete."""
+
+
+class OfflineResponses:
+    """The parsed responses of one archive, used by a tool instead of the API.
+
+    ``lookup`` is called like the lookup functions of the tools, with the list index and
+    the key (ISBN, Material id or OCLC number), and gives the same rows or None. The keys
+    without a response are kept in ``missing``; ``check`` at the end of the rebuild raises
+    MissingResponsesError for them unless ``allow_missing``.
+    """
+
+    def __init__(self, path, tool, processes=None, allow_missing=False):
+        self.path = path
+        self.tool = tool
+        self.allow_missing = allow_missing
+        # Keys in the order they were looked up, each once
+        self.missing = {}
+        start = time.perf_counter()
+        self.results = parse_archive(path, tool, processes)
+        logger.debug(f'Offline rebuild: {len(self.results)} responses of {path} parsed in '
+                     f'{time.perf_counter() - start:.2f} seconds')
+
+    def __len__(self):
+        return len(self.results)
+
+    def lookup(self, listitem, key):
+        rows = self.results.get(str(key))
+        if rows is None:
+            # Not looked up in the archived run (e.g. a new row in the input): the same as a failed lookup
+            self.missing[str(key)] = None
+            logger.warning(f'No archived response for {key}, item {listitem + 1} is left out')
+        return rows
+
+    def check(self):
+        """Report the keys without an archived response; raise MissingResponsesError unless allow_missing."""
+        if not self.missing:
+            return
+        keys = list(self.missing)
+        listed = ', '.join(keys[:20]) + (f' and {len(keys) - 20} more' if len(keys) > 20 else '')
+        if self.allow_missing:
+            logger.warning(f'Offline rebuild: no archived response for {len(keys)} keys, left out of the '
+                           f'result files: {listed}')
+            return
+        raise MissingResponsesError(f'Offline rebuild: no archived response in {self.path} for {len(keys)} keys '
+                                    f'of the input ({listed}), so the result files are incomplete. Rebuild from '
+                                    f'an archive that has them, or use --allow-missing (rebuild_allow_missing: '
+                                    f'true in the config file) to accept the result files without them')
+
+
+def open_offline(config, folder, tool, archive=None, processes=None, allow_missing=False):
+    """Parse the archive to rebuild from; ``processes`` comes first, then rebuild_processes in the config file.
+
+    Missing responses are accepted with ``allow_missing`` or rebuild_allow_missing in the config file.
+    """
+    path = find_archive(folder, tool, archive)
+    processes = processes or config.get('rebuild_processes')
+    return OfflineResponses(path, tool, int(processes) if processes else None,
+                            allow_missing=allow_missing or bool(config.get('rebuild_allow_missing', False)))
@@ -0,0 +1,121 @@
+# Extraction of the fields the WorldCat tools use from API responses
+# All fields of a brief record are taken in one pass while the response is still
+# in memory, so the saved json files do not have to be read again afterwards
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+from .isbn import canonical_isbn13
+
+# Columns taken from every brief record, in the order of the output tables
+BRIEF_COLUMNS = ['ISBN1', 'ISBN2', 'Publisher', 'Holding', 'OCLC_nr', 'Author', 'Title',
+                 'Publication_Date', 'Pub_year', 'SpecificFormat']
+# Columns of the two tables of the pages tool: one row per bib record and one per url
+BIB_COLUMNS = ['OCLC_nr', 'Physical_Attributes']
+URL_COLUMNS = ['OCLC_nr', 'materialSpecified', 'uri']
+
+
+def publication_year(date):
+    """Return the year in a date field like '©2019' or '[2019]', or 'None'."""
+    try:
+        # First get only numbers from the field
+        yr = int("".join([x for x in date if x.isdigit()]))
+        # Now isolate the last 4 numbers if longer then 4
+        return yr % 10 ** 4
+    except (TypeError, ValueError):
+        return 'None'
+
+
+def brief_record_row(record):
+    """Return the values of one brief record in the order of BRIEF_COLUMNS."""
+    # Missing fields are filled with the text "None"
+    pub = record.get('publisher', "None")
+    onr = record.get('oclcNumber', "None")
+    try:
+        # Test if institutionHolding data is missing
+        hol1 = record['institutionHoldingIndicators'][0]['holdsItem']
+        if hol1 == 0.0:
+            hol = "False"
+        elif hol1 == 1.0:
+            hol = "True"
+        else:
+            hol = hol1
+    except (KeyError, IndexError):
+        hol = "None"
+    au = record.get('creator', "None")
+    tle = record.get('title', "None")
+    # Only use the ISBN codes if there are at least two of them
+    isbns = record.get('isbns', [])
+    if len(isbns) < 2:
+        isbn_id1 = "None"
+        isbn_id2 = "None"
+    else:
+        isbn_id1 = isbns[0]
+        isbn_id2 = isbns[1]
+    date = record.get('date', "None")
+    # This field can be used if the specificFormat field is not there
+    fmt = record.get('specificFormat', record.get('generalFormat', 'None'))
+    return [isbn_id1, isbn_id2, pub, hol, onr, au, tle, date, publication_year(date), fmt]
+
+
+def extract_brief_records(response):
+    """Return the brief records of a /brief-bibs response as a dict of columns."""
+    columns = {c: [] for c in BRIEF_COLUMNS}
+    for record in response.get('briefRecords', []):
+        for c, value in zip(BRIEF_COLUMNS, brief_record_row(record)):
+            columns[c].append(value)
+    return columns
+
+
+def bib_oclc_number(record):
+    """Return the OCLC number of a bib record as an int, or 'None' if it is missing."""
+    try:
+        return int(record['identifier']['oclcNumber'])
+    except (KeyError, TypeError, ValueError):
+        return 'None'
+
+
+def extract_bib_records(response):
+    """Return the records of a /bibs response as two dicts of columns (BIB_COLUMNS, URL_COLUMNS).
+
+    Every record gives one row with its physical description and one url row per entry
+    in digitalAccessAndLocations. One pass over the records, whatever their number; the
+    numberOfRecords item in the json is unreliable, so it is not used.
+    """
+    bibs = {c: [] for c in BIB_COLUMNS}
+    urls = {c: [] for c in URL_COLUMNS}
+    for record in response.get('bibRecords', []):
+        onr = bib_oclc_number(record)
+        bibs['OCLC_nr'].append(onr)
+        # Missing fields are filled with the text "None"
+        bibs['Physical_Attributes'].append(record.get('description', {}).get('physicalDescription', "None"))
+        for location in record.get('digitalAccessAndLocations', []):
+            urls['OCLC_nr'].append(onr)
+            urls['materialSpecified'].append(location.get('materialSpecified', "None"))
+            urls['uri'].append(location.get('uri', "None"))
+    return bibs, urls
+
+
+def match_records_to_isbns(records, search_isbns):
+    """Split the brief records of a batched bn: search over the search ISBNs.
+
+    A record belongs to every search ISBN (canonical ISBN-13) that is in its
+    ``isbns`` array. Returns a dict with the records per search ISBN, in the order
+    of the response, and a list of the records that list none of the search ISBNs.
+    """
+    matched = {isbn: [] for isbn in search_isbns}
+    # All ISBNs of all records are made canonical in one go
+    owners = [i for i, record in enumerate(records) for _ in record.get('isbns', [])]
+    codes = [code for record in records for code in record.get('isbns', [])]
+    found = [set() for _ in records]
+    for i, isbn in zip(owners, canonical_isbn13(codes)):
+        if isbn in matched:
+            found[i].add(isbn)
+    unmatched = []
+    for record, isbns in zip(records, found):
+        if not isbns:
+            unmatched.append(record)
+        for isbn in isbns:
+            matched[isbn].append(record)
+    return matched, unmatched
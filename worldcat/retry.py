@@ -0,0 +1,199 @@
+# Retries and circuit breaker of the WorldCat API requests
+# A request that fails because the API is busy or down (429, 5xx, no connection) is
+# tried again after an exponential backoff with jitter, or after the time in the
+# Retry-After header of a 429/503. After max_retries the error goes to the tool, which
+# puts the item on the dead-letter list (see journal.py). When many requests in a row
+# fail, the circuit breaker opens: for a while no requests are sent at all and the
+# workers wait, so an API that is down is not hammered by all workers. The items that
+# wait do not fail; they are sent when the API answers again
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests  # version 2.31.0
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+
+# HTTP status codes for which a request is tried again: too many requests and server errors
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Status codes that can come with a Retry-After header
+RETRY_AFTER_STATUS = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    """No request was sent because the circuit breaker is open (only without waiting)."""
+
+
+def retry_after_seconds(value):
+    """Seconds to wait according to a Retry-After header (seconds or an HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Stops all requests for ``cooldown`` seconds after ``threshold`` failed requests in a row.
+
+    After the cooldown one request is let through as a trial: if it works the breaker
+    closes again, if it fails the breaker stays open for another cooldown. Meanwhile the
+    other requests wait in before_request. A threshold of None or 0 switches the breaker
+    off. The breaker can be shared by threads.
+    """
+
+    def __init__(self, threshold=10, cooldown=60):
+        self.threshold = int(threshold) if threshold else None
+        self.cooldown = float(cooldown)
+        self.failures = 0
+        self.opened = 0
+        self._open_until = None
+        self._trial = False
+        self._lock = threading.Lock()
+        # Wakes the waiting requests when the breaker closes, the trial ends or the cooldown changes
+        self._changed = threading.Condition(self._lock)
+
+    def before_request(self, wait=True):
+        """Wait until a request may be sent; return True if the request is the trial.
+
+        With ``wait=False`` CircuitOpenError is raised instead of waiting.
+        """
+        if self.threshold is None:
+            return False
+        with self._lock:
+            while True:
+                if self._open_until is None:
+                    return False
+                left = self._open_until - time.monotonic()
+                if left <= 0 and not self._trial:
+                    # Cooldown is over: this request is the trial
+                    self._trial = True
+                    return True
+                if not wait:
+                    raise CircuitOpenError(f'Circuit breaker open after {self.failures} failed requests in a row')
+                # Until the cooldown is over, or (during the trial) until the trial is over
+                self._changed.wait(left if left > 0 else None)
+
+    def end_trial(self):
+        """The trial request is over; if it said nothing about the API (e.g. a bad JSON answer) the next one is the trial."""
+        with self._lock:
+            self._trial = False
+            self._changed.notify_all()
+
+    def success(self):
+        with self._lock:
+            if self._open_until is not None:
+                logger.info('Circuit breaker closed: the API answers again')
+            self.failures = 0
+            self._open_until = None
+            self._trial = False
+            self._changed.notify_all()
+
+    def failure(self):
+        if self.threshold is None:
+            return
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self._open_until is None and self.failures >= self.threshold):
+                self._open_until = time.monotonic() + self.cooldown
+                self._trial = False
+                self.opened += 1
+                self._changed.notify_all()
+                logger.warning(f'Circuit breaker open for {self.cooldown:.0f} seconds after '
+                               f'{self.failures} failed requests in a row')
+
+
+class RetryPolicy:
+    """Calls a request function and tries it again when the error is temporary.
+
+    The wait before retry n (0, 1, ...) is a random time between 0 and
+    min(backoff_max, backoff * 2 ** n) seconds ("full jitter", so the workers do not
+    all come back at the same moment), but never shorter than a Retry-After header.
+    ``on_unauthorized`` is called on a 401 before the one retry of that request
+    (e.g. to fetch a new token).
+    """
+
+    def __init__(self, max_retries=5, backoff=1.0, backoff_max=60.0, breaker=None, on_unauthorized=None):
+        self.max_retries = int(max_retries)
+        self.backoff = float(backoff)
+        self.backoff_max = float(backoff_max)
+        self.breaker = breaker
+        self.on_unauthorized = on_unauthorized
+        self.retries = 0
+        # The workers count their retries at the same time
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, on_unauthorized=None):
+        """Policy with max_retries, retry_backoff, retry_backoff_max and circuit_breaker_* from the config."""
+        breaker = CircuitBreaker(config.get('circuit_breaker_failures', 10),
+                                 config.get('circuit_breaker_cooldown', 60))
+        return cls(config.get('max_retries', 5), config.get('retry_backoff', 1), config.get('retry_backoff_max', 60),
+                   breaker=breaker, on_unauthorized=on_unauthorized)
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry ``attempt`` (0 for the first retry)."""
+        wait = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        return wait if retry_after is None else max(wait, retry_after)
+
+    def call(self, request):
+        """Return request(); temporary errors are tried again, other errors are raised straight away."""
+        attempt = 0
+        unauthorized = False
+        while True:
+            trial = self.breaker is not None and self.breaker.before_request()
+            try:
+                result = request()
+            except requests.exceptions.HTTPError as err:
+                status = err.response.status_code if err.response is not None else None
+                if status not in RETRY_STATUS:
+                    # The API answered, so it is not down, whatever the answer was
+                    if self.breaker is not None:
+                        self.breaker.success()
+                    if status == 401 and not unauthorized and self.on_unauthorized is not None:
+                        # The token was not accepted (e.g. revoked): one retry with a new token
+                        unauthorized = True
+                        self.on_unauthorized()
+                        continue
+                    # A bad request stays bad: no retry
+                    raise
+                retry_after = retry_after_seconds(err.response.headers.get('Retry-After')) \
+                    if status in RETRY_AFTER_STATUS else None
+                self._failed(attempt, err, retry_after)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                self._failed(attempt, err)
+            else:
+                if self.breaker is not None:
+                    self.breaker.success()
+                return result
+            finally:
+                # Whatever the trial request ended with, the breaker must not wait for it forever
+                if trial:
+                    self.breaker.end_trial()
+            attempt += 1
+
+    def _failed(self, attempt, err, retry_after=None):
+        """Count a temporary error; raise it when the retries are used up, otherwise wait."""
+        if self.breaker is not None:
+            self.breaker.failure()
+        if attempt >= self.max_retries:
+            raise err
+        wait = self.delay(attempt, retry_after)
+        with self._lock:
+            self.retries += 1
+        logger.debug(f'{err}; retry {attempt + 1} of {self.max_retries} in {wait:.1f} seconds')
+        time.sleep(wait)
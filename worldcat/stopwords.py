@@ -0,0 +1,54 @@
+# Stop words for the text search tool
+# The English and Dutch stop word lists of the NLTK stopwords corpus (version 3.9.1)
+# are included here, so the tool does not download them at every start and also works
+# on computers without internet access. The sets are only made when they are used
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+from functools import lru_cache
+
+# Words per language, separated by white space
+STOPWORDS = {
+    'english': '''
+        i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself
+        yourselves he him his himself she she's her hers herself it it's its itself they them
+        their theirs themselves what which who whom this that that'll these those am is are was
+        were be been being have has had having do does did doing a an the and but if or because
+        as until while of at by for with about against between into through during before after
+        above below to from up down in out on off over under again further then once here there
+        when where why how all any both each few more most other some such no nor not only own
+        same so than too very s t can will just don don't should should've now d ll m o re ve y
+        ain aren aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven
+        haven't isn isn't ma mightn mightn't mustn mustn't needn needn't shan shan't shouldn
+        shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+    ''',
+    'dutch': '''
+        de en van ik te dat die in een hij het niet zijn is was op aan met als voor had er maar
+        om hem dan zou of wat mijn men dit zo door over ze zich bij ook tot je mij uit der daar
+        haar naar heb hoe heeft hebben deze u want nog zal me zij nu ge geen omdat iets worden
+        toch al waren veel meer doen toen moet ben zonder kan hun dus alles onder ja eens hier
+        wie werd altijd doch wordt wezen kunnen ons zelf tegen na reeds wil kon niets uw iemand
+        geweest andere
+    ''',
+}
+
+# Words in file names that are not part of a title
+SPECIAL_WORDS = ('syllabus', 'hoofdstuk', 'chapter', 'wb', 'lecture', 'notes')
+
+
+@lru_cache(maxsize=None)
+def _language(language):
+    try:
+        return frozenset(STOPWORDS[language].split())
+    except KeyError:
+        raise ValueError(f'No stop word list for {language!r}, available: {sorted(STOPWORDS)}') from None
+
+
+def stopword_set(languages=('english', 'dutch'), extra=SPECIAL_WORDS):
+    """Return one frozenset with the stop words of the languages and the extra words."""
+    words = frozenset(w.lower() for w in extra)
+    for language in languages:
+        words |= _language(language.lower())
+    return words
@@ -0,0 +1,95 @@
+# Streaming output for the WorldCat tools
+# The result tables are written to their files chunk by chunk instead of being built in
+# memory as a whole first, and duplicate rows are found with a compact set of row hashes
+# instead of drop_duplicates on the whole table, so memory does not grow with the output
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import numpy as np
+import pandas as pd  # version 2.2.3
+
+# Formats of the output files (output_format in the config file)
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+
+class ChunkWriter:
+    """Table file that is written one chunk (DataFrame) at a time.
+
+    With ``fmt`` 'csv' the chunks are appended to ``path`` with DataFrame.to_csv and the
+    ``csv_options`` (sep, encoding); the header is written once, so the file is the same
+    as to_csv of the whole table. With 'parquet' the file gets the extension .parquet and
+    every chunk becomes a row group (needs the optional pyarrow package). ``columns`` is
+    used for the header when no chunk is written at all.
+    """
+
+    def __init__(self, path, columns, fmt='csv', **csv_options):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f'Unknown output_format {fmt!r}, use one of: {", ".join(OUTPUT_FORMATS)}')
+        self.fmt = fmt
+        self.path = path if fmt == 'csv' else os.path.splitext(path)[0] + '.parquet'
+        self.columns = list(columns)
+        self.csv_options = csv_options
+        self.rows = 0
+        self._started = False
+        self._parquet = None
+
+    def write(self, frame, renumber=False):
+        """Add the rows of ``frame``; with ``renumber`` the index continues from the last chunk."""
+        if renumber:
+            frame = frame.set_axis(range(self.rows, self.rows + len(frame)))
+        if self.fmt == 'csv':
+            frame.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started,
+                         **self.csv_options)
+        else:
+            self._write_parquet(frame)
+        self._started = True
+        self.rows += len(frame)
+
+    def _write_parquet(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        # Text columns can have numbers and the text "None" in them; Parquet needs one type
+        frame = frame.astype({c: 'string' for c in frame.columns if frame[c].dtype == object})
+        table = pa.Table.from_pandas(frame)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema)
+        else:
+            # A column without any value in the first chunk decides nothing about later chunks
+            table = table.cast(self._parquet.schema)
+        self._parquet.write_table(table)
+
+    def close(self):
+        if not self._started:
+            # No rows at all: still write a file with the column names
+            self.write(pd.DataFrame(columns=self.columns))
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+class HashSet:
+    """Set of rows, kept as a sorted array of 64-bit row hashes (8 bytes per row).
+
+    ``add_new`` gives the rows of a chunk that were not seen before, like drop_duplicates
+    over all chunks together would keep them. Two different rows with the same 64-bit
+    hash are possible in theory, but not with the number of rows of a catalogue.
+    """
+
+    def __init__(self):
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._seen)
+
+    def add_new(self, rows):
+        """Return a boolean mask of the rows (DataFrame or Series) that are new, and add them."""
+        hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+        # The first of the duplicates within the chunk
+        new = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self._seen):
+            pos = np.minimum(np.searchsorted(self._seen, hashes), len(self._seen) - 1)
+            new &= self._seen[pos] != hashes
+        self._seen = np.union1d(self._seen, hashes[new])
+        return new
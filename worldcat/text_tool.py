@@ -0,0 +1,421 @@
+# Publishers tool to be able to augment data with
+# publisher data from WorldCat using the OCLC Discovery API
+# This tool uses words from the filename (and publisher) as a basis for text-based searches
+# Author: Mark Bruyneel
+# Started with: worldcat text (see cli.py)
+#
+# Date: 2026-10-17
+# Version: 3.0
+# Created using Python version 3.10
+#
+# Re-use note: Make sure to change folder names that are relevant to your computer
+
+import pandas as pd  # version 2.2.3
+import os
+import re
+import numpy as np
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+# Also needed to get the run time of the script
+from datetime import datetime  # version 5.5
+from pathlib import Path
+from .client import WorldCatClient
+from .engine import run_concurrent
+from .journal import Journal
+from .accumulator import ColumnAccumulator
+from .records import BRIEF_COLUMNS, extract_brief_records
+from .matching import match_backend, title_similarity, top_matches
+from .query_planner import QueryPlanner
+from .stopwords import SPECIAL_WORDS, stopword_set
+from .archive import open_responses
+from .metrics import Metrics, export_metrics
+from .rebuild import open_offline, MissingResponsesError
+from .delta import DeltaState, NEW, CHANGED, changes_table
+from .excel import read_sheet
+from .core import load_config, log_failed_lookup, RunTimer
+
+# Show all data in screen
+pd.set_option("display.max.columns", None)
+
+
+# Login scope of the brief-bibs endpoint
+SCOPE = ['wcapi:view_brief_bib']
+# Folder with the response archive and the results, and the journal of the lookups
+FOLDER = r'U:\Werk\OWO\WC_test'
+JOURNAL_FILE = r'U:\Werk\OWO\Journal\WorldCat_text_journal.jsonl'
+# Substrings removed from file names and titles to separate the words
+# The # needs to be removed as this causes errors in the WorldCat API
+TO_REMOVE = ['.pdf', 'pdf', '[', ']', '{', '}', '.', ',', '#']
+# Substrings replaced by a space
+TO_SPACE = ['_', ' - ', '-', '(', ')']
+
+
+def clean_text(column):
+    """Remove the unneeded characters of TO_REMOVE and TO_SPACE from a column of lower case texts."""
+    for sub in TO_REMOVE:
+        column = column.str.replace(sub, '')
+    for subs in TO_SPACE:
+        column = column.str.replace(subs, ' ')
+    return column
+
+
+def search_key(material_id, search_string):
+    """Key of a search in the journal, the response archive and the delta state.
+
+    A Material id can be in the sheet more than once with different file names, so the
+    key is the Material id together with the search string.
+    """
+    return f'{material_id}|{search_string}'
+
+
+def remove_stopwords(column, stopwords):
+    """Split the texts of a column into lists of words without the stop words."""
+    return column.apply(lambda x: [item for item in x.split() if item not in stopwords])
+
+
+# An error is logged and gives exit status 1
+@logger.catch(default=1)
+def main(args):
+    """Run the tool; ``args`` has the config file, the input file and the resume flag (see cli.py)."""
+    # Get configuration information to connect to WorldCat Search API
+    config = load_config(args.config)
+    timer = RunTimer()
+    logger.add(r'U:\Werk\OWO\WC_Text_Search_test.log', backtrace=True, diagnose=True, rotation="10 MB",
+               retention="12 months")
+
+    # Provide the file name and location for which to look up data
+    excelfile = args.input or input('Please provide the location and name of the Excel file.\nExample: C:\\temp\\keyword_list.xlsx \n')
+    sh_name = args.sheet or input('Please provide the exact sheet name that has the data: \n')
+
+    if args.offline is not None:
+        # Rebuild the result files from the archived responses of an earlier run, without the API
+        offline = open_offline(config, FOLDER, 'text', args.offline or None, args.processes,
+                               allow_missing=args.allow_missing)
+        try:
+            run(None, config, excelfile, sh_name, offline=offline)
+        except MissingResponsesError as err:
+            # Exit status 1, so an incomplete rebuild is not taken for a good one
+            logger.error(str(err))
+            return 1
+    else:
+        # One session, token and connection pool shared by all workers
+        wc = WorldCatClient(config, SCOPE)
+        run(wc, config, excelfile, sh_name, resume=args.resume)
+        # Close the response cache and log how many lookups it saved
+        wc.close()
+
+    # Logging of script run:
+    timer.log()
+
+
+def run(wc, config, excelfile, sh_name, resume=False, folder=FOLDER, journal_file=JOURNAL_FILE, offline=None):
+    """Search for the files without ISBN of one Excel sheet and write the result files to ``folder``.
+
+    ``wc`` is a WorldCatClient with the brief-bibs scope. Nothing is asked, so the batch
+    runner can call this for many sheets with the same client. With ``offline`` (an
+    OfflineResponses, see rebuild.py) ``wc`` is not used and the files are made from the
+    archived responses of an earlier run.
+    """
+    # Date for file names
+    runday = str(datetime.today().date())
+
+    # Stop words of the languages in the config and the words in file names that are not part
+    # of a title, as one set. English and Dutch cover most stop words of the file names
+    All_stopwords = stopword_set(config.get('stopword_languages', ['english', 'dutch']),
+                                 list(SPECIAL_WORDS) + list(config.get('extra_stopwords', [])))
+
+    # Number of records that are downloaded per search string; 10 is the first page the API returns by default
+    max_records = int(config.get('max_records', 10))
+
+    # create download folder if it doesn't exist
+    Path(folder).mkdir(parents=True, exist_ok=True)
+
+    # The raw responses go into one compressed archive per run (see archive.py), or into
+    # json files with a backup folder for those of last time (response_store: json).
+    # An offline rebuild uses the responses of an earlier run and looks nothing up
+    responses = None
+    if offline is None:
+        responses = open_responses(config, folder, 'text', os.path.join(folder, f'tbackup_{runday}'), resume=resume)
+    workers = wc.workers if offline is None else 1
+    # Times of the stages and the requests of the run, written at the end (see metrics.py)
+    metrics = Metrics(config.get('profile_stage'))
+    # The client can be shared with earlier jobs of a batch: only the requests from here on count
+    client_start = wc.metrics_snapshot() if wc is not None else None
+
+    with metrics.stage('excel_load'):
+        # Only the columns that are needed (see excel.py for the engine and the snapshot)
+        Pubs = read_sheet(config, excelfile, sh_name, ['Material id', 'Filename', 'Title', 'ISBN', 'Publisher'])
+    with metrics.stage('preprocess'):
+        # Keep part of the list with essential data:
+        Publication_list = Pubs[['Material id', 'Filename', 'Title', 'ISBN', 'Publisher']].copy()
+
+        # Keep DataFrame where ISBN is not available
+        Publication_overview = Publication_list.query('ISBN != ISBN')
+        # Remove ISBN column
+        Publication_overview = Publication_overview.drop('ISBN', axis=1)
+
+        # Make a copy to avoid the slice warning
+        Publications = Publication_overview.copy()
+
+        # First make a copy of the field I will edit
+        Publications['Filename_copy'] = Publications['Filename']
+
+        # Turn all string data to lower case (makes it easier to clean)
+        Publications['Filename_copy'] = Publications.Filename.str.lower()
+
+        # Remove substring values to remove unneeded characters to separate words
+        Publications['Filename_copy'] = clean_text(Publications['Filename_copy'])
+
+        # Dataframe that is needed for the comparison with the search result later.
+        # This table needs to be merged with the search result table
+        For_later_comparison = Publications.copy()
+        For_later_comparison = For_later_comparison.drop(['Filename', 'Title', 'Publisher'], axis=1)
+        For_later_comparison = For_later_comparison.rename(columns={'Material id': 'Search_MID'})
+
+        # Remove numeric strings that are smaller than 2 characters ???
+        # https://www.digitalocean.com/community/tutorials/python-remove-character-from-string
+        Publications['Filename_copy'] = Publications['Filename_copy'].replace(value='', regex=r'\d{1,2}\s?')
+
+        # Get 4-digit numbers from Filename and create a new variable with this
+        Publications['Filename_copy_year'] = Publications['Filename'].str.extract(r'(19\d\d|20\d\d)', expand=True)
+
+        # Remove the numbers from the list
+        string_column = Publications['Filename_copy']
+        string_column.str.extract(r'(\*[0-9])')
+
+        # Removing stopwords using the set of existing language stop words
+        Publications['Filename_copy'] = Publications['Filename_copy'].fillna("")
+        Publications['Filename_copy'] = remove_stopwords(Publications['Filename_copy'], All_stopwords)
+
+        # Remove rows where the Filename_copy field only has an empty list
+        Publications = Publications[Publications['Filename_copy'].str.len() != 0]
+        # Generate a column containing the word count for the word list = Filename_copy
+        Publications['Word_count'] = [len(c) for c in Publications['Filename_copy']]
+        # Remove columns that only have one word left
+        Publications = Publications[Publications['Word_count'] > 2]
+        # Remove columns that only have more than 10 words
+        # The chances of matches with that many words are very rare as titles are not usually that long
+        Publications = Publications[Publications['Word_count'] < 11]
+
+        # Rename column names for easier understanding
+        Publications = Publications.rename(columns={'Filename_copy': 'Word_list', 'Filename_copy_year': 'Publication_year'})
+
+        Publications.to_csv(os.path.join(folder, 'Test_text_search_data.txt'), sep='\t', encoding='utf-16')
+
+        # Make a list of the word lists that need to be looked up based on the file names in the Excel file
+        Word_lists_original = Publications['Word_list'].tolist()
+        years_list_original = Publications['Publication_year'].tolist()
+        Material_ID_list = Publications['Material id'].tolist()
+
+        listsize = len(Material_ID_list) - 1
+
+        search_string_list = []
+        search_words_list = []
+        snr = 0
+        while snr < listsize:
+            new_Word_list = []
+            for word in Word_lists_original[snr]:
+                if len(word) < 3:
+                    pass
+                else:
+                    new_Word_list.append(word)
+            # Combine the words and the publication year into a search string
+            res = ' AND '.join([str(x) for x in new_Word_list])
+            query = res + ' AND yr:' + str(years_list_original[snr])
+            # Remove the last piece if there was no corresponding year in the list = nan
+            query = re.sub(' AND yr:nan', '', query)
+            search_string_list.append(query)
+            search_words_list.append(new_Word_list)
+            snr = snr + 1
+        print('Search strings: ', search_string_list, '\n')
+
+        # The journal, the response archive and the delta state keep the results per Material
+        # id and search string (see search_key): a repeated row is searched once
+        Search_keys = [search_key(MID, search_string) for MID, search_string in zip(Material_ID_list, search_string_list)]
+        # The same key for the comparison with the search result (rows without a search get none)
+        For_later_comparison['Search_key'] = pd.Series(Search_keys, index=Publications.index[:len(Search_keys)])
+    # Next step is to use the data to search and download records
+    # Create an output folder if it doesn't exist
+    Path(r'U:\Werk\OWO\Output').mkdir(parents=True, exist_ok=True)
+
+    # Use this list to get information from WorldCat
+    # Collect the rows per column and make one DataFrame at the end. All results stay in
+    # memory: the merge with the files and the duplicate removal need the whole result
+    # chunk_size of the config file is for the ISBN and pages tool only
+    if config.get('chunk_size'):
+        logger.debug('chunk_size is only used by the ISBN and pages tool, the text tool keeps all search results in memory')
+    WC_text_Book_Acc = ColumnAccumulator(BRIEF_COLUMNS + ['Search_MID', 'Search_key'])
+
+    No_of_strings = len(search_string_list) - 1
+    Nr_of_strings = len(search_string_list)
+    # The strict search string is tried first. If it has no results, the planner relaxes it:
+    # without the year, without the most common words and at last as a title phrase.
+    # Searches without results are remembered (in the response cache if there is one)
+    planner = QueryPlanner(search_words_list, cache=wc.cache if offline is None else None, relax=config.get('query_relaxation', True))
+
+    def search(query):
+        # Only the pages that are needed for max_records records are requested
+        return list(wc.iter_records("/brief-bibs", "q=" + str(query) + "&groupRelatedEditions=false&openAccess&showHoldingsIndicators=true",
+                                    page_size=min(max_records, 50), max_records=max_records))
+
+    # Get WorldCat Records for each word list (= search string now) in the list.
+    # Because of a bug in the WorldCat API (reported it) the publication years and edition
+    # information are taken from the brief records here as well. Returns None if the lookup failed
+    @log_failed_lookup
+    def lookup_string(listitem, search_string):
+        itemlist = listitem + 1
+        SearchString_Length = len(search_string)
+        logger.debug(
+            f'Retrieving data from WorldCat for string {itemlist}, of a total of {Nr_of_strings} strings. Length is: {SearchString_Length})')
+        query, records = planner.run(search_words_list[listitem], years_list_original[listitem], search)
+        if query is not None and query != search_string:
+            logger.debug(f'Found records for Material id {Material_ID_list[listitem]} with the relaxed search: {query}')
+        response = {'numberOfRecords': len(records), 'briefRecords': records}
+        # keep the response as backup
+        responses.put(Search_keys[listitem], response)
+        # To get all data for every edition
+        return extract_brief_records(response)
+
+    # The lookups run in parallel when workers > 1 in the config file. The results
+    # come back in the order of the search string list
+    # Every finished lookup goes into the journal, so an interrupted run can be resumed
+    # Offline rebuild: the rows come from the archived responses per search key and the
+    # journal is kept in memory only
+    if offline is not None:
+        def lookup_string(listitem, search_string):
+            key = Search_keys[listitem]
+            if key not in offline.results and str(Material_ID_list[listitem]) in offline.results:
+                # Archives of older versions have the responses per Material id
+                key = Material_ID_list[listitem]
+            return offline.lookup(listitem, key)
+    # The journal syncs the response archive before its own file, once per record
+    journal = Journal(journal_file if offline is None else None, resume=resume and offline is None,
+                      before_sync=responses.sync if responses is not None else None)
+    # Delta mode (delta_file in the config file): files that were looked up less than
+    # delta_max_age_days ago with the same search string are not looked up again, their
+    # rows come from the state file
+    delta = DeltaState.from_config(config, 'text') if offline is None else None
+    # One search per key (a repeated row has the same search, see above)
+    searches = dict(zip(Search_keys, search_string_list[:No_of_strings]))
+    reused = set()
+    if delta is not None:
+        reused = delta.fresh_keys(searches)
+        journal.preload(delta.rows(reused))
+        # Their responses go into the archive of this run too, for an offline rebuild
+        responses.reuse([key for key in searches if key in reused])
+    lookup = journal.wrap(lookup_string, key=lambda listitem, search_string: Search_keys[listitem])
+    with metrics.stage('lookup'):
+        results = run_concurrent(lookup, search_string_list[:No_of_strings], workers)
+    changes = {}
+    if delta is not None:
+        # The results are in the order of the search string list, repeated rows included
+        changes = delta.update([(key, search_string, columns) for key, search_string, columns
+                                in zip(Search_keys, search_string_list[:No_of_strings], results)
+                                if key not in reused])
+    journal.close()
+    if responses is not None:
+        responses.close()
+    logger.debug(f'Text searches sent: {planner.sent}, skipped because they are known to have no results: {planner.skipped}')
+    with metrics.stage('accumulate'):
+        not_found = []
+        for MID, key, columns in zip(Material_ID_list, Search_keys, results):
+            if columns is None:
+                continue
+            if len(columns['OCLC_nr']) == 0:
+                # The search worked but WorldCat has no records for this file
+                not_found.append(str(MID))
+                continue
+            columns['Search_MID'] = str(MID)
+            columns['Search_key'] = key
+            WC_text_Book_Acc.extend(columns)
+        WorldCat_Book_Data_full = WC_text_Book_Acc.to_frame()
+        WC_text_Book_Table = WorldCat_Book_Data_full[BRIEF_COLUMNS[:7] + ['Search_MID']].copy()
+
+    with metrics.stage('write'):
+        # Turn key Search_MID into int64 for later merge & Export end result
+        WC_text_Book_Table["Search_MID"] = WC_text_Book_Table["Search_MID"].astype(np.int64)
+        WC_text_Book_Table.to_csv(os.path.join(folder, f'WorldCat_Text_Book_list_{runday}.txt'), sep='\t',
+                                  encoding='utf-8')
+
+    # Log and list the Material ids for which WorldCat returned no records
+    file = open(os.path.join(folder, 'MaterialID_files_not_found.txt'), 'w')
+    for item in not_found:
+        file.write(item + ", ")
+    file.close()
+    logger.debug(f'\nDid not find any records in WorldCat for {len(not_found)} files:\n {not_found}.\n')
+
+    # Only records with an OCLC number can be linked to WorldCat
+    WorldCat_Book_Data_full = WorldCat_Book_Data_full[WorldCat_Book_Data_full['OCLC_nr'] != "None"]
+    OCLC_Rec_data = WorldCat_Book_Data_full[['OCLC_nr', 'Publication_Date', 'Pub_year', 'SpecificFormat']].reset_index(drop=True)
+
+    with metrics.stage('write'):
+        # Export result as a CSV file with the date of the Python run
+        OCLC_Rec_data.to_csv(os.path.join(folder, 'Text_search_OCLC_Rec_data.csv'), encoding='utf-8')
+
+    # Put the book data and the edition data in the same column order as before
+    WorldCat_Book_Data_full = WorldCat_Book_Data_full[BRIEF_COLUMNS[:7] + ['Search_MID', 'Publication_Date', 'Pub_year', 'SpecificFormat', 'Search_key']].reset_index(drop=True)
+    WorldCat_Book_Data_full["Search_MID"] = WorldCat_Book_Data_full["Search_MID"].astype(np.int64)
+
+    # Create an abbreviated table with duplicates removed
+    WorldCat_Book_Data = WorldCat_Book_Data_full.copy()
+    WorldCat_Book_Data = WorldCat_Book_Data[WorldCat_Book_Data.Publication_Date != "uuuu"]
+    WorldCat_Text_Search_final = WorldCat_Book_Data.drop_duplicates()
+    WorldCat_Text_Search_final['OCLC_Link'] = 'https://vu.on.worldcat.org/search?queryString=' + WorldCat_Text_Search_final['OCLC_nr'].astype(str)
+
+    with metrics.stage('merge'):
+        # Merge the result with original Dataframe For_later_comparison
+        # WorldCat_data_word_search = pd.concat([For_later_comparison, WorldCat_Text_Search_final], ignore_index=True)
+        # (on the search key too: the rows of a Material id with two file names are compared with their own search)
+        WorldCat_data_word_search = pd.merge(For_later_comparison, WorldCat_Text_Search_final, how="outer", on=['Search_MID', 'Search_key'])
+
+        # drop rows where value in column is null
+        WorldCat_data_word_search = WorldCat_data_word_search.dropna(subset=['OCLC_nr'])
+
+        # First make a copy of the field I will edit
+        WorldCat_data_word_search['Title_copy'] = WorldCat_data_word_search['Title']
+
+        # Turn all string data to lower case (makes it easier to clean)
+        WorldCat_data_word_search['Title_copy'] = WorldCat_data_word_search.Title_copy.str.lower()
+
+        # Remove substring values to remove unneeded characters to compare field Title_copy and Filename_copy
+        WorldCat_data_word_search['Title_copy'] = clean_text(WorldCat_data_word_search['Title_copy'])
+
+        # Compare fields Title_copy and Filename_copy and generate a new column ratio with the result.
+        # All pairs are scored at once (match_backend: difflib, auto, rapidfuzz or ngram).
+        # The backends give different scores, so the log and the metrics say which one made the ratio column
+        backend = match_backend(config.get('match_backend', 'difflib'))
+        logger.info(f'Ratio column computed with match_backend {backend}'
+                    + ('' if backend == 'difflib' else ' (other scores than difflib in earlier versions of the tool)'))
+        metrics.set('match_backend_info', 1, backend=backend)
+        WorldCat_data_word_search['ratio'] = title_similarity(WorldCat_data_word_search['Filename_copy'],
+                                                              WorldCat_data_word_search['Title_copy'], backend=backend)
+        # Keep only the best matching titles per file
+        WorldCat_data_word_search = top_matches(WorldCat_data_word_search, 'Search_key', 'ratio',
+                                                top_k=config.get('match_top_k'),
+                                                threshold=float(config.get('match_threshold', 0)))
+
+    with metrics.stage('write'):
+        # The search key is only needed inside the tool
+        WorldCat_data_word_search.drop(columns='Search_key').to_csv(os.path.join(folder, 'WorldCat_data_word_search.txt'),
+                                                                   sep='\t', encoding='utf-8')
+        if delta is not None:
+            # Delta mode: the rows of the files that are new or have another result than last time
+            changes_table(WorldCat_data_word_search, 'Search_key', changes, missing=For_later_comparison).drop(
+                columns='Search_key').to_csv(os.path.join(folder, f'WorldCat_data_word_search_changes_{runday}.txt'),
+                                             sep='\t', encoding='utf-8')
+    if delta is not None:
+        delta.close()
+        metrics.set('delta_reused_total', delta.reused)
+        metrics.set('delta_changes_total', delta.changes[NEW], change=NEW)
+        metrics.set('delta_changes_total', delta.changes[CHANGED], change=CHANGED)
+
+    # The metrics of the run: a JSON summary in the folder and the Prometheus textfile
+    metrics.set('items_total', len(results))
+    metrics.set('items_not_found_total', len(not_found))
+    metrics.set('items_failed_total', len(journal.failed))
+    if offline is not None:
+        metrics.set('rebuild_missing_total', len(offline.missing))
+    export_metrics(config, folder, 'text', metrics, wc, since=client_start)
+    if offline is not None:
+        # Keys of the input without an archived response fail the rebuild (see rebuild.py)
+        offline.check()
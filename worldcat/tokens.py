@@ -0,0 +1,111 @@
+# Shared OAuth token handling for the WorldCat tools
+# The token of a BackendApplicationClient session is kept and reused until shortly
+# before it expires instead of fetching a new token for every item that is looked up
+#
+# Date: 2026-10-17
+# Version: 1.0
+# Created using Python version 3.10
+
+import os
+import json
+import threading
+import time
+from pathlib import Path
+# To catch errors, use the logger option from loguru
+from loguru import logger  # version 0.7.2
+
+
+class TokenManager:
+    """Keeps the access token of an OAuth2Session valid.
+
+    A token is only fetched when there is none yet or when the current one expires
+    within ``refresh_margin`` seconds. If ``cache_file`` is given the token is also
+    kept on disk, so a run that starts shortly after the previous one can skip
+    the first request to the token endpoint. The manager can be shared by threads.
+    """
+
+    def __init__(self, session, token_url, auth, refresh_margin=60, cache_file=None):
+        self.session = session
+        self.token_url = token_url
+        self.auth = auth
+        self.refresh_margin = refresh_margin
+        self.cache_file = cache_file
+        self._token = None
+        self._cache_checked = False
+        self._lock = threading.Lock()
+
+    def get_token(self):
+        """Return a valid token, fetching a new one only when needed."""
+        with self._lock:
+            if self._is_valid(self._token):
+                return self._token
+            token = None
+            if not self._cache_checked:
+                # Only look on disk once: a token saved by this run is already in memory
+                self._cache_checked = True
+                token = self._load()
+            if not self._is_valid(token):
+                logger.debug('Fetching a new access token from ' + str(self.token_url))
+                token = self.session.fetch_token(token_url=self.token_url, auth=self.auth)
+                if 'expires_at' not in token and 'expires_in' in token:
+                    token['expires_at'] = time.time() + float(token['expires_in'])
+                self._save(token)
+            self._token = token
+            self.session.token = token
+            return token
+
+    def invalidate(self):
+        """Forget the current token, for example after a 401 response."""
+        with self._lock:
+            self._token = None
+
+    def _is_valid(self, token):
+        if not token or 'access_token' not in token:
+            return False
+        try:
+            expires_at = float(token['expires_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return expires_at - self.refresh_margin > time.time()
+
+    def _cache_key(self):
+        # Tokens are stored per client id and scope: the pages tool uses another scope
+        scope = self.session.scope or []
+        return str(self.session.client_id) + ' ' + ' '.join(sorted(scope))
+
+    def _load(self):
+        if not self.cache_file or not os.path.isfile(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r') as f:
+                tokens = json.load(f)
+        except (OSError, ValueError) as err:
+            logger.debug(f'Could not read token cache {self.cache_file}: {err}')
+            return None
+        token = tokens.get(self._cache_key())
+        if self._is_valid(token):
+            logger.debug('Using the access token cached in ' + str(self.cache_file))
+            return token
+        return None
+
+    def _save(self, token):
+        if not self.cache_file:
+            return
+        tokens = {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                tokens = json.load(f)
+        except (OSError, ValueError):
+            pass
+        tokens[self._cache_key()] = token
+        try:
+            Path(self.cache_file).parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so a crash can not leave half a file behind.
+            # The file holds a bearer token, so keep it readable for the owner only
+            tmp_file = str(self.cache_file) + '.tmp'
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tokens, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as err:
+            logger.debug(f'Could not write token cache {self.cache_file}: {err}')